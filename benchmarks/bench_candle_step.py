@@ -0,0 +1,78 @@
+"""
+Candle stepping: pandas ``iloc`` per symbol (old path) vs ``PaperExchange.step`` on the
+merged timeline (``Timeline`` chunks: each step applies one CSR row of changed symbols).
+
+Writes a synthetic 1-year, 10-symbol 1m dataset (525,600 bars each) to a temp dir,
+loads it through PaperExchange and reports steps/sec for both paths. The old path
+is timed on the first --old-steps bars only, it is too slow to run in full. The
+timeline figure includes marking the portfolio on every step, the iloc one does not.
+
+    python -m benchmarks.bench_candle_step
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from woofibot.core.paper_exchange import PaperExchange
+
+BARS_PER_YEAR = 365 * 24 * 60
+
+
+def write_dataset(root: Path, symbols, bars: int):
+    rng = np.random.default_rng(1)
+    ts = 1696118400 + 60 * np.arange(bars, dtype=np.int64)
+    for sym in symbols:
+        close = 2000.0 * np.exp(np.cumsum(rng.normal(0, 5e-4, bars)))
+        df = pd.DataFrame({
+            "timestamp": ts,
+            "open": close,
+            "high": close * 1.001,
+            "low": close * 0.999,
+            "close": close,
+            "volume": rng.integers(1, 500, bars),
+        })
+        df.to_csv(root / f"{sym}_1m.csv", index=False)
+
+
+def old_step_rate(frames, steps: int) -> float:
+    prices = {}
+    t0 = time.perf_counter()
+    for ptr in range(steps):
+        for sym, df in frames.items():
+            if ptr < len(df):
+                prices[sym] = float(df.iloc[ptr]["close"])
+    return steps / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=10)
+    ap.add_argument("--bars", type=int, default=BARS_PER_YEAR)
+    ap.add_argument("--old-steps", type=int, default=20_000)
+    args = ap.parse_args()
+    symbols = [f"SYM{i}-USDT" for i in range(args.symbols)]
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"writing {args.symbols} x {args.bars:,} bars ...")
+        write_dataset(Path(tmp), symbols, args.bars)
+
+        frames = {s: pd.read_csv(Path(tmp) / f"{s}_1m.csv") for s in symbols}
+        before = old_step_rate(frames, min(args.old_steps, args.bars))
+        del frames
+
+        ex = PaperExchange(symbols, data_dir=tmp, fee_bps=0.0)
+        t0 = time.perf_counter()
+        for _ in range(args.bars):
+            ex.step()
+        after = args.bars / (time.perf_counter() - t0)
+
+    print(f"before (iloc):           {before:>12,.0f} steps/sec")
+    print(f"after (timeline chunks): {after:>12,.0f} steps/sec  ({after / before:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+PaperExchange startup: whole-file ``read_csv`` vs the memory-mapped candle store.
+
+Writes --symbols x --years of synthetic 1m bars as CSV, converts them with
+``convert_csv`` and then starts a PaperExchange in a fresh subprocess for each
+source (so peak RSS is not shared), loading either everything or one month.
+
+    python -m benchmarks.bench_candle_store --symbols 20 --years 1
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_candle_step import BARS_PER_YEAR, write_dataset
+from woofibot.data.candle_store import convert_csv
+
+
+def child(data_dir: str, store_dir: str, symbols, start, end):
+    from woofibot.core.paper_exchange import PaperExchange
+
+    t0 = time.perf_counter()
+    ex = PaperExchange(symbols, data_dir=data_dir, fee_bps=0.0, store_dir=store_dir or None, start=start, end=end)
+    ex.step()  # first step builds the first timeline window
+    startup = time.perf_counter() - t0
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # KiB on Linux
+    print(json.dumps({"startup_s": startup, "rss_mb": rss_mb}))
+
+
+def run(tmp: Path, symbols, store: bool, start=None, end=None):
+    cmd = [sys.executable, "-m", "benchmarks.bench_candle_store", "--child",
+           "--data-dir", str(tmp / "csv"), "--store-dir", str(tmp / "store") if store else "",
+           "--names", ",".join(symbols)]
+    if start:
+        cmd += ["--start", start, "--end", end]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=20)
+    ap.add_argument("--years", type=float, default=1.0)
+    ap.add_argument("--child", action="store_true")
+    ap.add_argument("--data-dir")
+    ap.add_argument("--store-dir", default="")
+    ap.add_argument("--names", default="")
+    ap.add_argument("--start")
+    ap.add_argument("--end")
+    args = ap.parse_args()
+    if args.child:
+        child(args.data_dir, args.store_dir, args.names.split(","), args.start, args.end)
+        return
+
+    symbols = [f"SYM{i}-USDT" for i in range(args.symbols)]
+    bars = int(args.years * BARS_PER_YEAR)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "csv").mkdir()
+        print(f"writing {args.symbols} x {bars:,} bars ...")
+        write_dataset(tmp / "csv", symbols, bars)
+        t0 = time.perf_counter()
+        for sym in symbols:
+            convert_csv(tmp / "csv" / f"{sym}_1m.csv", tmp / "store")
+        print(f"convert: {time.perf_counter() - t0:.1f}s (one-off)")
+
+        # synthetic data starts 2023-10-01
+        rows = [
+            ("csv, full", run(tmp, symbols, store=False)),
+            ("store, full", run(tmp, symbols, store=True)),
+            ("csv, 1 month", run(tmp, symbols, store=False, start="2023-11-01", end="2023-11-30")),
+            ("store, 1 month", run(tmp, symbols, store=True, start="2023-11-01", end="2023-11-30")),
+        ]
+    for name, r in rows:
+        print(f"{name:<16} startup {r['startup_s']:>7.2f}s   peak RSS {r['rss_mb']:>8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Portfolio mark-update and risk-query cost at large universes.
+
+Opens a position in every symbol, then times one tick: a bulk mark update followed by
+equity, unrealized PnL and open notional — the per-step work of the engine and
+``RiskManager.can_trade`` — for the dict ``Portfolio`` and ``ArrayPortfolio``.
+
+    python -m benchmarks.bench_portfolio --symbols 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from woofibot.core.array_portfolio import ArrayPortfolio
+from woofibot.core.portfolio import Portfolio
+
+
+def bench(name, pf, update, ticks):
+    t0 = time.perf_counter()
+    for t in range(ticks):
+        update(t)
+        pf.equity()
+        pf.unrealized_total()
+        pf.open_notional()
+    dt = time.perf_counter() - t0
+    print(f"{name:<18} {ticks / dt:>12,.0f} ticks/sec")
+    return pf.equity()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=500)
+    ap.add_argument("--ticks", type=int, default=2_000)
+    args = ap.parse_args()
+    symbols = [f"PERP_S{i}_USDC" for i in range(args.symbols)]
+    rng = np.random.default_rng(7)
+    marks = 100.0 * np.exp(np.cumsum(rng.normal(0, 1e-3, (args.ticks, args.symbols)), axis=0))
+    mark_lists = marks.tolist()
+
+    pf = Portfolio(cash_usd=1e6)
+    apf = ArrayPortfolio(symbols, cash_usd=1e6)
+    for i, sym in enumerate(symbols):
+        side = "buy" if i % 2 else "sell"
+        pf.update_fill(sym, side, 1.0, 100.0, 0.0)
+        apf.update_fill(sym, side, 1.0, 100.0, 0.0)
+    rows = np.array([apf.index(s) for s in symbols])
+
+    a = bench("dict Portfolio", pf, lambda t: pf.update_marks(zip(symbols, mark_lists[t])), args.ticks)
+    b = bench("ArrayPortfolio", apf, lambda t: apf.set_marks(rows, marks[t]), args.ticks)
+    print(f"final equity: {a:,.6f} vs {b:,.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Tick replay throughput.
+
+Writes a synthetic recorded day (default 2M ticks over 10 symbols) in the QuoteRecorder
+layout, then times TickReplayAdapter alone and driven through PaperExchange.step().
+
+    python -m benchmarks.bench_tick_replay --ticks 2000000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from woofibot.core.paper_exchange import PaperExchange
+from woofibot.exchange.replay_adapter import TickReplayAdapter
+
+
+def write_day(root: Path, n: int, symbols):
+    day = root / "2025-10-15"
+    day.mkdir(parents=True)
+    rng = np.random.default_rng(7)
+    ts = (1760486400 * 1_000_000 + np.cumsum(rng.integers(1, 40_000, n))).astype("<i8")
+    sym = rng.integers(0, len(symbols), n).astype("<u2")
+    mid = 100.0 * np.exp(np.cumsum(rng.normal(0, 1e-4, n)))
+    cols = {"ts.i8": ts, "sym.u2": sym, "bid.f8": mid - 0.01, "ask.f8": mid + 0.01, "mark.f8": mid}
+    for name, arr in cols.items():
+        np.ascontiguousarray(arr).tofile(day / name)
+    (day / "symbols.json").write_text(json.dumps({s: i for i, s in enumerate(symbols)}))
+    (day / "meta.json").write_text(json.dumps({"depth_levels": 0}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ticks", type=int, default=2_000_000)
+    ap.add_argument("--symbols", type=int, default=10)
+    args = ap.parse_args()
+    symbols = [f"PERP_S{i}_USDC" for i in range(args.symbols)]
+    with tempfile.TemporaryDirectory() as tmp:
+        write_day(Path(tmp), args.ticks, symbols)
+
+        md = TickReplayAdapter(tmp, symbols)
+        t0 = time.perf_counter()
+        while not md.done:
+            md.step()
+        dt = time.perf_counter() - t0
+        print(f"adapter only:        {md.ticks_replayed:,} ticks in {dt:.2f}s = {md.ticks_replayed / dt * 60:,.0f} ticks/min")
+
+        md = TickReplayAdapter(tmp, symbols)
+        ex = PaperExchange(symbols, data_dir=tmp, fee_bps=0.0, market_data_source=md)
+        t0 = time.perf_counter()
+        while not md.done:
+            ex.step()
+        dt = time.perf_counter() - t0
+        print(f"via PaperExchange:   {md.ticks_replayed:,} ticks in {dt:.2f}s = {md.ticks_replayed / dt * 60:,.0f} ticks/min")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,43 @@ from woofibot.utils.config import load_config
 from woofibot.utils.logger import setup_logger
 from woofibot.utils.trade_log import TradeLogger
 from woofibot.utils.trade_log_sqlite import SQLiteTradeLogger
+from woofibot.utils.clock import SimClock, WALL_CLOCK
+from woofibot.utils.http_transport import HTTPTransport
 from woofibot.core.paper_exchange import PaperExchange
 from woofibot.core.woofi_exchange import WOOFiExchange
+from woofibot.core.fill_model import FillModel
+from woofibot.core.state_store import StateStore
 from woofibot.exchange.woofi_poll_adapter import WOOFiPollAdapter
-from woofibot.strategies import LiquidityGapStrategy, MeanReversionStrategy, TrendFollowerStrategy
+from woofibot.exchange.woofi_ws_adapter import WOOFiWSAdapter
+from woofibot.exchange.recorder import QuoteRecorder
+from woofibot.exchange.replay_adapter import TickReplayAdapter
+from woofibot.strategies import build_strategy
 from woofibot.risk.risk_manager import RiskManager
 from woofibot.risk.ti_policy import TIPolicy
 from woofibot.backtest.engine import run_backtest
+from woofibot.backtest.result_cache import BacktestCache
+from woofibot.backtest.shard import run_sharded
 
 
-def build_strategy(name: str, params):
-    if name == "liquidity_gap":
-        return LiquidityGapStrategy(params.get("liquidity_gap", {}))
-    if name == "mean_reversion":
-        return MeanReversionStrategy(params.get("mean_reversion", {}))
-    if name == "trend_follower":
-        return TrendFollowerStrategy(params.get("trend_follower", {}))
-    raise ValueError(f"Unknown strategy {name}")
+def build_market_data(cfg, transport=None, recorder=None):
+    if cfg.woofi.market_data == "ws":
+        if not cfg.woofi.ws_url:
+            raise ValueError("woofi.market_data=ws requires woofi.ws_url")
+        return WOOFiWSAdapter(cfg.woofi.ws_url, cfg.markets, topics=cfg.woofi.ws_topics, recorder=recorder)
+    return WOOFiPollAdapter(
+        rest_orderbook=cfg.woofi.rest_orderbook or "",
+        rest_ticker=cfg.woofi.rest_ticker or None,
+        symbols=cfg.markets,
+        poll_interval_ms=cfg.woofi.poll_interval_ms,
+        rest_bookticker=getattr(cfg.woofi, "rest_bookticker", None) or None,
+        rest_pricechanges=getattr(cfg.woofi, "rest_pricechanges", None) or None,
+        simulate_latency_ms=getattr(cfg.woofi, "simulate_latency_ms", 0),
+        concurrent=cfg.woofi.poll_concurrent,
+        max_workers=cfg.woofi.poll_max_workers,
+        symbol_deadline_ms=cfg.woofi.poll_deadline_ms,
+        transport=transport,
+        recorder=recorder,
+    )
 
 
 def main():
@@ -31,74 +51,166 @@ def main():
     cfg = load_config(args.config)
     logger = setup_logger()
     logger.info(f"Loaded config: {cfg}")
+    # backtests and tick replay run on market time; everything that stamps or compares
+    # times (portfolio, TI rules, loggers) shares the exchange's clock
+    simulated = cfg.mode == "backtest" or getattr(cfg, "exchange", "paper") == "replay"
+    clock = SimClock() if simulated else WALL_CLOCK
     # Select logging backend
     if getattr(cfg, "logging", None) and cfg.logging.backend == "sqlite":
-        trade_logger = SQLiteTradeLogger(cfg.logging.sqlite_path)
+        trade_logger = SQLiteTradeLogger(cfg.logging.sqlite_path, clock=clock)
     else:
         trade_logger = TradeLogger(
             trades_path=getattr(cfg.logging, "trades_csv_path", "logs/trades.csv"),
             equity_path=getattr(cfg.logging, "equity_csv_path", "logs/equity.csv"),
+            clock=clock,
         )
 
     live_client = None
-    ti_policy = TIPolicy(cfg.ti)
+    md = None
+    recorder = None
+    if cfg.mode != "backtest" and cfg.recorder.enabled:
+        recorder = QuoteRecorder(
+            cfg.recorder.data_dir,
+            depth_levels=cfg.recorder.depth_levels,
+            flush_interval_ms=cfg.recorder.flush_interval_ms,
+        )
+    # one pooled keep-alive transport for both market-data polling and live orders
+    transport = HTTPTransport(pool_size=cfg.woofi.http_pool_size, keep_alive=cfg.woofi.http_keep_alive)
+    ti_policy = TIPolicy(cfg.ti, clock=clock)
+    fill_model = FillModel.from_config(cfg.backtest)
     if cfg.mode == "backtest":
-        exch = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps)
+        # built only when the backtest actually simulates: a result-cache hit or a sharded
+        # run never loads the bars here
+        def build_exchange():
+            return PaperExchange(
+                cfg.markets,
+                cfg.backtest.data_dir,
+                cfg.backtest.fee_bps,
+                fill_model=fill_model,
+                max_ffill_sec=cfg.backtest.max_ffill_sec,
+                store_dir=cfg.backtest.store_dir,
+                start=cfg.backtest.start,
+                end=cfg.backtest.end,
+                timeframe=cfg.backtest.timeframe,
+                cache_dir=cfg.backtest.cache_dir,
+                clock=clock,
+                portfolio=cfg.portfolio,
+            )
     else:
         ex_kind = getattr(cfg, "exchange", "paper")
         if ex_kind == "woofi-live":
             # Use WOOFi poller for live prices, keep PaperExchange as a shadow portfolio/logging engine
-            md = WOOFiPollAdapter(
-                rest_orderbook=cfg.woofi.rest_orderbook or "",
-                rest_ticker=cfg.woofi.rest_ticker or None,
-                symbols=cfg.markets,
-                poll_interval_ms=cfg.woofi.poll_interval_ms,
-                rest_bookticker=getattr(cfg.woofi, "rest_bookticker", None) or None,
-                rest_pricechanges=getattr(cfg.woofi, "rest_pricechanges", None) or None,
-                simulate_latency_ms=getattr(cfg.woofi, "simulate_latency_ms", 0),
-            )
-            exch = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps, market_data_source=md)
+            md = build_market_data(cfg, transport, recorder)
+            exch = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps, market_data_source=md, fill_model=fill_model, portfolio=cfg.portfolio)
             # instantiate live REST client (testnet defaults; requires env keys)
-            live_client = WOOFiExchange(base_url=(cfg.woofi.order_base_url or None), testnet=getattr(cfg.woofi, "testnet", True))
-        elif ex_kind == "woofi-paper":
-            md = WOOFiPollAdapter(
-                rest_orderbook=cfg.woofi.rest_orderbook or "",
-                rest_ticker=cfg.woofi.rest_ticker or None,
-                symbols=cfg.markets,
-                poll_interval_ms=cfg.woofi.poll_interval_ms,
-                rest_bookticker=getattr(cfg.woofi, "rest_bookticker", None) or None,
-                rest_pricechanges=getattr(cfg.woofi, "rest_pricechanges", None) or None,
-                simulate_latency_ms=getattr(cfg.woofi, "simulate_latency_ms", 0),
+            live_client = WOOFiExchange(
+                base_url=(cfg.woofi.order_base_url or None),
+                testnet=getattr(cfg.woofi, "testnet", True),
+                transport=transport,
+            )
+        elif ex_kind == "replay":
+            # recorded ticks through the normal loop; pacing (if any) is done by the adapter
+            md = TickReplayAdapter(
+                cfg.replay.data_dir,
+                cfg.markets,
+                speed=cfg.replay.speed,
+                step_ms=cfg.replay.step_ms,
+                start=cfg.replay.start,
+                end=cfg.replay.end,
             )
-            exch = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps, market_data_source=md)
+            exch = PaperExchange(
+                cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps, market_data_source=md, fill_model=fill_model, clock=clock,
+                portfolio=cfg.portfolio,
+            )
+        elif ex_kind == "woofi-paper":
+            md = build_market_data(cfg, transport, recorder)
+            exch = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps, market_data_source=md, fill_model=fill_model, portfolio=cfg.portfolio)
         else:
-            exch = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps)
+            exch = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps, fill_model=fill_model, portfolio=cfg.portfolio)
 
     strat = build_strategy(cfg.strategy, cfg.strategy_params)
     # let strategy know about order_size from top-level config as optional override
     if hasattr(strat, "params") and "order_size_override" not in strat.params:
         strat.params["order_size_override"] = cfg.order_size
 
-    risk_mgr = RiskManager(exch.portfolio, cfg.risk)
-
     if cfg.mode == "backtest":
         logger.info("Starting backtest...")
-        results = run_backtest(exch, strat, risk_mgr, max_steps=1000, trade_logger=trade_logger)
-        logger.info(f"Backtest finished: {len(results)} orders executed")
+        def report(st):
+            logger.info(f"Backtest progress: {st['steps']} steps, {st['fills']} fills, "
+                        f"{st['steps_per_sec']:,.0f} steps/s, {st['fills_per_sec']:,.1f} fills/s (ts={st['ts']})")
+
+        if cfg.backtest.shards > 1:
+            merged = run_sharded(cfg, shards=cfg.backtest.shards)
+            for res in merged["fills"]:
+                trade_logger.log_trade(res, equity=res.get("equity_after"), cash=res.get("cash_after"))
+            summary = merged["summary"]
+            logger.info(f"Backtest finished: {summary['fills']} orders executed over {summary['steps']} steps on "
+                        f"{summary['shards']} shards in {summary['elapsed_sec']:.2f}s, max drawdown "
+                        f"{summary['max_drawdown_pct']:.2f}%, final equity {summary['final_equity']:.2f}")
+            return
+        if cfg.backtest.result_cache_dir:
+            cache = BacktestCache(
+                cfg.backtest.result_cache_dir,
+                max_entries=cfg.backtest.result_cache_max_entries,
+                max_bytes=int(cfg.backtest.result_cache_max_mb * 1e6),
+            )
+            def build():
+                exch = build_exchange()
+                return exch, RiskManager(exch.portfolio, cfg.risk)
+
+            summary, hit = cache.run(cfg, build, strat, trade_logger=trade_logger, progress=report, ti_policy=ti_policy)
+            if hit:
+                logger.info("Backtest result served from cache (identical config, code and data)")
+        else:
+            exch = build_exchange()
+            risk_mgr = RiskManager(exch.portfolio, cfg.risk)
+            summary = run_backtest(exch, strat, risk_mgr, trade_logger=trade_logger, progress=report, ti_policy=ti_policy)
+        logger.info(f"Backtest finished: {summary['fills']} orders executed over {summary['steps']} steps in "
+                    f"{summary['elapsed_sec']:.2f}s ({summary['steps_per_sec']:,.0f} steps/s), "
+                    f"max drawdown {summary['max_drawdown_pct']:.2f}%, final equity {summary['final_equity']:.2f}")
         return
 
+    risk_mgr = RiskManager(exch.portfolio, cfg.risk)
+    replay = getattr(cfg, "exchange", "paper") == "replay"
+    state = None
+    if cfg.state.dir and not replay:
+        # resume portfolio, TI timers and risk baseline from the last checkpoint + journal
+        state = StateStore(
+            cfg.state.dir,
+            snapshot_every=cfg.state.snapshot_every,
+            snapshot_interval_sec=cfg.state.snapshot_interval_sec,
+            fsync=cfg.state.fsync,
+        )
+        t0 = time.perf_counter()
+        if state.restore(exch.portfolio, ti_policy, risk_mgr):
+            risk_mgr.sync_triggers()
+            logger.info(f"Restored state from {cfg.state.dir} ({state.replayed} journal entries) in "
+                        f"{(time.perf_counter() - t0) * 1000:.1f} ms: cash {exch.portfolio.cash_usd:.2f}, "
+                        f"{sum(1 for p in exch.portfolio.positions.values() if p.qty)} open positions")
+        else:
+            state.snapshot()  # persist the starting equity baseline
     logger.info("Starting paper loop... (Ctrl+C to stop)")
+    loop_i = 0
+    t_start = time.perf_counter()
     try:
         while True:
             exch.step()
+            if replay and md.done:
+                elapsed = time.perf_counter() - t_start
+                logger.info(f"Replay finished: {md.ticks_replayed} ticks in {elapsed:.2f}s "
+                            f"({md.ticks_replayed / max(elapsed, 1e-9):,.0f} ticks/s)")
+                break
+            loop_i += 1
+            # exch.step() already pushed the new marks into the portfolio for risk calculations
             prices = exch.get_prices()
-            # update marks in portfolio for risk calculations
-            for sym, mk in prices.items():
-                exch.portfolio.update_mark(sym, mk)
+            risk_mgr.on_tick()
 
-            # ---- auto-close check ----
-            close_od = risk_mgr.check_auto_close(prices)
-            if close_od:
+            # ---- auto-close: TP/SL/trailing triggers crossed by this tick's mark updates ----
+            closes = risk_mgr.on_marks((s, prices[s]) for s in exch.changed_symbols if s in prices)
+            # ---- and positions held longer than risk.max_position_age_sec ----
+            closing = {od["symbol"] for od in closes}
+            closes += [od for od in risk_mgr.expired() if od["symbol"] not in closing]
+            for close_od in closes:
                 # send live close first (if enabled), then shadow it locally
                 if live_client:
                     try:
@@ -106,40 +218,70 @@ def main():
                         logger.info(f"LIVE_SENT close: {close_od}")
                     except Exception as e:
                         logger.warning(f"LIVE_CLOSE_FAILED: {e}")
-                res = exch.place_order(close_od["symbol"], close_od["side"], close_od["qty_quote"])
+                res = exch.place_order(close_od["symbol"], close_od["side"], close_od["qty_quote"], reduce_only=True)
+                risk_mgr.on_fill(close_od["symbol"], res["qty_quote"])
                 ti_policy.record_fill(close_od["symbol"])
+                if state is not None:
+                    state.record_fill(close_od["symbol"])
                 trade_logger.log_trade(res, equity=res.get("equity_after"), cash=res.get("cash_after"))
                 logger.info(f"Auto-closed: {res} reason={close_od['reason']}\n")
-            else:
-                # ---- trading block ----
-                order_notional = cfg.order_size
-                if risk_mgr.can_trade(prices, order_notional):
-                    orders = strat.on_tick(prices, exch, risk_mgr)
-                    for od in orders:
-                        # TI policy filters to avoid spam / ping-pong / micro trades
-                        if not ti_policy.allow_signal(od, exch.portfolio, prices):
-                            continue
-                        if live_client:
-                            try:
-                                live_client.place_order(od["symbol"], od["side"], od["qty_quote"])
-                                logger.info(f"LIVE_SENT: {od}")
-                            except Exception as e:
-                                logger.warning(f"LIVE_SEND_FAILED: {e}")
-                        res = exch.place_order(od["symbol"], od["side"], od["qty_quote"])
-                        ti_policy.record_fill(od["symbol"]) 
-                        trade_logger.log_trade(res, equity=res.get("equity_after"), cash=res.get("cash_after"))
-                        logger.info(f"Filled: {res}\n")
+
+            # ---- trading block (symbols closed above sit this tick out) ----
+            if closes:
+                closed = {od["symbol"] for od in closes}
+                prices = {s: p for s, p in prices.items() if s not in closed}
+            order_notional = cfg.order_size
+            if risk_mgr.can_trade(order_notional=order_notional):
+                orders = strat.on_tick(prices, exch, risk_mgr)
+                for od in orders:
+                    # TI policy filters to avoid spam / ping-pong / micro trades
+                    if not ti_policy.allow_signal(od, exch.portfolio, prices):
+                        continue
+                    if live_client:
+                        try:
+                            live_client.place_order(od["symbol"], od["side"], od["qty_quote"])
+                            logger.info(f"LIVE_SENT: {od}")
+                        except Exception as e:
+                            logger.warning(f"LIVE_SEND_FAILED: {e}")
+                    res = exch.place_order(od["symbol"], od["side"], od["qty_quote"])
+                    risk_mgr.on_fill(od["symbol"], res["qty_quote"])
+                    ti_policy.record_fill(od["symbol"])
+                    if state is not None:
+                        state.record_fill(od["symbol"])
+                    trade_logger.log_trade(res, equity=res.get("equity_after"), cash=res.get("cash_after"))
+                    logger.info(f"Filled: {res}\n")
+
+            if state is not None:
+                state.tick()
 
             # ---- equity snapshot AFTER potential fills ----
-            prices = exch.get_prices()  # refresh marks in case fills affected state
-            equity = exch.portfolio.equity(prices)
+            if replay and loop_i % cfg.replay.equity_log_every:
+                continue  # replay runs unthrottled; sample equity instead of logging every tick
+            equity = exch.portfolio.equity()
             cash = exch.portfolio.cash_usd
             realized_total = exch.portfolio.realized_pnl_usd
-            unrealized = exch.portfolio.unrealized_total(prices)
+            unrealized = exch.portfolio.unrealized_total()
             trade_logger.log_equity(equity, cash, realized_total=realized_total, unrealized=unrealized)
-            time.sleep(cfg.loop_interval_ms / 1000.0)
+            if not replay:
+                time.sleep(cfg.loop_interval_ms / 1000.0)
     except KeyboardInterrupt:
         logger.info("Stopped.")
+    finally:
+        if state is not None:
+            state.close()
+        if md is not None and hasattr(md, "cycle_stats"):
+            logger.info(f"Market data poll stats: {md.cycle_stats()}")
+        if md is not None and hasattr(md, "stream_stats"):
+            logger.info(f"Market data stream stats: {md.stream_stats()}")
+        if md is not None and hasattr(md, "close"):
+            md.close()
+        if recorder is not None:
+            recorder.close()
+            logger.info(f"Recorded {recorder.rows_written} quote rows ({recorder.bytes_written} bytes)")
+        http_stats = transport.stats()
+        if http_stats:
+            logger.info(f"HTTP stats: {http_stats}")
+        transport.close()
 
 
 if __name__ == "__main__":
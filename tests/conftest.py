@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from woofibot.utils.config import Config
+
+
+def synthetic_close(bars, seed=0):
+    """Seeded random walk around 100, always positive."""
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.005, bars)))
+
+
+@pytest.fixture
+def write_candles(tmp_path):
+    """
+    ``write_candles(symbols, bars, seed)`` writes a 1m candle CSV per symbol and returns the
+    directory (``tmp_path`` unless ``data_dir`` is given). Symbol ``k`` walks with seed
+    ``seed + k``; ``close`` pins the prices instead, ``start``/``interval`` (seconds) place
+    the bars in time.
+    """
+
+    def write(symbols=("ETH-USDT",), bars=400, seed=0, start=0, interval=60, close=None, data_dir=None):
+        data_dir = tmp_path if data_dir is None else data_dir
+        ts = start + interval * np.arange(bars)
+        for k, sym in enumerate(symbols):
+            c = synthetic_close(bars, seed + k) if close is None else np.broadcast_to(np.asarray(close, dtype=float), (bars,))
+            pd.DataFrame({"timestamp": ts, "open": c, "high": c, "low": c, "close": c, "volume": 1.0}).to_csv(
+                data_dir / f"{sym}_1m.csv", index=False
+            )
+        return data_dir
+
+    return write
+
+
+@pytest.fixture
+def backtest_cfg(tmp_path, write_candles):
+    """
+    ``backtest_cfg(symbols, bars, seed, **overrides)``: writes the candles (skipped when
+    ``bars`` is None, i.e. they are already on disk) and returns a liquidity_gap backtest
+    Config over them. Dict overrides (``risk``, ``backtest``, ...) update the defaults.
+    """
+
+    def make(symbols=("ETH-USDT",), bars=400, seed=0, **overrides):
+        if bars is not None:
+            write_candles(symbols, bars, seed)
+        conf = {
+            "mode": "backtest",
+            "strategy": "liquidity_gap",
+            "markets": list(symbols),
+            "order_size": 20.0,
+            "risk": {"max_exposure_usd": 100.0, "daily_loss_limit_pct": 50.0},
+            "strategy_params": {"liquidity_gap": {"min_spread_pct": 0.0}},
+            "ti": {"min_order_notional": 0.0},
+            "backtest": {"data_dir": str(tmp_path), "cache_dir": None},
+        }
+        for key, value in overrides.items():
+            conf[key] = {**conf[key], **value} if isinstance(value, dict) and isinstance(conf.get(key), dict) else value
+        return Config(**conf)
+
+    return make
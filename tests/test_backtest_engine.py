@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from woofibot.backtest.engine import iter_backtest, run_backtest
+from woofibot.core.paper_exchange import PaperExchange
+from woofibot.risk.risk_manager import RiskManager
+from woofibot.utils.config import RiskConfig
+
+RISK = RiskConfig(max_exposure_usd=1e9, daily_loss_limit_pct=100.0)
+
+
+class EveryNth:
+    def __init__(self, n):
+        self.n = n
+        self.ticks = 0
+
+    def on_tick(self, prices, exchange, risk_mgr):
+        self.ticks += 1
+        if self.ticks % self.n:
+            return []
+        return [{"symbol": sym, "side": "buy", "qty_quote": 10.0} for sym in prices]
+
+
+def _exchange(write_candles, n):
+    return PaperExchange(["ETH-USDT"], data_dir=str(write_candles(bars=n)), fee_bps=0.0)
+
+
+def test_run_backtest_runs_to_end_of_data(write_candles):
+    ex = _exchange(write_candles, 2500)
+    reports = []
+    summary = run_backtest(ex, EveryNth(100), RiskManager(ex.portfolio, RISK), progress=reports.append, progress_every_sec=0.0)
+    assert summary["steps"] == 2500
+    assert summary["fills"] == 25
+    assert summary["steps_per_sec"] > 0 and summary["max_drawdown_pct"] >= 0
+    assert [r["steps"] for r in reports] == [1024, 2048]
+
+
+def test_iter_backtest_streams_fills(write_candles):
+    ex = _exchange(write_candles, 500)
+    fills = iter_backtest(ex, EveryNth(50), RiskManager(ex.portfolio, RISK), max_steps=120)
+    first = next(fills)
+    assert first["symbol"] == "ETH-USDT" and ex.ptr == 50
+    assert len(list(fills)) == 1
+
+
+def test_array_portfolio_backtest_matches_dict(tmp_path, write_candles):
+    write_candles(["ETH-USDT", "BTC-USDT", "SOL-USDT"], bars=600)
+    sol = pd.read_csv(tmp_path / "SOL-USDT_1m.csv")
+    sol.loc[len(sol) - 1, "close"] = np.nan  # a bad last bar must not reach either portfolio's marks
+    sol.to_csv(tmp_path / "SOL-USDT_1m.csv", index=False)
+    runs = {}
+    for impl in ("dict", "array"):
+        ex = PaperExchange(["ETH-USDT", "BTC-USDT", "SOL-USDT", "NO-DATA"], data_dir=str(tmp_path), fee_bps=2.0, portfolio=impl)
+        fills = list(iter_backtest(ex, EveryNth(7), RiskManager(ex.portfolio, RISK)))
+        runs[impl] = (fills, ex.portfolio.equity(), ex.portfolio.open_notional(), dict(ex.portfolio.positions))
+    (fd, eqd, notd, posd), (fa, eqa, nota, posa) = runs["dict"], runs["array"]
+    assert len(fd) == len(fa) > 0
+    for a, b in zip(fd, fa):
+        assert a["symbol"] == b["symbol"] and a["price"] == b["price"] and a["pos_qty"] == b["pos_qty"]
+        assert np.isclose(a["equity_after"], b["equity_after"], rtol=1e-12)
+    assert np.isclose(eqd, eqa, rtol=1e-12) and np.isclose(notd, nota, rtol=1e-12)
+    assert posd == posa
+    assert np.isfinite(eqa)
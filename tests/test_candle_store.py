@@ -0,0 +1,35 @@
+import numpy as np
+
+from woofibot.core.paper_exchange import PaperExchange
+from woofibot.data.candle_store import CandleStore, convert_csv, to_epoch
+
+
+def test_convert_and_load_date_range(tmp_path, write_candles):
+    day = to_epoch("2024-01-02")
+    n = 1440 + 4  # two bars before the day, two after
+    write_candles(bars=n, start=day - 120, close=100.0 + np.arange(n))
+    ts = day - 120 + 60 * np.arange(n)
+    convert_csv(tmp_path / "ETH-USDT_1m.csv", tmp_path / "store", chunksize=500)
+
+    store = CandleStore(tmp_path / "store")
+    assert store.has("ETH-USDT") and store.symbols() == ["ETH-USDT"]
+    full = store.load("ETH-USDT")
+    assert isinstance(full["close"], np.memmap)
+    assert np.array_equal(full["timestamp"], ts)
+
+    one_day = store.load("ETH-USDT", start="2024-01-02", end="2024-01-02")
+    assert len(one_day["timestamp"]) == 1440
+    assert one_day["timestamp"][0] == day and one_day["close"][0] == 102.0
+
+
+def test_paper_exchange_reads_store_before_csv(tmp_path, write_candles):
+    write_candles(bars=10, close=100.0 + np.arange(10))
+    convert_csv(tmp_path / "ETH-USDT_1m.csv", tmp_path / "store")
+    (tmp_path / "ETH-USDT_1m.csv").unlink()  # prove the store is what gets read
+
+    ex = PaperExchange(["ETH-USDT"], data_dir=str(tmp_path), fee_bps=0.0, store_dir=str(tmp_path / "store"), start=120, end=300)
+    closes = []
+    for _ in range(4):
+        ex.step()
+        closes.append(ex.prices["ETH-USDT"])
+    assert closes == [102.0, 103.0, 104.0, 105.0]
@@ -0,0 +1,92 @@
+import math
+from pathlib import Path
+
+import pytest
+
+from woofibot.core.fill_model import FillModel, walk_book
+from woofibot.core.orderbook import L2Book
+from woofibot.core.paper_exchange import PaperExchange
+
+
+class BookStub:
+    def __init__(self, sym, book):
+        self.sym = sym
+        self.book = book
+
+    def get_orderbook(self, symbol):
+        return self.book.top()
+
+    def get_mark(self, symbol):
+        return self.book.mid()
+
+    def get_book(self, symbol):
+        return self.book
+
+    def step(self):
+        pass
+
+
+def test_walk_book_partial_last_level():
+    book = L2Book("A")
+    book.apply_snapshot(bids=[], asks=[[100.0, 1.0], [101.0, 1.0], [102.0, 10.0]])
+    res = walk_book(book, "buy", 301.0)
+    # 100 + 101 quote on the first two levels, 100 quote on the third
+    assert res.levels[0] == (100.0, 1.0) and res.levels[1] == (101.0, 1.0)
+    assert res.levels[2][1] == pytest.approx(100.0 / 102.0)
+    assert res.price == pytest.approx(301.0 / (2.0 + 100.0 / 102.0))
+    assert not res.depth_exhausted
+
+
+def test_paper_exchange_walks_depth_for_large_orders():
+    sym = "ETH-USDT"
+    book = L2Book(sym)
+    book.apply_snapshot(bids=[[99.0, 5.0], [98.0, 100.0]], asks=[[101.0, 1.0], [103.0, 100.0]])
+    ex = PaperExchange([sym], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=0.0, market_data_source=BookStub(sym, book))
+    ex.step()
+    small = ex.place_order(sym, "buy", qty_quote=50.0)
+    assert small["price"] == pytest.approx(101.0)
+    assert small["slippage_bps"] == pytest.approx(100.0)  # half spread: 1 / 100
+    big = ex.place_order(sym, "buy", qty_quote=5000.0)
+    assert big["price"] > 102.0
+    assert len(big["levels"]) == 2
+    assert big["slippage_bps"] > small["slippage_bps"]
+    assert math.isclose(sum(q for _, q in big["levels"]) * big["price"], 5000.0, rel_tol=1e-9)
+
+
+def test_impact_model_without_depth():
+    fm = FillModel(impact_model="sqrt", impact_coef_bps=10.0, impact_ref_notional=10000.0)
+    res = fm.fill("sell", 40000.0, best_bid=100.0, best_ask=100.1)
+    assert res.price == pytest.approx(100.0 * (1 - 20.0 / 10000.0))
+    assert FillModel().fill("buy", 1e6, 100.0, 100.1).price == 100.1
+
+
+def test_reduce_only_close_is_priced_for_the_capped_size():
+    sym = "ETH-USDT"
+    book = L2Book(sym)
+    book.apply_snapshot(bids=[[100.0, 0.5], [90.0, 10.0]], asks=[[101.0, 10.0]])
+    ex = PaperExchange([sym], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=10.0, market_data_source=BookStub(sym, book))
+    ex.step()
+    ex.place_order(sym, "buy", qty_quote=101.0)
+    # 200 quote would walk 2.17 ETH of bids; only the 1 ETH held is sold, 0.5 at each level
+    res = ex.place_order(sym, "sell", qty_quote=200.0, reduce_only=True)
+    assert res["pos_qty"] == 0.0
+    assert res["price"] == pytest.approx(95.0)
+    assert res["levels"] == [(100.0, 0.5), (90.0, 0.5)]
+    assert res["qty_quote"] == pytest.approx(95.0) and res["fee"] == pytest.approx(0.095)
+
+
+def test_walk_book_fills_past_the_book_at_the_worst_level():
+    book = L2Book("A")
+    book.apply_snapshot(bids=[[100.0, 1.0], [99.0, 1.0]], asks=[])
+    res = walk_book(book, "sell", 3.0, notional=False)
+    assert res.depth_exhausted and res.levels == [(100.0, 1.0), (99.0, 2.0)]
+    assert res.price == pytest.approx((100.0 + 2 * 99.0) / 3.0)
+
+
+@pytest.mark.parametrize("model", ["linear", "sqrt"])
+def test_oversized_sell_never_prices_at_or_below_zero(model):
+    fm = FillModel(impact_model=model, impact_coef_bps=100.0, impact_ref_notional=1000.0)
+    res = fm.fill("sell", 1e9, best_bid=100.0, best_ask=100.1)
+    assert res.price > 0 and res.qty_base > 0
+    capped = fm.fill_base("sell", 1e7, best_bid=100.0, best_ask=100.1)
+    assert capped.price == pytest.approx(100.0 * (1 - FillModel.MAX_IMPACT_BPS / 10000.0)) and capped.price > 0
@@ -0,0 +1,54 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from woofibot.utils.http_transport import HTTPTransport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"bids": [[100.0, 1.0]], "asks": [[101.0, 1.0]]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_keep_alive_reuses_connections(server_url):
+    http = HTTPTransport(pool_size=4)
+    for _ in range(5):
+        assert http.get(server_url + "/v1/orderbook/X", endpoint="orderbook", timeout=5).json()["bids"]
+    st = http.stats()["orderbook"]
+    assert st["requests"] == 5
+    assert st["new_connections"] == 1
+    assert st["reuse_ratio"] == pytest.approx(0.8)
+    assert st["bytes_in"] > 0 and st["p50_ms"] is not None
+    http.close()
+
+
+def test_no_keep_alive_opens_new_connection_each_time(server_url):
+    http = HTTPTransport(keep_alive=False)
+    for _ in range(3):
+        http.get(server_url + "/ticker", timeout=5)
+    (st,) = http.stats().values()
+    assert st["new_connections"] == 3
+    assert st["reuse_ratio"] == 0.0
+    http.close()
@@ -0,0 +1,45 @@
+import pytest
+
+from woofibot.core.orderbook import L2Book
+
+
+def _book():
+    b = L2Book("X")
+    b.apply_snapshot(
+        bids=[["99.0", "2"], ["100.0", "1"], ["98.0", "5"]],
+        asks=[[101.0, 1.0], [102.0, 2.0], [103.0, 4.0]],
+    )
+    return b
+
+
+def test_snapshot_sorted_and_top():
+    b = _book()
+    assert b.top() == (100.0, 101.0)
+    px, sz = b.levels("bid")
+    assert px.tolist() == [100.0, 99.0, 98.0]
+    assert sz.tolist() == [1.0, 2.0, 5.0]
+
+
+def test_deltas_insert_update_delete():
+    b = _book()
+    b.apply_deltas(bids=[[100.5, 3.0], [99.0, 0.0]], asks=[[101.0, 0.5]])
+    assert b.levels("bid")[0].tolist() == [100.5, 100.0, 98.0]
+    assert b.best_ask() == 101.0 and b.levels("ask")[1][0] == 0.5
+    b.apply_delta("ask", 101.0, 0)
+    assert b.best_ask() == 102.0
+
+
+def test_vwap_and_depth_queries():
+    b = _book()
+    # buy 2 base: 1 @ 101 + 1 @ 102
+    vwap, filled = b.vwap_for_size("buy", 2.0)
+    assert vwap == pytest.approx(101.5) and filled == 2.0
+    # sell 250 quote: 100 @ 100, then 150 quote at 99
+    vwap, filled = b.vwap_for_notional("sell", 250.0)
+    assert filled == 250.0
+    assert vwap == pytest.approx(250.0 / (1.0 + 150.0 / 99.0))
+    assert b.depth_to_notional("buy", 200.0) == (102.0, 2)
+    assert b.notional_within_bps("buy", 100.0) == pytest.approx(101.0 + 204.0)
+    # more than the book holds -> partial fill at the whole-side VWAP
+    vwap, filled = b.vwap_for_size("buy", 100.0)
+    assert filled == 7.0 and vwap == pytest.approx((101 + 204 + 412) / 7.0)
@@ -1,9 +1,15 @@
 import math
 from pathlib import Path
 
+import pytest
+
 from woofibot.core.paper_exchange import PaperExchange
 
 
+# every test runs against both portfolio implementations
+pytestmark = pytest.mark.parametrize("portfolio", ["dict", "array"])
+
+
 class MarketStub:
     def __init__(self, symbols):
         self.bb = {s: None for s in symbols}
@@ -25,12 +31,12 @@ class MarketStub:
         pass
 
 
-def test_long_open_close_realized_unrealized():
+def test_long_open_close_realized_unrealized(portfolio):
     sym = "ETH-USDT"
     md = MarketStub([sym])
     # initial quotes 100/100 -> mark 100
     md.set_quote(sym, 100.0, 100.0, 100.0)
-    ex = PaperExchange([sym], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=0.0, market_data_source=md)
+    ex = PaperExchange([sym], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=0.0, market_data_source=md, portfolio=portfolio)
 
     # advance to set mark price
     ex.step()
@@ -71,11 +77,11 @@ def test_long_open_close_realized_unrealized():
     assert math.isclose(ex.portfolio.positions[sym].qty, 0.0, abs_tol=1e-12)
 
 
-def test_short_open_close():
+def test_short_open_close(portfolio):
     sym = "ETH-USDT"
     md = MarketStub([sym])
     md.set_quote(sym, 200.0, 200.0, 200.0)
-    ex = PaperExchange([sym], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=0.0, market_data_source=md)
+    ex = PaperExchange([sym], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=0.0, market_data_source=md, portfolio=portfolio)
     ex.step()
 
     # open short: sell 100 USDT at 200 => qty_base = 0.5 short
@@ -95,11 +101,11 @@ def test_short_open_close():
     assert math.isclose(ex.portfolio.positions[sym].qty, 0.0, abs_tol=1e-12)
 
 
-def test_get_orderbook_uses_external_quotes():
+def test_get_orderbook_uses_external_quotes(portfolio):
     sym = "ETH-USDT"
     md = MarketStub([sym])
     md.set_quote(sym, 100.0, 101.0)
-    ex = PaperExchange([sym], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=0.0, market_data_source=md)
+    ex = PaperExchange([sym], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=0.0, market_data_source=md, portfolio=portfolio)
     bb, ba = ex.get_orderbook(sym)
     assert math.isclose(bb, 100.0, rel_tol=1e-9)
     assert math.isclose(ba, 101.0, rel_tol=1e-9)
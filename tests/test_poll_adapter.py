@@ -0,0 +1,113 @@
+import time
+
+from woofibot.exchange.woofi_poll_adapter import WOOFiPollAdapter
+
+
+class ScriptedAdapter(WOOFiPollAdapter):
+    """Adapter whose per-symbol fetch is scripted instead of hitting REST."""
+
+    def __init__(self, symbols, delays=None, **kw):
+        super().__init__(rest_orderbook="", rest_ticker=None, symbols=symbols, poll_interval_ms=0, **kw)
+        self.delays = delays or {}
+        self.calls = {s: 0 for s in symbols}
+
+    def _fetch_symbol(self, symbol):
+        self.calls[symbol] += 1
+        time.sleep(self.delays.get(symbol, 0.0))
+        self.best_quotes[symbol] = (100.0, 101.0)
+        self.marks[symbol] = 100.5
+
+
+def test_slow_symbol_does_not_stall_cycle():
+    syms = ["A", "B", "SLOW"]
+    ad = ScriptedAdapter(syms, delays={"SLOW": 0.5}, concurrent=True, symbol_deadline_ms=100)
+    t0 = time.perf_counter()
+    ad.step()
+    assert time.perf_counter() - t0 < 0.4
+    assert ad.get_mark("A") == 100.5 and ad.get_mark("B") == 100.5
+    assert ad.get_mark("SLOW") is None
+    assert ad.cycle_stats()["inflight"] == 1
+
+    # still in flight -> not resubmitted
+    ad.step()
+    assert ad.calls["SLOW"] == 1
+    time.sleep(0.6)
+    assert ad.get_mark("SLOW") == 100.5
+    ad.close()
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeTransport:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = []
+
+    def get(self, url, endpoint=None, timeout=None):
+        self.calls.append(url)
+        return FakeResponse(self.payload)
+
+
+def test_pricechanges_downloaded_once_per_cycle():
+    rows = [{"symbol": f"PERP_{i}_USDC", "last_price": str(10.0 + i)} for i in range(140)]
+    http = FakeTransport({"success": True, "data": {"rows": rows}})
+    calls = http.calls
+    syms = ["PERP_1_USDC", "PERP_7_USDC", "PERP_139_USDC"]
+    for concurrent in (False, True):
+        calls.clear()
+        ad = WOOFiPollAdapter(None, None, syms, poll_interval_ms=0, rest_pricechanges="http://pc",
+                              concurrent=concurrent, symbol_deadline_ms=1000, transport=http)
+        ad.step()
+        assert len(calls) == 1
+        assert ad.get_mark("PERP_7_USDC") == 17.0
+        assert ad.get_orderbook("PERP_139_USDC") == (149.0, 149.0)
+        ad.step()
+        assert len(calls) == 2
+        ad.close()
+
+
+class FlakyTransport:
+    """Ticker endpoint that is down for symbols containing BAD."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, endpoint=None, timeout=None):
+        self.calls.append(url)
+        if "BAD" in url:
+            raise ConnectionError("connection refused")
+        return FakeResponse({"last": "100.0"})
+
+
+def test_failing_symbol_backs_off_without_sleeping():
+    for concurrent in (False, True):
+        http = FlakyTransport()
+        ad = WOOFiPollAdapter(None, "http://t/{symbol}", ["A", "BAD"], poll_interval_ms=0,
+                              concurrent=concurrent, symbol_deadline_ms=200, transport=http)
+        t0 = time.perf_counter()
+        ad.step()
+        ad.step()
+        assert time.perf_counter() - t0 < 0.5
+        assert http.calls.count("http://t/BAD") == 1  # second cycle skipped while backing off
+        assert http.calls.count("http://t/A") == 2
+        assert ad.get_mark("A") == 100.0 and ad.get_mark("BAD") is None
+        ad.close()
+
+
+def test_default_deadline_does_not_wait_a_poll_interval():
+    ad = ScriptedAdapter(["A", "SLOW"], delays={"SLOW": 0.5}, concurrent=True)
+    ad.poll_interval_ms = 1000
+    t0 = time.perf_counter()
+    ad.step()
+    assert time.perf_counter() - t0 < 0.3
+    assert ad.get_mark("A") == 100.5
+    ad.close()
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from woofibot.core.portfolio import Portfolio, Position
 
@@ -14,3 +15,67 @@ def test_open_notional_long_short_and_fallback():
     prices = {"A": 2100.0, "B": 2900.0}
     notional = pf.open_notional(prices)
     assert notional == pytest.approx(210.0 + 580.0 + 50.0, rel=1e-9)
+
+
+def test_running_totals_match_full_scan():
+    import random
+
+    rng = random.Random(7)
+    pf = Portfolio(cash_usd=10_000.0, check_totals=True)
+    syms = ["A", "B", "C", "D"]
+    for _ in range(2000):
+        sym = rng.choice(syms)
+        if rng.random() < 0.5:
+            pf.update_mark(sym, rng.uniform(50.0, 150.0))
+        else:
+            side = rng.choice(["buy", "sell"])
+            pf.update_fill(sym, side, rng.uniform(0.01, 2.0), rng.uniform(50.0, 150.0), 0.01)
+        marks = dict(pf.latest_prices())
+        assert pf.equity() == pytest.approx(pf.equity(marks), rel=1e-9, abs=1e-6)
+        assert pf.unrealized_total() == pytest.approx(pf.unrealized_total(marks), rel=1e-9, abs=1e-6)
+        assert pf.open_notional() == pytest.approx(pf.open_notional(marks), rel=1e-9, abs=1e-6)
+
+
+def test_consistency_check_catches_direct_edits():
+    pf = Portfolio(check_totals=True)
+    pf.update_fill("A", "buy", 1.0, 100.0, 0.0)
+    pf.positions["B"] = Position(qty=2.0, avg_price=50.0)
+    with pytest.raises(RuntimeError):
+        pf.equity()
+    pf.rebuild_totals()
+    assert pf.open_notional() == pytest.approx(200.0)
+
+
+def test_array_portfolio_grows_and_views_positions():
+    from woofibot.core.array_portfolio import ArrayPortfolio
+
+    pf = ArrayPortfolio(["A"])
+    syms = [f"S{i}" for i in range(20)]
+    for i, sym in enumerate(syms):
+        pf.update_fill(sym, "buy" if i % 2 else "sell", 1.0, 10.0 + i, 0.0)
+    assert list(pf.positions) == syms and "A" not in pf.positions
+    assert pf.positions["S3"] == Position(qty=1.0, avg_price=13.0, ts=pf.positions["S3"].ts)
+    pf.set_marks(np.array([pf.index("S3"), pf.index("S4")]), np.array([15.0, 12.0]))
+    marks = {"S3": 15.0, "S4": 12.0}
+    assert pf.unrealized_total() == pytest.approx(2.0 + 2.0)
+    assert pf.open_notional() == pytest.approx(pf.open_notional(marks))
+    assert pf.latest_prices() == marks
+
+
+@pytest.mark.parametrize("bad", [float("nan"), float("inf")])
+def test_non_finite_marks_are_ignored(bad):
+    from woofibot.risk.risk_manager import RiskManager
+    from woofibot.utils.config import RiskConfig
+
+    pf = Portfolio(cash_usd=1000.0, check_totals=True)
+    pf.update_fill("A", "buy", 1.0, 100.0, 0.0)
+    pf.update_mark("A", 101.0)
+    pf.update_mark("A", bad)
+    pf.update_marks([("A", bad), ("B", bad)])
+    assert pf.latest_prices() == {"A": 101.0}
+    pf.verify_totals()
+    assert pf.equity() == pytest.approx(1001.0)
+    assert pf.open_notional() == pytest.approx(101.0)
+    # limits still apply: 101 of exposure breaches a 100 cap, 150 of room does not
+    assert not RiskManager(pf, RiskConfig(max_exposure_usd=100.0, daily_loss_limit_pct=5.0)).can_trade()
+    assert RiskManager(pf, RiskConfig(max_exposure_usd=250.0, daily_loss_limit_pct=5.0)).can_trade()
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+
+from woofibot.core.orderbook import L2Book
+from woofibot.exchange.recorder import QuoteRecorder, read_day, recorded_days
+
+DAY1 = 1760486400.0  # 2025-10-15 00:00:00 UTC
+
+
+def test_recorder_roundtrip_dedupe_and_daily_rotation(tmp_path):
+    rec = QuoteRecorder(str(tmp_path), flush_interval_ms=50)
+    rec.record("A", 100.0, 101.0, 100.5, ts=DAY1 + 1)
+    rec.record("A", 100.0, 101.0, 100.5, ts=DAY1 + 2)  # unchanged -> skipped
+    rec.record("B", 5.0, None, 5.0, ts=DAY1 + 3)
+    rec.record("A", 100.5, 101.0, 100.75, ts=DAY1 + 86400 + 5)  # next UTC day
+    rec.close()
+
+    days = recorded_days(str(tmp_path))
+    assert [d.name for d in days] == ["2025-10-15", "2025-10-16"]
+    cols, symbols = read_day(days[0])
+    assert symbols == ["A", "B"]
+    assert cols["ts"].tolist() == [int((DAY1 + 1) * 1e6), int((DAY1 + 3) * 1e6)]
+    assert cols["sym"].tolist() == [0, 1]
+    assert cols["bid"].tolist() == [100.0, 5.0]
+    assert math.isnan(cols["ask"][1])
+    cols2, symbols2 = read_day(days[1])
+    assert symbols2 == ["A"] and cols2["mark"].tolist() == [100.75]
+    assert rec.rows_written == 3
+
+
+def test_recorder_depth_columns(tmp_path):
+    book = L2Book("A")
+    book.apply_snapshot(bids=[[100.0, 1.0], [99.0, 2.0], [98.0, 3.0]], asks=[[101.0, 4.0]])
+    rec = QuoteRecorder(str(tmp_path), depth_levels=2)
+    rec.record("A", 100.0, 101.0, 100.5, ts=DAY1, book=book)
+    rec.flush()
+    cols, _ = read_day(recorded_days(str(tmp_path))[0])
+    assert cols["bid_px"].shape == (1, 2)
+    assert cols["bid_px"][0].tolist() == [100.0, 99.0]
+    assert cols["ask_sz"][0, 0] == 4.0 and np.isnan(cols["ask_sz"][0, 1])
+    rec.close()
+
+
+def test_recorder_drops_only_the_bad_row(tmp_path):
+    rec = QuoteRecorder(str(tmp_path))
+    rec.record("A", 100.0, 101.0, 100.5, ts=DAY1)
+    rec.record("B", 5.0, 6.0, 5.5, ts=math.nan)
+    rec.record("C", 7.0, 8.0, 7.5, ts=math.inf)
+    rec.record("A", 100.5, 101.0, 100.75, ts=DAY1 + 1)
+    rec.close()
+    cols, symbols = read_day(recorded_days(str(tmp_path))[0])
+    assert symbols == ["A"] and cols["mark"].tolist() == [100.5, 100.75]
+    assert rec.rows_written == 2 and rec.rows_dropped == 2
+
+
+def test_recorder_dedupes_quotes_with_a_book(tmp_path):
+    book = L2Book("A")
+    book.apply_snapshot(bids=[[100.0, 1.0], [99.0, 2.0]], asks=[[101.0, 4.0]])
+    rec = QuoteRecorder(str(tmp_path))  # depth_levels=0: the book is not kept
+    rec.record("A", 100.0, 101.0, 100.5, ts=DAY1, book=book)
+    rec.record("A", 100.0, 101.0, 100.5, ts=DAY1 + 1, book=book)
+    rec.close()
+    assert rec.rows_written == 1
+
+    deep = QuoteRecorder(str(tmp_path / "deep"), depth_levels=2)
+    deep.record("A", 100.0, 101.0, 100.5, ts=DAY1, book=book)
+    deep.record("A", 100.0, 101.0, 100.5, ts=DAY1 + 1, book=book)
+    book.apply_deltas(bids=[[99.0, 3.0]], asks=[])  # same top, deeper level moved
+    deep.record("A", 100.0, 101.0, 100.5, ts=DAY1 + 2, book=book)
+    deep.close()
+    assert deep.rows_written == 2
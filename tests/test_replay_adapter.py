@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from woofibot.core.paper_exchange import PaperExchange
+from woofibot.exchange.recorder import QuoteRecorder
+from woofibot.core.orderbook import L2Book
+from woofibot.exchange.replay_adapter import TickReplayAdapter
+
+DAY1 = 1760486400.0  # 2025-10-15 00:00:00 UTC
+
+
+def _book(bid, ask):
+    book = L2Book()
+    book.apply_snapshot(bids=[[bid, 1.0]], asks=[[ask, 1.0]])
+    return book
+
+
+def _record(tmp_path, depth_levels=0):
+    rec = QuoteRecorder(str(tmp_path), depth_levels=depth_levels, dedupe=False)
+    for i in range(10):
+        rec.record("A", 100.0 + i, 101.0 + i, 100.5 + i, ts=DAY1 + i)
+        rec.record("B", 50.0 + i, 50.5 + i, 50.25 + i, ts=DAY1 + i + 0.5,
+                   book=_book(50.0 + i, 50.5 + i) if depth_levels else None)
+    rec.record("C", 1.0, 1.1, 1.05, ts=DAY1 + 3)
+    rec.record("A", 200.0, 201.0, 200.5, ts=DAY1 + 86400)  # second day file
+    rec.close()
+
+
+def test_replay_drives_paper_exchange_tick_by_tick(tmp_path):
+    _record(tmp_path)
+    md = TickReplayAdapter(str(tmp_path), ["A", "B"])
+    ex = PaperExchange(["A", "B"], data_dir=str(Path.cwd() / "__not_used__"), fee_bps=0.0, market_data_source=md)
+    ex.step()
+    assert ex.get_prices()["A"] == 100.5 and md.current_ts == DAY1
+    ex.step()
+    assert ex.get_prices()["B"] == 50.25
+    steps = 2
+    while not md.done:
+        ex.step()
+        steps += 1
+    # 20 ticks on day one + 1 on day two (C filtered out), plus the final step that detects the end
+    assert md.ticks_replayed == 21 and steps == 22
+    assert ex.get_prices()["A"] == 200.5
+
+
+def test_replay_step_window_and_depth(tmp_path):
+    _record(tmp_path, depth_levels=1)
+    md = TickReplayAdapter(str(tmp_path), ["A", "B"], step_ms=5000, end="2025-10-15")
+    md.step()
+    assert md.ticks_replayed == 10  # A and B ticks within the first 5 simulated seconds
+    assert md.get_orderbook("A") == (104.0, 105.0)
+    book = md.get_book("B")
+    assert isinstance(book, L2Book) and book.top() == (54.0, 54.5)
+    while not md.done:
+        md.step()
+    assert md.ticks_replayed == 20
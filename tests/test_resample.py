@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from woofibot.core.paper_exchange import PaperExchange
+from woofibot.data.candles import load_csv_candles
+from woofibot.data.resample import BarCache, resample
+
+
+def _write_1m(path, n, t0=0):
+    i = np.arange(n, dtype=float)
+    pd.DataFrame({
+        "timestamp": t0 + 60 * np.arange(n),
+        "open": 100 + i, "high": 101 + i, "low": 99 - i, "close": 100.5 + i, "volume": 1.0,
+    }).to_csv(path, index=False)
+
+
+def test_resample_ohlcv_buckets(tmp_path):
+    # starts mid-bucket at 00:03 so the first 5m bar only has two 1m bars
+    _write_1m(tmp_path / "X_1m.csv", 12, t0=180)
+    bars = resample(load_csv_candles(tmp_path / "X_1m.csv"), 300)
+    assert bars["timestamp"].tolist() == [0, 300, 600]
+    assert bars["open"].tolist() == [100.0, 102.0, 107.0]
+    assert bars["high"].tolist() == [102.0, 107.0, 112.0]
+    assert bars["low"].tolist() == [98.0, 93.0, 88.0]
+    assert bars["close"].tolist() == [101.5, 106.5, 111.5]
+    assert bars["volume"].tolist() == [2.0, 5.0, 5.0]
+
+def test_bar_cache_skips_source_on_hit(tmp_path):
+    src = tmp_path / "X_1m.csv"
+    _write_1m(src, 120)
+    cache = BarCache(tmp_path / "cache")
+    reads = []
+
+    def load():
+        reads.append(1)
+        return load_csv_candles(src)
+
+    first = cache.load("X", "15m", [src], load)
+    second = cache.load("X", "15m", [src], load)
+    assert len(reads) == 1 and (cache.hits, cache.misses) == (1, 1)
+    assert np.array_equal(first["close"], second["close"]) and len(second["close"]) == 8
+
+    _write_1m(src, 240)  # source changed -> fingerprint changes -> rebuilt
+    assert len(cache.load("X", "15m", [src], load)["close"]) == 16
+    assert len(reads) == 2
+
+
+def test_paper_exchange_honours_timeframe(tmp_path):
+    _write_1m(tmp_path / "X_1m.csv", 180)
+    ex = PaperExchange(["X"], data_dir=str(tmp_path), fee_bps=0.0, timeframe="1h", cache_dir=str(tmp_path / "cache"))
+    closes = []
+    for _ in range(3):
+        ex.step()
+        closes.append(ex.prices["X"])
+    assert closes == [159.5, 219.5, 279.5]
+    assert ex.bar_cache.misses == 1
@@ -0,0 +1,99 @@
+import numpy as np
+
+from woofibot.backtest.result_cache import BacktestCache, backtest_key
+from woofibot.core.paper_exchange import PaperExchange
+from woofibot.risk.risk_manager import RiskManager
+from woofibot.strategies import build_strategy
+
+
+class ListLogger:
+    def __init__(self):
+        self.trades, self.equity, self.events = [], [], []
+
+    def log_trade(self, res, equity=None, cash=None):
+        self.trades.append((res["symbol"], res["price"], equity))
+        self.events.append("trade")
+
+    def log_equity(self, equity, cash, realized_total=None, unrealized=None):
+        self.equity.append(equity)
+        self.events.append("equity")
+
+
+def _run(cache, cfg):
+    ex = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps)
+    strat = build_strategy(cfg.strategy, cfg.strategy_params)
+    strat.params["order_size_override"] = cfg.order_size
+    log = ListLogger()
+    summary, hit = cache.run(cfg, ex, strat, RiskManager(ex.portfolio, cfg.risk), trade_logger=log)
+    return summary, hit, log
+
+
+def test_hit_replays_identical_results(tmp_path, backtest_cfg):
+    cfg = backtest_cfg(bars=300)
+    cache = BacktestCache(tmp_path / "cache")
+    first, hit1, log1 = _run(cache, cfg)
+    second, hit2, log2 = _run(cache, cfg)
+    assert (hit1, hit2) == (False, True)
+    assert first["fills"] == second["fills"] > 0 and first["final_equity"] == second["final_equity"]
+    assert log1.trades == log2.trades and np.allclose(log1.equity, log2.equity)
+    assert log1.events == log2.events  # fills interleaved with equity rows as in the run
+
+
+def test_key_tracks_config_and_data(backtest_cfg, write_candles):
+    cfg = backtest_cfg(bars=300)
+    strat = build_strategy(cfg.strategy, cfg.strategy_params)
+    key = backtest_key(cfg, strat)
+    assert backtest_key(cfg.model_copy(update={"order_size": 30.0}), strat) != key
+    write_candles(bars=301)  # candle file changed
+    assert backtest_key(cfg, strat) != key
+
+
+def test_lru_eviction_and_invalidate(tmp_path, backtest_cfg):
+    cache = BacktestCache(tmp_path / "cache", max_entries=2)
+    keys = []
+    for size in (10.0, 20.0, 30.0):
+        cfg = backtest_cfg(bars=300, order_size=size)
+        _run(cache, cfg)
+        keys.append(backtest_key(cfg, build_strategy(cfg.strategy, cfg.strategy_params)))
+    assert [e[0] for e in cache.entries()] == keys[1:]
+    assert cache.invalidate(keys[2]) == 1 and not cache.has(keys[2])
+    assert cache.invalidate() == 1 and cache.entries() == []
+
+
+def test_hit_writes_the_same_log_files_as_a_miss(tmp_path, backtest_cfg):
+    from woofibot.utils.trade_log import TradeLogger
+
+    cfg = backtest_cfg(bars=300)
+    cache = BacktestCache(tmp_path / "cache")
+    outputs = []
+    for run in ("miss", "hit"):
+        ex = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps)
+        strat = build_strategy(cfg.strategy, cfg.strategy_params)
+        strat.params["order_size_override"] = cfg.order_size
+        log = TradeLogger(str(tmp_path / run / "trades.csv"), str(tmp_path / run / "equity.csv"), clock=ex.clock)
+        _, hit = cache.run(cfg, ex, strat, RiskManager(ex.portfolio, cfg.risk), trade_logger=log)
+        assert hit == (run == "hit")
+        outputs.append([(tmp_path / run / name).read_bytes() for name in ("trades.csv", "equity.csv")])
+    assert outputs[0] == outputs[1]
+    assert outputs[0][1].splitlines()[2].startswith(b"60")  # candle time, not 0.0
+
+
+def test_hit_skips_building_the_exchange(tmp_path, backtest_cfg):
+    cfg = backtest_cfg(bars=300)
+    cache = BacktestCache(tmp_path / "cache")
+    builds = []
+
+    def build():
+        ex = PaperExchange(cfg.markets, cfg.backtest.data_dir, cfg.backtest.fee_bps)
+        builds.append(ex)
+        return ex, RiskManager(ex.portfolio, cfg.risk)
+
+    results = []
+    for _ in range(2):
+        strat = build_strategy(cfg.strategy, cfg.strategy_params)
+        strat.params["order_size_override"] = cfg.order_size
+        log = ListLogger()
+        summary, hit = cache.run(cfg, build, strat, trade_logger=log)
+        results.append((summary, hit, log))
+    assert [r[1] for r in results] == [False, True] and len(builds) == 1
+    assert results[0][0]["fills"] == results[1][0]["fills"] > 0 and results[0][2].events == results[1][2].events
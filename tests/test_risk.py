@@ -1,5 +1,13 @@
+import math
 import time
+
+import pytest
+
+from woofibot.core.array_portfolio import ArrayPortfolio
+from woofibot.core.paper_exchange import PaperExchange
+from woofibot.core.portfolio import Portfolio
 from woofibot.risk.risk_manager import RiskManager
+from woofibot.utils.clock import SimClock
 from woofibot.utils.config import RiskConfig
 
 class DummyPF:
@@ -16,3 +24,142 @@ def test_block_new_exposure():
     cfg = RiskConfig(max_exposure_usd=300, daily_loss_limit_pct=1000)
     rm = RiskManager(DummyPF(), cfg)
     assert rm.can_trade({}, 50) is False
+
+
+@pytest.mark.parametrize("impl", [Portfolio, ArrayPortfolio])
+def test_auto_close_batch_returns_every_breach(impl):
+    pf = impl()
+    for sym, side, px in [("A", "buy", 100.0), ("B", "sell", 100.0), ("C", "buy", 100.0), ("D", "buy", 100.0), ("E", "sell", 100.0)]:
+        pf.update_fill(sym, side, 1.0, px, 0.0)
+    # A +3% (tp), B short and price +2% (sl), C +0.5% (hold), D no usable mark, E short -5% (tp)
+    pf.update_marks([("A", 103.0), ("B", 102.0), ("C", 100.5), ("D", math.nan), ("E", 95.0)])
+    rm = RiskManager(pf, RiskConfig(take_profit_pct=2.0, stop_loss_pct=1.0))
+    closes = rm.check_auto_close_batch()
+    assert [(c["symbol"], c["side"], c["reason"]) for c in closes] == [("A", "sell", "tp"), ("B", "buy", "sl"), ("E", "buy", "tp")]
+    assert closes[0]["qty_quote"] == pytest.approx(103.0)
+    # an explicit price dict is honoured; the single-order API returns the first breach
+    assert rm.check_auto_close({"C": 103.0})["symbol"] == "C"
+    # TP/SL of 0 means off
+    assert RiskManager(pf, RiskConfig()).check_auto_close_batch() == []
+
+
+def test_reduce_only_close_flattens_position():
+    ex = PaperExchange(["ETH-USDT"], data_dir="__not_used__", fee_bps=0.0)
+    ex.step()
+    ex.place_order("ETH-USDT", "buy", 100.0)
+    ex.prices["ETH-USDT"] *= 1.05
+    ex.portfolio.update_mark("ETH-USDT", ex.prices["ETH-USDT"])
+    od = RiskManager(ex.portfolio, RiskConfig(take_profit_pct=2.0, stop_loss_pct=2.0)).check_auto_close_batch()[0]
+    res = ex.place_order(od["symbol"], od["side"], od["qty_quote"], reduce_only=True)
+    assert res["pos_qty"] == 0.0
+
+
+@pytest.mark.parametrize("impl", [Portfolio, ArrayPortfolio])
+def test_trigger_book_fires_on_crossed_levels_only(impl):
+    pf = impl()
+    cfg = RiskConfig(take_profit_pct=2.0, stop_loss_pct=1.0, symbol_overrides={"C": {"stop_loss_pct": 5.0}})
+    rm = RiskManager(pf, cfg)
+    for sym, side in [("A", "buy"), ("B", "sell"), ("C", "buy")]:
+        pf.update_fill(sym, side, 1.0, 100.0, 0.0)
+        rm.on_fill(sym)
+    assert rm.triggers.levels("A") == [(pytest.approx(99.0), "sl"), (pytest.approx(102.0), "tp")]
+    assert rm.on_marks([("A", 101.0), ("B", 100.5), ("C", 97.0)]) == []  # C's override keeps it open
+    closes = rm.on_marks([("A", 103.0), ("B", 101.5)])
+    assert [(c["symbol"], c["side"], c["reason"]) for c in closes] == [("A", "sell", "tp"), ("B", "buy", "sl")]
+    assert closes[0]["qty_quote"] == pytest.approx(103.0)
+    # fired symbols stay quiet until the close fill re-arms them; C is the only one left armed
+    assert len(rm.triggers) == 1
+    assert [c["symbol"] for c in rm.on_marks([("A", 110.0), ("C", 94.0)])] == ["C"]
+
+
+def test_trailing_stop_follows_best_mark():
+    pf = Portfolio()
+    rm = RiskManager(pf, RiskConfig(trailing_stop_pct=1.0))
+    pf.update_fill("A", "sell", 1.0, 100.0, 0.0)
+    rm.on_fill("A")
+    assert rm.on_marks([("A", 95.0), ("A", 90.0), ("A", 90.8)]) == []
+    assert rm.triggers.levels("A") == [(pytest.approx(90.9), "trail")]
+    assert rm.on_marks([("A", 91.0)])[0]["reason"] == "trail"
+
+
+def test_trailing_peak_survives_add_but_not_flip():
+    pf = Portfolio()
+    rm = RiskManager(pf, RiskConfig(trailing_stop_pct=2.0))
+    pf.update_fill("A", "buy", 1.0, 100.0, 0.0)
+    rm.on_fill("A")
+    assert rm.on_marks([("A", 110.0), ("A", 108.5)]) == []
+    pf.update_mark("A", 108.5)
+    pf.update_fill("A", "buy", 1.0, 108.5, 0.0)  # add below the peak
+    rm.on_fill("A")
+    assert rm.triggers.levels("A") == [(pytest.approx(107.8), "trail")]
+    pf.update_fill("A", "sell", 3.0, 108.5, 0.0)  # flip short: the peak starts over
+    rm.on_fill("A")
+    assert rm.triggers.levels("A") == [(pytest.approx(110.67), "trail")]
+
+
+def test_trigger_book_matches_batch_scan():
+    import random
+
+    rng = random.Random(3)
+    pf = Portfolio()
+    rm = RiskManager(pf, RiskConfig(take_profit_pct=1.5, stop_loss_pct=1.0))
+    syms = [f"S{i}" for i in range(30)]
+    marks = {s: 100.0 for s in syms}
+    pf.update_marks(marks.items())
+    for _ in range(300):
+        moved = rng.sample(syms, 5)
+        for s in moved:
+            marks[s] *= 1 + rng.uniform(-0.01, 0.01)
+        pf.update_marks((s, marks[s]) for s in moved)
+        expected = rm.check_auto_close_batch()
+        fired = rm.on_marks((s, marks[s]) for s in moved)
+        assert sorted(c["symbol"] for c in fired) == sorted(c["symbol"] for c in expected)
+        for c in fired:
+            pf.update_fill(c["symbol"], c["side"], abs(pf.positions[c["symbol"]].qty), marks[c["symbol"]], 0.0)
+            rm.on_fill(c["symbol"])
+        for s in rng.sample(syms, 2):
+            if not pf.positions.get(s) or not pf.positions[s].qty:
+                pf.update_fill(s, rng.choice(["buy", "sell"]), 1.0, marks[s], 0.0)
+                rm.on_fill(s)
+
+
+def test_position_age_expiry_on_sim_clock():
+    clock = SimClock(1_000.0)
+    pf = Portfolio(clock=clock)
+    rm = RiskManager(pf, RiskConfig(max_position_age_sec=60))
+    pf.update_fill("A", "buy", 1.0, 100.0, 0.0)
+    rm.on_fill("A")
+    clock.advance(20)
+    pf.update_fill("B", "sell", 2.0, 50.0, 0.0)
+    rm.on_fill("B")
+    pf.update_fill("A", "buy", 1.0, 100.0, 0.0)  # adding keeps A's open time
+    rm.on_fill("A")
+    clock.advance(39)
+    assert rm.expired() == []
+    clock.advance(1)
+    assert rm.expired() == [{"symbol": "A", "side": "sell", "qty_quote": 200.0, "reason": "age"}]
+    # a flip re-opens B; only the new side's age counts, and other symbols can be held back
+    pf.update_fill("B", "buy", 4.0, 50.0, 0.0)
+    rm.on_fill("B")
+    clock.advance(60)
+    assert rm.expired(symbols=["A"]) == []
+    assert [od["symbol"] for od in rm.expired()] == ["B"]
+    assert rm.expired() == []
+
+
+def test_backtest_closes_positions_by_age(write_candles):
+    from woofibot.backtest.engine import iter_backtest
+
+    class BuyWhenFlat:
+        def on_tick(self, prices, exchange, risk_mgr):
+            return [{"symbol": s, "side": "buy", "qty_quote": 100.0} for s in prices if s not in exchange.portfolio.positions or not exchange.portfolio.positions[s].qty]
+
+    t0 = 1_700_000_000
+    data_dir = write_candles(bars=30, start=t0, close=100.0)
+    ex = PaperExchange(["ETH-USDT"], data_dir=str(data_dir), fee_bps=0.0)
+    risk = RiskManager(ex.portfolio, RiskConfig(max_exposure_usd=1e9, daily_loss_limit_pct=100.0, max_position_age_sec=300))
+    fills = list(iter_backtest(ex, BuyWhenFlat(), risk))
+    ages = [f for f in fills if f.get("reason") == "age"]
+    # open on bar 0, expire 5 bars later on bar time, re-open on the next bar
+    assert [f["ts"] - t0 for f in ages[:2]] == [300, 660]
+    assert all(f["pos_qty"] == 0.0 for f in ages)
@@ -0,0 +1,77 @@
+import math
+import random
+
+import pytest
+
+from woofibot.core.portfolio import Portfolio
+from woofibot.risk.risk_manager import RiskManager
+from woofibot.risk.rolling_metrics import RollingRiskMetrics
+from woofibot.utils.clock import SimClock
+from woofibot.utils.config import RiskConfig
+
+
+def test_streaming_metrics_match_brute_force():
+    rng = random.Random(11)
+    window = 600.0
+    m = RollingRiskMetrics(window, start_equity=1000.0)
+    ts, eq = 0.0, 1000.0
+    samples, dds, trades = [], [], []
+    for _ in range(3000):
+        ts += rng.choice([1.0, 5.0, 30.0])
+        eq *= 1 + rng.gauss(0, 0.002)
+        m.update(ts, eq)
+        samples.append((ts, eq))
+        # drawdown of each sample against the peak of its own trailing window
+        peak = max(e for t, e in samples[-700:] if t > ts - window)
+        dds.append((ts, (peak - eq) / peak * 100.0))
+        if rng.random() < 0.2:
+            n = rng.uniform(10, 500)
+            m.record_trade(ts, n)
+            trades.append((ts, n))
+
+        assert m.drawdown_pct == pytest.approx(dds[-1][1], abs=1e-9)
+        assert m.max_drawdown_pct == pytest.approx(max(d for t, d in dds[-700:] if t > ts - window), abs=1e-9)
+        recent = samples[-700:]
+        r2 = sum(math.log(b / a) ** 2 for (ta, a), (tb, b) in zip(recent, recent[1:]) if tb > ts - window)
+        assert m.realized_vol_pct == pytest.approx(math.sqrt(r2) * 100.0, rel=1e-6)
+        assert m.turnover_usd == pytest.approx(sum(n for t, n in trades if t > ts - window), abs=1e-6)
+
+
+def test_daily_loss_limit_resets_at_utc_midnight():
+    day = 86400.0
+    clock = SimClock(day * 20_000 + 3600)
+    pf = Portfolio(cash_usd=1000.0, clock=clock)
+    rm = RiskManager(pf, RiskConfig(max_exposure_usd=1e9, daily_loss_limit_pct=5.0))
+    rm.on_tick()
+    pf.cash_usd = 940.0
+    rm.on_tick()
+    assert not rm.can_trade()
+    clock.advance(day)  # first tick of the next day: today's baseline is yesterday's close
+    rm.on_tick()
+    assert rm.start_equity == 940.0 and rm.can_trade()
+    state = rm.metrics.state()
+
+    # the baseline survives a restart on the same day
+    rm2 = RiskManager(Portfolio(cash_usd=880.0, clock=clock), RiskConfig(max_exposure_usd=1e9, daily_loss_limit_pct=5.0))
+    rm2.metrics.load_state(state)
+    rm2.on_tick()
+    assert rm2.start_equity == 940.0 and not rm2.can_trade()
+
+
+def test_rolling_limits_block_trading():
+    clock = SimClock(0.0)
+    pf = Portfolio(cash_usd=1000.0, clock=clock)
+    cfg = RiskConfig(max_exposure_usd=1e9, daily_loss_limit_pct=100.0, metrics_window_sec=60, max_drawdown_pct=3.0, max_turnover_usd=1000.0)
+    rm = RiskManager(pf, cfg)
+    rm.on_tick()
+    rm.on_fill("A", 900.0)
+    assert rm.can_trade(order_notional=100.0)
+    assert not rm.can_trade(order_notional=150.0)
+    clock.advance(30)
+    pf.cash_usd = 960.0
+    rm.on_tick()
+    assert not rm.can_trade()
+    clock.advance(61)  # the peak, the drawdown and the fill have left the window
+    rm.on_tick()
+    assert rm.metrics.max_drawdown_pct == 0.0 and rm.metrics.turnover_usd == 0.0
+    assert rm.can_trade(order_notional=500.0)
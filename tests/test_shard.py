@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+from woofibot.backtest.engine import iter_backtest
+from woofibot.backtest.shard import ShardingError, run_sharded, shard_blockers, split_symbols
+from woofibot.backtest.sweep import build_backtest
+
+MARKETS = ["A-USDT", "B-USDT", "C-USDT"]
+
+
+@pytest.fixture
+def make_cfg(write_candles, backtest_cfg):
+    for k, sym in enumerate(MARKETS):
+        # different starts and bar spacing per symbol
+        write_candles([sym], bars=len(range(k, 400, 1 + k)), seed=k, start=60 * k, interval=60 * (1 + k))
+
+    def make(**risk):
+        return backtest_cfg(
+            MARKETS,
+            bars=None,
+            order_size=5.0,
+            risk={"max_exposure_usd": math.inf, "daily_loss_limit_pct": math.inf, **risk},
+            backtest={"max_ffill_sec": None},
+        )
+
+    return make
+
+
+def test_blockers_detect_coupling(make_cfg):
+    assert shard_blockers(make_cfg()) == []
+    reasons = shard_blockers(make_cfg(max_exposure_usd=300.0))
+    assert len(reasons) == 1 and "max_exposure_usd" in reasons[0]
+    with pytest.raises(ShardingError):
+        run_sharded(make_cfg(daily_loss_limit_pct=5.0), shards=2)
+    cfg = make_cfg().model_copy(update={"order_size": 0.0})
+    assert any("independently" in r for r in shard_blockers(cfg))
+
+
+@pytest.mark.parametrize("tp_sl", [{}, {"take_profit_pct": 0.3, "stop_loss_pct": 0.3}])
+def test_sharded_matches_single_process(make_cfg, tp_sl):
+    cfg = make_cfg(**tp_sl)
+    ex, strat, risk_mgr, ti_policy = build_backtest(cfg)
+    fills = list(iter_backtest(ex, strat, risk_mgr, ti_policy=ti_policy))
+    single = [(f["ts"], f["symbol"], f["price"]) for f in fills]
+    assert any("reason" in f for f in fills) == bool(tp_sl)
+    merged = run_sharded(cfg, shards=2)
+    assert split_symbols(MARKETS, 2) == [["A-USDT", "C-USDT"], ["B-USDT"]]
+    assert [(ts, f["symbol"], f["price"]) for ts, f in zip(merged["fill_ts"], merged["fills"])] == single
+    assert math.isclose(merged["summary"]["final_equity"], ex.portfolio.equity(ex.get_prices()), rel_tol=1e-12)
+    assert merged["summary"]["steps"] == ex.ptr - 1
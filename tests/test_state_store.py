@@ -0,0 +1,106 @@
+import json
+import time
+
+import pytest
+
+from woofibot.core.array_portfolio import ArrayPortfolio
+from woofibot.core.portfolio import Portfolio
+from woofibot.core.state_store import StateStore
+from woofibot.risk.risk_manager import RiskManager
+from woofibot.risk.ti_policy import TIPolicy
+from woofibot.utils.clock import SimClock
+from woofibot.utils.config import RiskConfig, TIConfig
+
+
+def _trade(store, pf, tip, clock, n, start=0):
+    for k in range(start, start + n):
+        clock.advance(5)
+        sym = f"S{k % 7}"
+        pf.update_fill(sym, "buy" if k % 3 else "sell", 0.1 + k % 5, 100.0 + k % 11, 0.01)
+        tip.record_fill(sym)
+        store.record_fill(sym)
+
+
+def _wait_for_snapshot(root, seq):
+    """Block until the background snapshot covering ``seq`` is on disk."""
+    snap = root / "snapshot.json"
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if snap.exists() and json.loads(snap.read_text())["seq"] == seq:
+            break
+        time.sleep(0.005)
+    assert snap.exists() and json.loads(snap.read_text())["seq"] == seq
+
+
+def _state(pf, tip):
+    return (
+        pf.cash_usd,
+        pf.realized_pnl_usd,
+        {s: (p.qty, p.avg_price, p.ts) for s, p in pf.positions.items() if p.qty},
+        tip.state(),
+    )
+
+
+@pytest.mark.parametrize("impl", [Portfolio, ArrayPortfolio])
+def test_restart_restores_snapshot_plus_journal_tail(tmp_path, impl):
+    clock = SimClock(1_000.0)
+    pf, tip = Portfolio(clock=clock), TIPolicy(TIConfig(), clock=clock)
+    risk = RiskManager(pf, RiskConfig())
+    store = StateStore(tmp_path, snapshot_every=40)
+    assert store.restore(pf, tip, risk) is False
+    risk.start_equity = 1234.0
+    _trade(store, pf, tip, clock, 100)
+    expected = _state(pf, tip)
+    _wait_for_snapshot(tmp_path, 79)
+    del store  # crash: no close(), so no final snapshot
+
+    pf2 = impl() if impl is Portfolio else impl(["S0"])
+    tip2 = TIPolicy(TIConfig(), clock=clock)
+    risk2 = RiskManager(pf2, RiskConfig())
+    store2 = StateStore(tmp_path, snapshot_every=40)
+    t0 = time.perf_counter()
+    assert store2.restore(pf2, tip2, risk2) is True
+    assert time.perf_counter() - t0 < 0.5
+    # only the fills after the last snapshot (at 80) are replayed
+    assert store2.replayed == 20
+    assert _state(pf2, tip2) == expected
+    assert risk2.start_equity == 1234.0
+
+    # keep trading after the restart; a clean close leaves nothing to replay
+    _trade(store2, pf2, tip2, clock, 15, start=100)
+    store2.close()
+    pf3, tip3 = Portfolio(), TIPolicy(TIConfig())
+    store3 = StateStore(tmp_path)
+    assert store3.restore(pf3, tip3) and store3.replayed == 0
+    assert _state(pf3, tip3) == _state(pf2, tip2)
+    assert pf3.equity() == pytest.approx(pf2.equity(pf3.latest_prices()))
+    store3.close()
+
+
+def test_snapshot_prunes_journal_and_ignores_torn_line(tmp_path):
+    clock = SimClock(0.0)
+    pf, tip = Portfolio(clock=clock), TIPolicy(TIConfig(), clock=clock)
+    store = StateStore(tmp_path, snapshot_every=10)
+    store.restore(pf, tip)
+    _trade(store, pf, tip, clock, 25)
+    deadline = time.time() + 5
+    while len(list(tmp_path.glob("journal-*.jsonl"))) > 1 and time.time() < deadline:
+        time.sleep(0.005)
+    assert [p.name for p in tmp_path.glob("journal-*.jsonl")] == ["journal-000000000020.jsonl"]
+    expected = _state(pf, tip)
+    with open(tmp_path / "journal-000000000020.jsonl", "a") as f:
+        f.write('{"seq": 25, "sym": "S0", "qty"')  # crash mid-write
+    del store
+
+    pf2, tip2 = Portfolio(), TIPolicy(TIConfig())
+    store2 = StateStore(tmp_path)
+    assert store2.restore(pf2, tip2) and store2.replayed == 5
+    assert _state(pf2, tip2) == expected
+    _trade(store2, pf2, tip2, SimClock(1e6), 3, start=25)
+    del store2  # crash again before any snapshot
+
+    pf3, tip3 = Portfolio(), TIPolicy(TIConfig())
+    store3 = StateStore(tmp_path)
+    assert store3.restore(pf3, tip3) and store3.replayed == 8
+    assert _state(pf3, tip3) == _state(pf2, tip2)
+    store3.close()
@@ -0,0 +1,38 @@
+import numpy as np
+
+from woofibot.backtest.sweep import apply_overrides, backtest_config, expand_grid, run_sweep, sample_random
+
+
+def test_grid_and_random_specs():
+    assert expand_grid({"a": [1, 2], "b.c": ["x"]}) == [{"a": 1, "b.c": "x"}, {"a": 2, "b.c": "x"}]
+    combos = sample_random({"a": {"low": 0.0, "high": 1.0}, "b": [5, 6]}, n=10, seed=3)
+    assert len(combos) == 10 and all(0.0 <= c["a"] <= 1.0 and c["b"] in (5, 6) for c in combos)
+    assert combos == sample_random({"a": {"low": 0.0, "high": 1.0}, "b": [5, 6]}, n=10, seed=3)
+
+
+def test_sweep_matches_serial_backtests(backtest_cfg):
+    cfg = backtest_cfg()
+    combos = expand_grid({"risk.max_exposure_usd": [0.0, 40.0, 100.0]})
+    df = run_sweep(cfg, combos, workers=2)
+    assert list(df.index) == [1, 2, 3] and df["error"].isna().all()
+    assert df["pnl"].is_monotonic_decreasing
+    for combo in combos:
+        serial = backtest_config(apply_overrides(cfg.model_dump(), combo))
+        row = df[df["risk.max_exposure_usd"] == combo["risk.max_exposure_usd"]].iloc[0]
+        assert row["trades"] == serial["fills"] and np.isclose(row["pnl"], serial["pnl"])
+    assert df["trades"].nunique() > 1
+
+
+def test_sweep_loads_bars_per_timeframe_and_date_range(backtest_cfg):
+    cfg = backtest_cfg()
+    combos = [{"backtest.timeframe": "1m"}, {"backtest.timeframe": "5m"}, {"backtest.start": "1970-01-01T03:00:00"}]
+    df = run_sweep(cfg, combos, workers=2)
+    assert df["error"].isna().all()
+    steps = {}
+    for combo in combos:
+        serial = backtest_config(apply_overrides(cfg.model_dump(), combo))
+        (param, value), = combo.items()
+        row = df[df[param] == value].iloc[0]
+        assert row["steps"] == serial["steps"] and np.isclose(row["pnl"], serial["pnl"])
+        steps[value] = row["steps"]
+    assert len(set(steps.values())) == 3
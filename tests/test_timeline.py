@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from woofibot.core.paper_exchange import PaperExchange
+from woofibot.data.timeline import Timeline
+
+
+def _flatten(chunks):
+    ts, changed, closes, stale = [], [], [], []
+    for ch in chunks:
+        for i in range(len(ch)):
+            lo, hi = ch.indptr[i], ch.indptr[i + 1]
+            ts.append(int(ch.ts[i]))
+            changed.append(ch.sym_idx[lo:hi].tolist())
+            closes.append(ch.close[lo:hi].tolist())
+            stale.append(ch.stale[i].tolist())
+    return ts, changed, closes, stale
+
+
+def test_timeline_merges_and_flags_stale():
+    a_ts = np.array([0, 60, 120, 180])
+    b_ts = np.array([60, 180, 600])
+    args = ([a_ts, b_ts], [np.array([1.0, 2.0, 3.0, 4.0]), np.array([10.0, 11.0, 12.0])])
+    ts, changed, closes, stale = _flatten(Timeline(*args, max_ffill_sec=90).chunks())
+    assert ts == [0, 60, 120, 180, 600]
+    assert changed == [[0], [0, 1], [0], [0, 1], [1]]
+    assert closes[1] == [2.0, 10.0]
+    # b has no bar yet at t=0; a is 420s past its last bar at t=600
+    assert stale == [[False, True], [False, False], [False, False], [False, False], [True, False]]
+    # small windows carry the last bar across chunk boundaries and give the same result
+    assert _flatten(Timeline(*args, max_ffill_sec=90, chunk_sec=50).chunks()) == (ts, changed, closes, stale)
+
+
+def test_paper_exchange_steps_on_merged_timestamps(tmp_path):
+    pd.DataFrame({"timestamp": [0, 60, 120], "open": 1.0, "high": 1.0, "low": 1.0, "close": [1.0, 2.0, 3.0], "volume": 1.0}).to_csv(
+        tmp_path / "A_1m.csv", index=False
+    )
+    # B starts late and skips t=120
+    pd.DataFrame({"timestamp": [60, 180], "open": 1.0, "high": 1.0, "low": 1.0, "close": [20.0, 30.0], "volume": 1.0}).to_csv(
+        tmp_path / "B_1m.csv", index=False
+    )
+    ex = PaperExchange(["A", "B"], data_dir=str(tmp_path), fee_bps=0.0, max_ffill_sec=60)
+    seen = []
+    for _ in range(5):
+        ex.step()
+        seen.append((ex.current_ts, ex.changed_symbols, dict(ex.prices), sorted(ex.stale_symbols)))
+    assert seen[0] == (0.0, ["A"], {"A": 1.0, "B": 20.0}, ["B"])
+    assert seen[1] == (60.0, ["A", "B"], {"A": 2.0, "B": 20.0}, [])
+    assert seen[2] == (120.0, ["A"], {"A": 3.0, "B": 20.0}, [])
+    assert seen[3] == (180.0, ["B"], {"A": 3.0, "B": 30.0}, [])
+    # past the end: nothing changes, prices hold
+    assert seen[4][1] == [] and seen[4][2] == {"A": 3.0, "B": 30.0}
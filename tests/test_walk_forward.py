@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from woofibot.backtest.walk_forward import make_windows, parse_duration, run_walk_forward
+
+
+def test_windows_roll_forward():
+    assert parse_duration("2h") == 7200 and parse_duration("1w") == 604800 and parse_duration("90") == 90
+    # 10 hourly bars at 0..9h: 4h in-sample, 2h out-of-sample, advance 2h
+    assert make_windows(0, 9 * 3600, 4 * 3600, 2 * 3600, bar_sec=3600) == [
+        (0, 14400, 21599),
+        (7200, 21600, 28799),
+        (14400, 28800, 32400),
+    ]
+
+
+def test_short_trailing_window_is_dropped():
+    # 11 hourly bars: a fourth window would test on the 10h bar alone
+    assert make_windows(0, 10 * 3600, 4 * 3600, 2 * 3600, bar_sec=3600) == [
+        (0, 14400, 21599),
+        (7200, 21600, 28799),
+        (14400, 28800, 35999),
+    ]
+    # a span that divides evenly keeps its last full window
+    assert len(make_windows(0, 11 * 3600, 4 * 3600, 2 * 3600, bar_sec=3600)) == 4
+
+
+def test_walk_forward_picks_in_sample_winner(backtest_cfg):
+    cfg = backtest_cfg(bars=600)
+    combos = [{"risk.max_exposure_usd": v} for v in (0.0, 50.0, 100.0)]
+    df = run_walk_forward(cfg, combos, train_sec=200 * 60, test_sec=100 * 60, workers=2)
+    assert len(df) == 4
+    assert df["best_params"].notna().all() and df["oos_trades"].notna().all()
+    # out-of-sample windows tile the history after the first training window
+    assert (df["oos_start"].diff().dropna() == pd.Timedelta(minutes=100)).all()
+
+
+def test_walk_forward_rejects_data_overrides(backtest_cfg):
+    cfg = backtest_cfg(bars=None)
+    with pytest.raises(ValueError, match="timeframe"):
+        run_walk_forward(cfg, [{"backtest.timeframe": "5m"}], train_sec=60, test_sec=60)
@@ -0,0 +1,71 @@
+import time
+from pathlib import Path
+
+from woofibot.exchange.woofi_ws_adapter import WOOFiWSAdapter
+from woofibot.exchange.ws_replay_server import ReplayWSServer
+
+FIXTURE = Path(__file__).parent / "fixtures" / "ws_stream_sample.jsonl"
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_ws_adapter_streams_replayed_quotes():
+    srv = ReplayWSServer(FIXTURE)
+    url = srv.start()
+    syms = ["PERP_ETH_USDC", "PERP_BTC_USDC"]
+    ad = WOOFiWSAdapter(url, syms)
+    try:
+        ad.step()
+        assert ad.wait_ready(timeout=5)
+        assert _wait_for(lambda: ad.get_orderbook("PERP_ETH_USDC") == (4012.4, 4013.0))
+        assert ad.get_orderbook("PERP_BTC_USDC") == (112050.5, 112052.0)
+        assert ad.get_mark("PERP_ETH_USDC") == (4012.4 + 4013.0) / 2
+        book = ad.get_book("PERP_BTC_USDC")
+        assert book is not None and len(book) == 6
+        assert book.depth_to_notional("buy", 20000.0) == (112051.5, 2)
+    finally:
+        ad.close()
+        srv.stop()
+
+
+def test_ws_adapter_reconnects_after_server_restart():
+    srv = ReplayWSServer(FIXTURE)
+    url = srv.start()
+    ad = WOOFiWSAdapter(url, ["PERP_ETH_USDC"], reconnect_max_sec=0.2)
+    try:
+        ad.step()
+        assert ad.wait_ready(timeout=5)
+        srv.stop()
+        assert _wait_for(lambda: not ad.connected)
+        srv2 = ReplayWSServer(FIXTURE, port=srv.port)
+        srv2.start()
+        try:
+            assert _wait_for(lambda: ad.connected and ad.reconnects >= 1)
+        finally:
+            srv2.stop()
+    finally:
+        ad.close()
+
+
+def test_book_deltas_swap_in_a_new_book():
+    import json
+
+    ad = WOOFiWSAdapter("ws://unused", ["PERP_ETH_USDC"], topics=("orderbook", "orderbookupdate"))
+    snap = {"topic": "PERP_ETH_USDC@orderbook", "ts": 1760486400000, "data": {"symbol": "PERP_ETH_USDC", "asks": [[10.0, 1.0], [11.0, 2.0]], "bids": [[9.0, 1.0]]}}
+    delta = {"topic": "PERP_ETH_USDC@orderbookupdate", "ts": 1760486400250, "data": {"symbol": "PERP_ETH_USDC", "asks": [[10.0, 0.0], [10.5, 3.0]], "bids": [[9.0, 4.0]]}}
+    ad._on_message(None, json.dumps(snap))
+    held = ad.get_book("PERP_ETH_USDC")  # what a fill on the trading thread would be walking
+    assert held.ts == 1760486400.0  # epoch seconds, like the poll adapter's books
+    ad._on_message(None, json.dumps(delta))
+    assert held.levels("ask")[0].tolist() == [10.0, 11.0] and held.levels("bid")[1].tolist() == [1.0]
+    book = ad.get_book("PERP_ETH_USDC")
+    assert book is not held and book.levels("ask")[0].tolist() == [10.5, 11.0] and book.levels("bid")[1].tolist() == [4.0]
+    assert ad.get_orderbook("PERP_ETH_USDC") == (9.0, 10.5)
+    assert book.ts == 1760486400.25
@@ -1,23 +1,130 @@
-from typing import Optional
+import time
+from typing import Callable, Dict, Iterator, Optional
 
 
-def run_backtest(exchange, strategy, risk_mgr, max_steps: int = 500, trade_logger: Optional[object] = None):
-    results = []
-    for _ in range(max_steps):
+def iter_backtest(
+    exchange,
+    strategy,
+    risk_mgr,
+    max_steps: Optional[int] = None,
+    trade_logger: Optional[object] = None,
+    stats: Optional[Dict] = None,
+    ti_policy: Optional[object] = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+    progress_every_sec: float = 5.0,
+) -> Iterator[Dict]:
+    """
+    Step ``exchange`` until its data is exhausted (``exchange.done``) or ``max_steps``,
+    yielding each fill as it happens so nothing accumulates in memory. ``stats`` (if
+    given) is updated in place; ``progress`` receives a copy every ``progress_every_sec``.
+    ``ti_policy`` filters orders by hold time / trade interval on the exchange's clock.
+    """
+    st = stats if stats is not None else {}
+    st.update(steps=0, fills=0, elapsed_sec=0.0, steps_per_sec=0.0, fills_per_sec=0.0, max_drawdown_pct=0.0)
+    t0 = time.perf_counter()
+    next_report = t0 + progress_every_sec
+    peak = None
+    changed_symbols = hasattr(exchange, "changed_symbols")
+    per_symbol = getattr(strategy, "per_symbol", False) and changed_symbols
+    rank = {sym: i for i, sym in enumerate(getattr(exchange, "symbols", []))}
+
+    def refresh(now):
+        elapsed = now - t0
+        st["elapsed_sec"] = elapsed
+        st["steps_per_sec"] = st["steps"] / elapsed if elapsed > 0 else 0.0
+        st["fills_per_sec"] = st["fills"] / elapsed if elapsed > 0 else 0.0
+        st["ts"] = getattr(exchange, "current_ts", None)
+
+    while max_steps is None or st["steps"] < max_steps:
         exchange.step()
+        if getattr(exchange, "done", False):
+            break
+        st["steps"] += 1
         prices = exchange.get_prices()
-        equity = exchange.portfolio.equity(prices)
-        cash = exchange.portfolio.cash_usd
-        realized_total = exchange.portfolio.realized_pnl_usd
-        unrealized = exchange.portfolio.unrealized_total(prices)
+        # the exchange pushes every mark into the portfolio, whose running totals answer in O(1)
+        equity = exchange.portfolio.equity()
+        risk_mgr.on_tick(equity)
+        if peak is None or equity > peak:
+            peak = equity
+        elif peak > 0:
+            st["max_drawdown_pct"] = max(st["max_drawdown_pct"], (peak - equity) / peak * 100.0)
         if trade_logger is not None:
+            cash = exchange.portfolio.cash_usd
+            realized_total = exchange.portfolio.realized_pnl_usd
+            unrealized = exchange.portfolio.unrealized_total()
             trade_logger.log_equity(equity, cash, realized_total=realized_total, unrealized=unrealized)
-        if not risk_mgr.can_trade(prices):
+        if progress is not None and not st["steps"] & 1023:
+            now = time.perf_counter()
+            if now >= next_report:
+                refresh(now)
+                progress(dict(st))
+                next_report = now + progress_every_sec
+        # TP/SL/trailing triggers fire on mark updates, so only the symbols that printed a new
+        # bar are looked at; closes go out in market order (as a sharded run merges them)
+        if changed_symbols:
+            closes = risk_mgr.on_marks((s, prices[s]) for s in exchange.changed_symbols if s in prices)
+        else:
+            closes = risk_mgr.on_marks(prices.items())
+        # positions past max_position_age_sec (per-symbol runs: only on the symbol's own bar)
+        expired = risk_mgr.expired(exchange.changed_symbols if per_symbol else None)
+        if expired:
+            closing = {od["symbol"] for od in closes}
+            closes += [od for od in expired if od["symbol"] not in closing]
+        if len(closes) > 1:
+            closes.sort(key=lambda od: rank.get(od["symbol"], len(rank)))
+        for od in closes:
+            res = exchange.place_order(od["symbol"], od["side"], od["qty_quote"], reduce_only=True)
+            res["reason"] = od["reason"]
+            risk_mgr.on_fill(od["symbol"], res["qty_quote"])
+            if ti_policy is not None:
+                ti_policy.record_fill(od["symbol"])
+            st["fills"] += 1
+            if trade_logger is not None:
+                trade_logger.log_trade(res, equity=exchange.portfolio.equity(), cash=exchange.portfolio.cash_usd)
+            yield res
+        if not risk_mgr.can_trade():
             continue
+        if per_symbol:
+            # independent per-symbol decisions only need the symbols that printed a new bar;
+            # this is also what makes a symbol-sharded run identical to a single-process one
+            prices = {s: prices[s] for s in exchange.changed_symbols if s in prices}
+        else:
+            # symbols whose last bar is older than the ffill tolerance are not traded on
+            stale = getattr(exchange, "stale_symbols", None)
+            if stale:
+                prices = {s: p for s, p in prices.items() if s not in stale}
+        if closes:
+            # symbols closed above sit this step out
+            closed = {od["symbol"] for od in closes}
+            prices = {s: p for s, p in prices.items() if s not in closed}
         orders = strategy.on_tick(prices, exchange, risk_mgr)
         for od in orders:
+            if ti_policy is not None and not ti_policy.allow_signal(od, exchange.portfolio, prices):
+                continue
             res = exchange.place_order(od["symbol"], od["side"], od["qty_quote"])
-            results.append(res)
+            risk_mgr.on_fill(od["symbol"], res["qty_quote"])
+            if ti_policy is not None:
+                ti_policy.record_fill(od["symbol"])
+            st["fills"] += 1
             if trade_logger is not None:
-                trade_logger.log_trade(res, equity=exchange.portfolio.equity(exchange.get_prices()), cash=exchange.portfolio.cash_usd)
-    return results
+                trade_logger.log_trade(res, equity=exchange.portfolio.equity(), cash=exchange.portfolio.cash_usd)
+            yield res
+    refresh(time.perf_counter())
+    st["final_equity"] = exchange.portfolio.equity()
+
+
+def run_backtest(
+    exchange,
+    strategy,
+    risk_mgr,
+    max_steps: Optional[int] = None,
+    trade_logger: Optional[object] = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+    progress_every_sec: float = 5.0,
+    ti_policy: Optional[object] = None,
+) -> Dict:
+    """Run ``iter_backtest`` to completion and return its summary stats (fills are not kept)."""
+    stats: Dict = {}
+    for _ in iter_backtest(exchange, strategy, risk_mgr, max_steps, trade_logger, stats, ti_policy, progress, progress_every_sec):
+        pass
+    return stats
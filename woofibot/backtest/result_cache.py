@@ -0,0 +1,279 @@
+"""
+Memoized backtest results.
+
+The key hashes everything that decides a backtest's outcome:
+
+- the effective config: markets, order size, strategy and its params, risk, TI, and the
+  backtest section minus cache locations;
+- the source of every module in the ``woofibot`` package (simulation, risk, TI, data
+  loading/resampling, strategies, config) and of the strategy's module, so a code change
+  is a new key;
+- a fingerprint of every candle file the bars come from (``resample.fingerprint``).
+
+An entry stores the summary, the fills (JSONL, each tagged with the step it happened on)
+and the per-step equity curve (npz). A hit skips the simulation entirely and replays both
+into the trade logger in the order a run writes them, with the simulated clock set to each
+row's candle time. Entries are evicted least-recently-used once
+``max_entries`` or ``max_bytes`` is exceeded; ``invalidate()`` drops one key or all.
+
+    python -m woofibot.backtest.result_cache data/cache/backtests --list
+    python -m woofibot.backtest.result_cache data/cache/backtests --clear
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..data.candle_store import CandleStore
+from ..data.loader import bar_sources
+from ..data.resample import fingerprint
+from ..utils.clock import SimClock
+from .engine import iter_backtest
+
+_PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+_EQUITY_FIELDS = ("ts", "equity", "cash", "realized_total", "unrealized")
+_CONFIG_SECTIONS = {"markets", "order_size", "strategy", "strategy_params", "risk", "ti", "backtest"}
+_NOT_IN_KEY = {"shards", "cache_dir", "result_cache_dir", "result_cache_max_entries", "result_cache_max_mb"}
+
+
+def _source_hash(h, module) -> None:
+    path = inspect.getsourcefile(module)
+    h.update(Path(path).name.encode())
+    h.update(Path(path).read_bytes())
+
+
+def _package_hash(h) -> None:
+    for path in sorted(_PACKAGE_ROOT.rglob("*.py")):
+        h.update(path.relative_to(_PACKAGE_ROOT).as_posix().encode())
+        h.update(path.read_bytes())
+
+
+def backtest_key(cfg, strategy) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    conf = cfg.model_dump(include=_CONFIG_SECTIONS)
+    conf["backtest"] = {k: v for k, v in conf["backtest"].items() if k not in _NOT_IN_KEY}
+    h.update(json.dumps(conf, sort_keys=True, default=str).encode())
+    _package_hash(h)
+    strategy_src = Path(inspect.getsourcefile(sys.modules[type(strategy).__module__])).resolve()
+    if _PACKAGE_ROOT not in strategy_src.parents:
+        _source_hash(h, sys.modules[type(strategy).__module__])
+    b = cfg.backtest
+    store = CandleStore(b.store_dir) if b.store_dir else None
+    for sym in cfg.markets:
+        paths = bar_sources(sym, b.data_dir, b.timeframe, store)
+        h.update(f"{sym}:{fingerprint(paths) if paths else '-'};".encode())
+    return h.hexdigest()
+
+
+class _Tee:
+    """trade_logger stand-in that records fills/equity to an entry and forwards them."""
+
+    def __init__(self, exchange, fills_path: Path, downstream=None):
+        self.exchange = exchange
+        self.downstream = downstream
+        self.curve = {f: array("d") for f in _EQUITY_FIELDS}
+        self._fills = open(fills_path, "w", encoding="utf-8")
+
+    def log_trade(self, res: Dict, equity=None, cash=None):
+        # step = equity rows logged so far; the replay puts the fill back after that row
+        step = len(self.curve["equity"])
+        self._fills.write(json.dumps({"res": res, "equity": equity, "cash": cash, "step": step}, default=str) + "\n")
+        if self.downstream is not None:
+            self.downstream.log_trade(res, equity=equity, cash=cash)
+
+    def log_equity(self, equity, cash, realized_total=None, unrealized=None):
+        ts = getattr(self.exchange, "current_ts", None)
+        for f, v in zip(_EQUITY_FIELDS, (ts, equity, cash, realized_total, unrealized)):
+            self.curve[f].append(np.nan if v is None else v)
+        if self.downstream is not None:
+            self.downstream.log_equity(equity, cash, realized_total=realized_total, unrealized=unrealized)
+
+    def close(self):
+        self._fills.close()
+
+
+class BacktestCache:
+    def __init__(self, root: Union[str, Path], max_entries: int = 100, max_bytes: int = 1 << 30):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # lookup
+    # ------------------------------------------------------------------
+    def _entry(self, key: str) -> Path:
+        return self.root / key
+
+    def has(self, key: str) -> bool:
+        return (self._entry(key) / "summary.json").exists()
+
+    def summary(self, key: str) -> Dict[str, Any]:
+        return json.loads((self._entry(key) / "summary.json").read_text())
+
+    def fills(self, key: str, with_step: bool = False) -> Iterator[Tuple]:
+        """
+        Stored fills as ``(fill, equity, cash)``, streamed from disk; ``with_step`` appends
+        the number of equity rows logged before the fill.
+        """
+        with open(self._entry(key) / "fills.jsonl", "r", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                if with_step:
+                    yield row["res"], row["equity"], row["cash"], row["step"]
+                else:
+                    yield row["res"], row["equity"], row["cash"]
+
+    def equity_curve(self, key: str) -> Dict[str, np.ndarray]:
+        with np.load(self._entry(key) / "equity.npz") as z:
+            return {f: z[f] for f in _EQUITY_FIELDS}
+
+    # ------------------------------------------------------------------
+    # run-through
+    # ------------------------------------------------------------------
+    def run(
+        self,
+        cfg,
+        exchange,
+        strategy,
+        risk_mgr=None,
+        trade_logger: Optional[object] = None,
+        progress: Optional[Callable[[Dict], None]] = None,
+        ti_policy: Optional[object] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        ``run_backtest`` with memoization: ``(summary, hit)``. On a hit the stored fills and
+        equity curve are replayed into ``trade_logger`` instead of simulating.
+
+        ``exchange`` may be a zero-argument factory returning ``(exchange, risk_mgr)``; it is
+        only called on a miss, so a hit never loads the bars.
+        """
+        key = backtest_key(cfg, strategy)
+        lazy = callable(exchange)
+        if self.has(key):
+            self.hits += 1
+            os.utime(self._entry(key) / "summary.json")  # LRU touch
+            if trade_logger is not None:
+                self._replay(key, trade_logger, None if lazy else exchange)
+            return self.summary(key), True
+        self.misses += 1
+        if lazy:
+            exchange, risk_mgr = exchange()
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        tee = _Tee(exchange, tmp / "fills.jsonl", trade_logger)
+        stats: Dict[str, Any] = {}
+        try:
+            for _ in iter_backtest(
+                exchange, strategy, risk_mgr, trade_logger=tee, stats=stats, ti_policy=ti_policy, progress=progress
+            ):
+                pass
+        except BaseException:
+            tee.close()
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        tee.close()
+        np.savez(tmp / "equity.npz", **{f: np.frombuffer(a, dtype=np.float64) for f, a in tee.curve.items()})
+        (tmp / "summary.json").write_text(json.dumps(stats, default=str))
+        shutil.rmtree(self._entry(key), ignore_errors=True)
+        os.replace(tmp, self._entry(key))
+        self.evict()
+        return stats, False
+
+    def _replay(self, key: str, trade_logger, exchange=None):
+        """
+        Write the stored equity rows and fills into ``trade_logger`` interleaved as the run
+        wrote them, advancing the simulated clock(s) the logger reads to each row's time.
+        """
+        clocks = {id(c): c for c in (getattr(exchange, "clock", None), getattr(trade_logger, "clock", None)) if isinstance(c, SimClock)}
+        curve = self.equity_curve(key)
+        fills = self.fills(key, with_step=True)
+        pending = next(fills, None)
+        for i in range(len(curve["equity"])):
+            while pending is not None and pending[3] <= i:
+                trade_logger.log_trade(pending[0], equity=pending[1], cash=pending[2])
+                pending = next(fills, None)
+            ts = curve["ts"][i]
+            if ts == ts:
+                for clock in clocks.values():
+                    clock.set(float(ts))
+            realized, unreal = curve["realized_total"][i], curve["unrealized"][i]
+            trade_logger.log_equity(
+                float(curve["equity"][i]),
+                float(curve["cash"][i]),
+                realized_total=None if realized != realized else float(realized),
+                unrealized=None if unreal != unreal else float(unreal),
+            )
+        while pending is not None:
+            trade_logger.log_trade(pending[0], equity=pending[1], cash=pending[2])
+            pending = next(fills, None)
+
+    # ------------------------------------------------------------------
+    # housekeeping
+    # ------------------------------------------------------------------
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """``(key, last_used, bytes)`` for every complete entry, least recently used first."""
+        out = []
+        for d in self.root.iterdir():
+            marker = d / "summary.json"
+            if d.is_dir() and not d.name.startswith(".") and marker.exists():
+                size = sum(p.stat().st_size for p in d.iterdir())
+                out.append((d.name, marker.stat().st_mtime, size))
+        return sorted(out, key=lambda e: e[1])
+
+    def evict(self) -> int:
+        entries = self.entries()
+        total = sum(e[2] for e in entries)
+        removed = 0
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            key, _, size = entries.pop(0)
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """Drop one entry, or every entry when ``key`` is None. Returns how many were removed."""
+        keys = [key] if key is not None else [e[0] for e in self.entries()]
+        removed = 0
+        for k in keys:
+            if self._entry(k).exists():
+                shutil.rmtree(self._entry(k), ignore_errors=True)
+                removed += 1
+        return removed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect or clear the backtest result cache")
+    ap.add_argument("root")
+    ap.add_argument("--list", action="store_true")
+    ap.add_argument("--invalidate", metavar="KEY")
+    ap.add_argument("--clear", action="store_true")
+    args = ap.parse_args()
+    cache = BacktestCache(args.root)
+    if args.invalidate:
+        print(f"removed {cache.invalidate(args.invalidate)} entry")
+    if args.clear:
+        print(f"removed {cache.invalidate()} entries")
+    if args.list or not (args.invalidate or args.clear):
+        for key, used, size in cache.entries():
+            s = cache.summary(key)
+            print(f"{key}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(used))}  {size / 1e6:8.2f} MB  "
+                  f"steps={s.get('steps')} fills={s.get('fills')} equity={s.get('final_equity')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Symbol-sharded backtests.
+
+For strategies that decide each symbol independently (``StrategyBase.per_symbol``) the
+universe is split across worker processes, each with its own ``PaperExchange`` and
+``Portfolio`` over a subset of markets. Workers share the memory-mapped bars
+(``shared_bars.init_worker``) and return their fills and equity curve stamped with candle
+time; the parent merges them deterministically:
+
+- fills are ordered by (candle ts, TP/SL closes before strategy orders, position of the
+  symbol in ``markets``, shard sequence), the order a single-process run emits them in;
+- the equity curve is the starting equity plus the sum of every shard's PnL, each shard
+  forward-filled onto the union of timestamps.
+
+Sharding is refused when anything couples symbols, because the split would silently
+change results: a finite ``risk.max_exposure_usd`` or ``risk.daily_loss_limit_pct``, any of
+the rolling ``risk.max_drawdown_pct`` / ``max_realized_vol_pct`` / ``max_turnover_usd``
+limits (all checked against the whole portfolio) or a strategy that is not ``per_symbol``.
+"""
+
+import argparse
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..strategies import build_strategy
+from ..utils.config import Config, load_config
+from .engine import iter_backtest
+from .shared_bars import SHARED, init_worker, share_bars
+from .sweep import apply_overrides, build_backtest
+
+
+class ShardingError(ValueError):
+    pass
+
+
+def shard_blockers(cfg: Config, strategy=None) -> List[str]:
+    """Reasons this backtest cannot be split by symbol (empty list = safe to shard)."""
+    reasons = []
+    if math.isfinite(cfg.risk.max_exposure_usd):
+        reasons.append("risk.max_exposure_usd caps exposure across all symbols (set it to .inf to shard)")
+    if math.isfinite(cfg.risk.daily_loss_limit_pct):
+        reasons.append("risk.daily_loss_limit_pct is checked on total portfolio equity (set it to .inf to shard)")
+    for name in ("max_drawdown_pct", "max_realized_vol_pct", "max_turnover_usd"):
+        if getattr(cfg.risk, name) > 0:
+            reasons.append(f"risk.{name} is a rolling limit on the whole portfolio (set it to 0 to shard)")
+    if strategy is None:
+        strategy = build_strategy(cfg.strategy, cfg.strategy_params)
+        strategy.params.setdefault("order_size_override", cfg.order_size)
+    if not getattr(strategy, "per_symbol", False):
+        reasons.append(f"strategy {cfg.strategy} does not decide symbols independently")
+    return reasons
+
+
+def split_symbols(symbols: List[str], shards: int) -> List[List[str]]:
+    """Round-robin so shards stay balanced when markets are listed by size."""
+    shards = max(1, min(shards, len(symbols)))
+    return [symbols[i::shards] for i in range(shards)]
+
+
+class _ShardLog:
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.fills: List[tuple] = []
+        self.ts: List[float] = []
+        self.equity: List[float] = []
+
+    def log_trade(self, res, equity=None, cash=None):
+        self.fills.append((self.exchange.current_ts, len(self.fills), res))
+
+    def log_equity(self, equity, cash, realized_total=None, unrealized=None):
+        self.ts.append(self.exchange.current_ts)
+        self.equity.append(equity)
+
+
+def _run_shard(base: Dict[str, Any], symbols: List[str]) -> Dict[str, Any]:
+    cfg = apply_overrides(base, {"markets": symbols})
+    ex, strat, risk_mgr, ti_policy = build_backtest(cfg, candles=SHARED)
+    start_equity = ex.portfolio.cash_usd
+    log = _ShardLog(ex)
+    stats: Dict[str, Any] = {}
+    for _ in iter_backtest(ex, strat, risk_mgr, trade_logger=log, stats=stats, ti_policy=ti_policy):
+        pass
+    return {
+        "start_equity": start_equity,
+        "fills": log.fills,
+        "ts": np.asarray(log.ts, dtype=np.float64),
+        "equity": np.asarray(log.equity, dtype=np.float64),
+        "stats": stats,
+    }
+
+
+def merge_shards(results: List[Dict[str, Any]], markets: List[str]) -> Dict[str, Any]:
+    """Deterministic merge of shard outputs into one fill stream, equity curve and summary."""
+    order = {sym: i for i, sym in enumerate(markets)}
+    # within a step a single-process run emits TP/SL closes first, then strategy orders
+    fills = [
+        (ts, "reason" not in res, order.get(res["symbol"], len(order)), shard, seq, res)
+        for shard, r in enumerate(results)
+        for ts, seq, res in r["fills"]
+    ]
+    fills.sort(key=lambda f: f[:5])
+    start = results[0]["start_equity"] if results else 0.0
+    union = np.unique(np.concatenate([r["ts"] for r in results])) if results else np.empty(0)
+    equity = np.full(len(union), start)
+    for r in results:
+        if not len(r["ts"]):
+            continue
+        # shard PnL forward-filled onto the union timeline (0 before its first bar)
+        pos = np.searchsorted(r["ts"], union, side="right") - 1
+        pnl = np.where(pos >= 0, r["equity"][np.maximum(pos, 0)] - r["start_equity"], 0.0)
+        equity += pnl
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    dd = np.where(peak > 0, (peak - equity) / np.where(peak > 0, peak, 1.0) * 100.0, 0.0)
+    summary = {
+        "shards": len(results),
+        "steps": int(len(union)),
+        "fills": len(fills),
+        "max_drawdown_pct": float(dd.max()) if len(dd) else 0.0,
+        # shard curves are sampled before each step's orders; the final value includes them
+        "final_equity": start + sum(r["stats"]["final_equity"] - r["start_equity"] for r in results),
+        "shard_elapsed_sec": [r["stats"].get("elapsed_sec") for r in results],
+    }
+    return {
+        "summary": summary,
+        "fills": [f[5] for f in fills],
+        "fill_ts": [f[0] for f in fills],
+        "equity": pd.DataFrame({"ts": union, "equity": equity}),
+    }
+
+
+def run_sharded(base_cfg: Config, shards: Optional[int] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Backtest ``base_cfg`` with its markets split over ``shards`` processes (default: one per
+    core). Raises ``ShardingError`` when symbols are coupled.
+    """
+    reasons = shard_blockers(base_cfg)
+    if reasons:
+        raise ShardingError("cannot shard this backtest: " + "; ".join(reasons))
+    t0 = time.perf_counter()
+    n = shards or os.cpu_count() or 1
+    groups = split_symbols(list(base_cfg.markets), n)
+    base = base_cfg.model_dump()
+    tf = base_cfg.backtest.timeframe
+    tmp = tempfile.mkdtemp(prefix="woofibot-shard-")
+    try:
+        shared = share_bars(base_cfg, tmp)
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(workers or len(groups), len(groups))),
+            initializer=init_worker,
+            initargs=(tmp, shared, tf),
+        ) as pool:
+            futures = [pool.submit(_run_shard, base, g) for g in groups]
+            results = [f.result() for f in futures]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    merged = merge_shards(results, list(base_cfg.markets))
+    merged["summary"]["elapsed_sec"] = time.perf_counter() - t0
+    return merged
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backtest with markets sharded across processes")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--shards", type=int, default=None, help="default: one per core")
+    ap.add_argument("--fills-out", help="write merged fills to this CSV")
+    ap.add_argument("--equity-out", help="write the merged equity curve to this CSV")
+    args = ap.parse_args()
+    cfg = load_config(args.config)
+    merged = run_sharded(cfg, shards=args.shards)
+    print(merged["summary"])
+    if args.fills_out:
+        df = pd.DataFrame(merged["fills"])
+        df.insert(0, "candle_ts", merged["fill_ts"])
+        df.to_csv(args.fills_out, index=False)
+    if args.equity_out:
+        merged["equity"].to_csv(args.equity_out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Bars shared read-only with backtest worker processes.
+
+The parent resolves each market's bars once (store, CSV or resampled, as in a normal
+backtest) and writes them to a temporary candle store with ``share_bars``. Workers
+memory-map that store, so every process reads the same pages through the OS cache:
+
+- ``init_worker`` (a pool initializer) maps one store into ``SHARED``; walk-forward and
+  sharded runs, which all work on the same bars, read from there.
+- ``bars_at`` maps a store on first use and keeps it per root; sweeps use it because
+  grid points that override the data (timeframe, dates, markets) get a store each.
+"""
+
+from typing import Dict, List
+
+from ..data.candle_store import CandleStore, write_entry
+from ..data.candles import Candles
+from ..data.loader import load_bars
+from ..data.resample import BarCache
+from ..utils.config import Config
+
+SHARED: Dict[str, Candles] = {}  # per-worker memory-mapped bars, set by init_worker
+_BY_ROOT: Dict[str, Dict[str, Candles]] = {}  # per-worker stores mapped by bars_at
+
+
+def share_bars(cfg: Config, root: str) -> List[str]:
+    """Resolve every market's bars once and write them to a candle store at ``root``."""
+    b = cfg.backtest
+    store = CandleStore(b.store_dir) if b.store_dir else None
+    cache = BarCache(b.cache_dir) if b.cache_dir and b.timeframe != "1m" else None
+    shared = []
+    for sym in cfg.markets:
+        bars = load_bars(sym, b.data_dir, b.timeframe, store, cache, b.start, b.end)
+        if bars is not None:
+            write_entry(bars, CandleStore(root).path(sym, b.timeframe))
+            shared.append(sym)
+    return shared
+
+
+def load_shared(store_root: str, symbols: List[str], timeframe: str) -> Dict[str, Candles]:
+    store = CandleStore(store_root)
+    return {s: store.load(s, timeframe) for s in symbols if store.has(s, timeframe)}
+
+
+def init_worker(store_root: str, symbols: List[str], timeframe: str):
+    SHARED.clear()
+    SHARED.update(load_shared(store_root, symbols, timeframe))
+
+
+def bars_at(store_root: str, symbols: List[str], timeframe: str) -> Dict[str, Candles]:
+    if store_root not in _BY_ROOT:
+        _BY_ROOT[store_root] = load_shared(store_root, symbols, timeframe)
+    return _BY_ROOT[store_root]
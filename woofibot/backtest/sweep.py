@@ -0,0 +1,204 @@
+"""
+Parallel parameter sweep over ``run_backtest``.
+
+The spec lists dotted config keys to vary, either as a full grid or as a random search:
+
+    grid:
+      strategy_params.liquidity_gap.min_spread_pct: [0.0, 0.05, 0.1]
+      risk.stop_loss_pct: [0.5, 1.0]
+
+    random:
+      n: 50
+      seed: 7
+      params:
+        strategy_params.liquidity_gap.min_spread_pct: {low: 0.0, high: 0.2}
+        risk.stop_loss_pct: [0.5, 1.0, 2.0]   # list = choice
+
+Bars are shared with the workers through memory-mapped candle stores (``shared_bars``),
+one per distinct data key (markets, data and store dirs, timeframe, start, end), so a
+combination that overrides any of those runs on its own bars. Every worker maps each
+store the first time it needs it.
+
+    python -m woofibot.backtest.sweep --config config.yaml --spec examples/sweep.example.yaml
+"""
+
+import argparse
+import copy
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import yaml
+
+from ..core.fill_model import FillModel
+from ..core.paper_exchange import PaperExchange
+from ..data.candles import Candles
+from ..risk.risk_manager import RiskManager
+from ..risk.ti_policy import TIPolicy
+from ..strategies import build_strategy
+from ..utils.config import Config, load_config
+from .engine import run_backtest
+from .shared_bars import bars_at, share_bars
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def sample_random(params: Dict[str, Any], n: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        combo = {}
+        for key, dist in params.items():
+            if isinstance(dist, dict):
+                combo[key] = rng.uniform(float(dist["low"]), float(dist["high"]))
+            else:
+                combo[key] = rng.choice(list(dist))
+        out.append(combo)
+    return out
+
+
+def combos_from_spec(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if "grid" in spec:
+        return expand_grid(spec["grid"])
+    if "random" in spec:
+        r = spec["random"]
+        return sample_random(r["params"], int(r.get("n", 20)), r.get("seed"))
+    raise ValueError("sweep spec needs a 'grid' or 'random' section")
+
+
+def apply_overrides(base: Dict[str, Any], overrides: Dict[str, Any]) -> Config:
+    data = copy.deepcopy(base)
+    for dotted, value in overrides.items():
+        node = data
+        *parents, leaf = dotted.split(".")
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = value
+    return Config(**data)
+
+
+def build_backtest(cfg: Config, candles: Optional[Dict[str, Candles]] = None):
+    """``(exchange, strategy, risk_mgr, ti_policy)`` for a backtest of ``cfg``, wired as run.py does."""
+    ex = PaperExchange(
+        cfg.markets,
+        cfg.backtest.data_dir,
+        cfg.backtest.fee_bps,
+        fill_model=FillModel.from_config(cfg.backtest),
+        max_ffill_sec=cfg.backtest.max_ffill_sec,
+        store_dir=cfg.backtest.store_dir,
+        start=cfg.backtest.start,
+        end=cfg.backtest.end,
+        timeframe=cfg.backtest.timeframe,
+        cache_dir=cfg.backtest.cache_dir,
+        candles=candles,
+        portfolio=cfg.portfolio,
+    )
+    strat = build_strategy(cfg.strategy, cfg.strategy_params)
+    if hasattr(strat, "params") and "order_size_override" not in strat.params:
+        strat.params["order_size_override"] = cfg.order_size
+    return ex, strat, RiskManager(ex.portfolio, cfg.risk), TIPolicy(cfg.ti, clock=ex.clock)
+
+
+def backtest_config(cfg: Config, candles: Optional[Dict[str, Candles]] = None) -> Dict[str, Any]:
+    """One silent backtest of ``cfg``; returns the ``run_backtest`` summary plus PnL."""
+    ex, strat, risk_mgr, ti_policy = build_backtest(cfg, candles)
+    start_equity = ex.portfolio.cash_usd
+    summary = run_backtest(ex, strat, risk_mgr, ti_policy=ti_policy)
+    summary["pnl"] = summary["final_equity"] - start_equity
+    summary["return_pct"] = summary["pnl"] / start_equity * 100.0 if start_equity else 0.0
+    return summary
+
+
+def data_key(cfg: Config) -> Tuple[Any, ...]:
+    """Everything that decides which bars a backtest of ``cfg`` runs on."""
+    b = cfg.backtest
+    return tuple(cfg.markets), b.data_dir, b.store_dir, b.timeframe, b.start, b.end
+
+
+def _run_one(base: Dict[str, Any], overrides: Dict[str, Any], store_root: str) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    try:
+        cfg = apply_overrides(base, overrides)
+        summary = backtest_config(cfg, candles=bars_at(store_root, cfg.markets, cfg.backtest.timeframe))
+        error = None
+    except Exception as exc:  # one bad combination must not sink the sweep
+        summary, error = {}, repr(exc)
+    return {
+        **overrides,
+        "pnl": summary.get("pnl"),
+        "return_pct": summary.get("return_pct"),
+        "max_drawdown_pct": summary.get("max_drawdown_pct"),
+        "trades": summary.get("fills"),
+        "steps": summary.get("steps"),
+        "runtime_sec": time.perf_counter() - t0,
+        "error": error,
+    }
+
+
+def run_sweep(
+    base_cfg: Config,
+    combos: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    sort_by: str = "pnl",
+) -> pd.DataFrame:
+    """Backtest every override combination on a process pool; returns results ranked by ``sort_by``."""
+    base = base_cfg.model_dump()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(combos) or 1))
+    tmp = tempfile.mkdtemp(prefix="woofibot-sweep-")
+    try:
+        roots: Dict[Tuple[Any, ...], str] = {}
+        combo_roots = []
+        for combo in combos:
+            try:
+                cfg = apply_overrides(base, combo)
+            except Exception:  # invalid combination; its worker reports the error
+                cfg = base_cfg
+            key = data_key(cfg)
+            if key not in roots:
+                roots[key] = os.path.join(tmp, str(len(roots)))
+                share_bars(cfg, roots[key])
+            combo_roots.append(roots[key])
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_run_one, itertools.repeat(base), combos, combo_roots))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    df = pd.DataFrame(rows)
+    if len(df):
+        df = df.sort_values(sort_by, ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+        df.index = df.index + 1
+        df.index.name = "rank"
+    return df
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parallel parameter sweep over run_backtest")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--spec", required=True, help="YAML with a 'grid' or 'random' section")
+    ap.add_argument("--workers", type=int, default=None, help="default: all cores")
+    ap.add_argument("--sort-by", default="pnl")
+    ap.add_argument("--out", help="write the ranked table to this CSV")
+    args = ap.parse_args()
+
+    cfg = load_config(args.config)
+    with open(args.spec, "r", encoding="utf-8") as f:
+        combos = combos_from_spec(yaml.safe_load(f))
+    t0 = time.perf_counter()
+    df = run_sweep(cfg, combos, workers=args.workers, sort_by=args.sort_by)
+    with pd.option_context("display.max_rows", 50, "display.max_columns", None, "display.width", 200):
+        print(df)
+    print(f"{len(combos)} backtests in {time.perf_counter() - t0:.1f}s")
+    if args.out:
+        df.to_csv(args.out)
+
+
+if __name__ == "__main__":
+    main()
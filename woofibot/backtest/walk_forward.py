@@ -0,0 +1,184 @@
+"""
+Walk-forward optimisation on top of ``run_backtest``.
+
+The bar timeline is cut into rolling windows: ``train`` of in-sample data followed by
+``test`` of out-of-sample data, advancing by ``step`` (default ``test``). In each window
+every combination of the sweep spec is backtested in-sample, the best one by ``metric``
+is kept and then evaluated out-of-sample, so reported OOS numbers never saw the data
+their parameters were picked on.
+
+Windows run in parallel on a process pool. Workers memory-map the shared bars once
+(``shared_bars.init_worker``) and every window is a ``searchsorted`` slice of those arrays,
+i.e. a view: nothing is copied per window or per backtest.
+
+    python -m woofibot.backtest.walk_forward --config config.yaml --spec examples/sweep.example.yaml \\
+        --train 30d --test 7d
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import yaml
+
+from ..data.candle_store import CandleStore, slice_range
+from ..utils.config import Config, load_config
+from .shared_bars import SHARED, init_worker, share_bars
+from .sweep import apply_overrides, backtest_config, combos_from_spec, data_key
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_duration(text: str) -> int:
+    """``"90m"``, ``"12h"``, ``"30d"``, ``"2w"`` or plain seconds -> seconds."""
+    text = str(text).strip()
+    if text[-1:] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(float(text))
+
+
+def make_windows(
+    t_first: int, t_last: int, train: int, test: int, step: Optional[int] = None, bar_sec: int = 0
+) -> List[Tuple[int, int, int]]:
+    """
+    ``(in_sample_start, out_of_sample_start, out_of_sample_end)`` triples; bounds are inclusive.
+    The last bar covers ``[t_last, t_last + bar_sec)``; a trailing window whose out-of-sample
+    slice is shorter than ``test`` is dropped, its metrics would rest on a few bars.
+    """
+    step = step or test
+    out = []
+    t = t_first
+    while t + train + test <= t_last + bar_sec:
+        out.append((t, t + train, min(t + train + test, t_last + 1) - 1))
+        t += step
+    return out
+
+
+def _window_view(start: int, end: int) -> Dict[str, Any]:
+    return {sym: slice_range(bars, start, end) for sym, bars in SHARED.items()}
+
+
+def _run_window(base: Dict[str, Any], combos: List[Dict[str, Any]], window: Tuple[int, int, int], metric: str) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    is_start, oos_start, oos_end = window
+    in_sample = _window_view(is_start, oos_start - 1)
+    best, best_score = None, None
+    for combo in combos:
+        try:
+            score = backtest_config(apply_overrides(base, combo), candles=in_sample)[metric]
+        except Exception:  # skip combinations that fail in this window
+            continue
+        if best_score is None or score > best_score:
+            best, best_score = combo, score
+    row: Dict[str, Any] = {
+        "is_start": pd.to_datetime(is_start, unit="s"),
+        "oos_start": pd.to_datetime(oos_start, unit="s"),
+        "oos_end": pd.to_datetime(oos_end, unit="s"),
+        "best_params": best,
+        f"is_{metric}": best_score,
+    }
+    if best is not None:
+        oos = backtest_config(apply_overrides(base, best), candles=_window_view(oos_start, oos_end))
+        row.update(
+            oos_pnl=oos["pnl"],
+            oos_return_pct=oos["return_pct"],
+            oos_max_drawdown_pct=oos["max_drawdown_pct"],
+            oos_trades=oos["fills"],
+        )
+    row["runtime_sec"] = time.perf_counter() - t0
+    return row
+
+
+def _timeline_bounds(root: str, symbols: List[str], timeframe: str) -> Tuple[int, int]:
+    store = CandleStore(root)
+    firsts, lasts = [], []
+    for sym in symbols:
+        ts = store.load(sym, timeframe)["timestamp"]
+        if len(ts):
+            firsts.append(int(ts[0]))
+            lasts.append(int(ts[-1]))
+    if not firsts:
+        raise ValueError("no bars to walk forward over")
+    return min(firsts), max(lasts)
+
+
+def run_walk_forward(
+    base_cfg: Config,
+    combos: List[Dict[str, Any]],
+    train_sec: int,
+    test_sec: int,
+    step_sec: Optional[int] = None,
+    workers: Optional[int] = None,
+    metric: str = "pnl",
+) -> pd.DataFrame:
+    """One row per window: the in-sample winner and its out-of-sample result."""
+    base = base_cfg.model_dump()
+    for combo in combos:
+        try:
+            cfg = apply_overrides(base, combo)
+        except Exception:  # fails again, and is skipped, in every window
+            continue
+        if data_key(cfg) != data_key(base_cfg):
+            # every window is cut from the base config's bars
+            raise ValueError(f"walk-forward combinations cannot override markets, data, timeframe or dates: {combo}")
+    tf = base_cfg.backtest.timeframe
+    tmp = tempfile.mkdtemp(prefix="woofibot-wf-")
+    try:
+        symbols = share_bars(base_cfg, tmp)
+        bounds = _timeline_bounds(tmp, symbols, tf)
+        windows = make_windows(*bounds, train_sec, test_sec, step_sec, bar_sec=parse_duration(tf))
+        if not windows:
+            return pd.DataFrame()
+        n = max(1, min(workers or os.cpu_count() or 1, len(windows)))
+        with ProcessPoolExecutor(max_workers=n, initializer=init_worker, initargs=(tmp, symbols, tf)) as pool:
+            futures = [pool.submit(_run_window, base, combos, w, metric) for w in windows]
+            rows = [f.result() for f in futures]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    df = pd.DataFrame(rows)
+    df.index.name = "window"
+    return df
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Walk-forward optimisation over run_backtest")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--spec", required=True, help="sweep spec (grid or random) optimised in each window")
+    ap.add_argument("--train", required=True, help="in-sample length, e.g. 30d")
+    ap.add_argument("--test", required=True, help="out-of-sample length, e.g. 7d")
+    ap.add_argument("--step", help="window advance (default: --test)")
+    ap.add_argument("--metric", default="pnl", help="in-sample objective from the run summary")
+    ap.add_argument("--workers", type=int, default=None, help="default: all cores")
+    ap.add_argument("--out", help="write the per-window table to this CSV")
+    args = ap.parse_args()
+
+    cfg = load_config(args.config)
+    with open(args.spec, "r", encoding="utf-8") as f:
+        combos = combos_from_spec(yaml.safe_load(f))
+    t0 = time.perf_counter()
+    df = run_walk_forward(
+        cfg,
+        combos,
+        parse_duration(args.train),
+        parse_duration(args.test),
+        parse_duration(args.step) if args.step else None,
+        workers=args.workers,
+        metric=args.metric,
+    )
+    with pd.option_context("display.max_rows", 200, "display.max_columns", None, "display.width", 200, "display.max_colwidth", 80):
+        print(df)
+    if len(df) and "oos_pnl" in df:
+        print(f"out-of-sample: total pnl {df['oos_pnl'].sum():.2f} over {len(df)} windows, "
+              f"{(df['oos_pnl'] > 0).mean() * 100:.0f}% profitable")
+    print(f"{len(df)} windows x {len(combos)} combinations in {time.perf_counter() - t0:.1f}s")
+    if args.out:
+        df.to_csv(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+from collections.abc import Mapping
+from math import isfinite
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.clock import Clock, WALL_CLOCK
+from .portfolio import Position, apply_fill
+
+
+class _PositionsView(Mapping):
+    """Read-only ``positions`` mapping over an ``ArrayPortfolio``; items are ``Position`` copies."""
+
+    def __init__(self, pf: "ArrayPortfolio"):
+        self._pf = pf
+
+    def __getitem__(self, symbol: str) -> Position:
+        i = self._pf._index.get(symbol)
+        if i is None or not self._pf._filled[i]:
+            raise KeyError(symbol)
+        pf = self._pf
+        return Position(qty=float(pf.qty[i]), avg_price=float(pf.avg_price[i]), ts=float(pf.ts[i]))
+
+    def __iter__(self) -> Iterator[str]:
+        pf = self._pf
+        return (pf._symbols[i] for i in np.flatnonzero(pf._filled[: pf._n]).tolist())
+
+    def __len__(self) -> int:
+        return int(self._pf._filled[: self._pf._n].sum())
+
+
+class ArrayPortfolio:
+    """
+    ``Portfolio`` with positions held in contiguous NumPy columns, for large universes.
+
+    Each symbol gets a fixed row (``index(symbol)``) in ``qty``, ``avg_price``, ``ts`` and
+    ``mark`` (NaN until first marked). Fills use the same netting as ``Portfolio``; marks
+    can be written in bulk with ``set_marks(rows, prices)``, and equity, unrealized PnL and
+    exposure are single dot products over the columns. ``positions`` is a read-only view
+    so callers written against ``Portfolio`` keep working.
+    """
+
+    def __init__(self, symbols: Sequence[str] = (), cash_usd: float = 1000.0, clock: Optional[Clock] = None):
+        self.cash_usd = cash_usd
+        self.realized_pnl_usd = 0.0
+        self.clock = clock or WALL_CLOCK
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._n = 0
+        self._alloc(max(8, len(symbols)))
+        for sym in symbols:
+            self.index(sym)
+        self.positions = _PositionsView(self)
+
+    def _alloc(self, cap: int):
+        old = self._n
+        cols = {
+            "qty": np.zeros(cap),
+            "avg_price": np.zeros(cap),
+            "ts": np.zeros(cap),
+            "mark": np.full(cap, np.nan),
+            "_filled": np.zeros(cap, dtype=bool),
+        }
+        for name, col in cols.items():
+            if old:
+                col[:old] = getattr(self, name)[:old]
+            setattr(self, name, col)
+
+    def index(self, symbol: str) -> int:
+        """Row of ``symbol``, allocating one (and growing the columns) on first use."""
+        i = self._index.get(symbol)
+        if i is None:
+            i = self._n
+            if i == len(self.qty):
+                self._alloc(2 * i)
+            self._index[symbol] = i
+            self._symbols.append(symbol)
+            self._n = i + 1
+        return i
+
+    def update_fill(self, symbol: str, side: str, qty_base: float, price: float, fee: float):
+        i = self.index(symbol)
+        qty, avg, realized_delta, cash_delta = apply_fill(float(self.qty[i]), float(self.avg_price[i]), side, qty_base, price)
+        self.cash_usd += cash_delta
+        # Deduct fee from cash
+        self.cash_usd -= fee
+        self.realized_pnl_usd += realized_delta
+        self.qty[i] = qty
+        self.avg_price[i] = avg
+        self.ts[i] = self.clock.time()
+        self._filled[i] = True
+        return {
+            "realized_delta": realized_delta,
+            "pos_qty": qty,
+            "pos_avg": avg,
+        }
+
+    def set_position(self, symbol: str, qty: float, avg_price: float, ts: float):
+        """Overwrite one position (state restore)."""
+        i = self.index(symbol)
+        self.qty[i], self.avg_price[i], self.ts[i] = qty, avg_price, ts
+        self._filled[i] = True
+
+    def open_arrays(self, prices: Optional[Dict[str, float]] = None) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """``(symbols, qty, avg_price, mark)`` of open positions; mark is NaN when unknown."""
+        rows = np.flatnonzero(self.qty[: self._n])
+        syms = [self._symbols[i] for i in rows.tolist()]
+        if prices is None:
+            mark = self.mark[rows]
+        else:
+            mark = np.fromiter((prices.get(s, np.nan) for s in syms), dtype=np.float64, count=len(syms))
+        return syms, self.qty[rows], self.avg_price[rows], mark
+
+    def _marks(self, prices: Optional[Dict[str, float]]) -> np.ndarray:
+        n = self._n
+        if prices is None:
+            mark = self.mark[:n]
+            return np.where(np.isnan(mark), self.avg_price[:n], mark)
+        avg = self.avg_price[:n].tolist()
+        return np.fromiter((prices.get(s, a) for s, a in zip(self._symbols, avg)), dtype=np.float64, count=n)
+
+    def equity(self, prices: Optional[Dict[str, float]] = None) -> float:
+        return self.cash_usd + float(self.qty[: self._n] @ self._marks(prices))
+
+    def unrealized_total(self, prices: Optional[Dict[str, float]] = None) -> float:
+        n = self._n
+        return float(self.qty[:n] @ (self._marks(prices) - self.avg_price[:n]))
+
+    def open_notional(self, prices: Optional[Dict[str, float]] = None) -> float:
+        """Absolute USD exposure of all open positions (long + short)."""
+        return float(np.abs(self.qty[: self._n]) @ self._marks(prices))
+
+    # ---- helpers for risk manager ----
+    def update_mark(self, symbol: str, price: float):
+        if isfinite(price):  # keep the last good mark over a NaN/inf tick
+            self.mark[self.index(symbol)] = price
+
+    def update_marks(self, marks: Iterable[Tuple[str, float]]):
+        for sym, price in marks:
+            if isfinite(price):
+                self.mark[self.index(sym)] = price
+
+    def set_marks(self, rows: np.ndarray, prices: np.ndarray):
+        """Vectorized mark update: ``prices[k]`` is the new mark of row ``rows[k]``."""
+        ok = np.isfinite(prices)  # keep the last good mark over a NaN/inf bar, as update_marks does
+        if ok.all():
+            self.mark[rows] = prices
+        else:
+            self.mark[rows[ok]] = prices[ok]
+
+    def latest_prices(self) -> Dict[str, float]:
+        mark = self.mark[: self._n].tolist()
+        return {s: m for s, m in zip(self._symbols, mark) if m == m}
+
+    def mark_of(self, symbol: str) -> Optional[float]:
+        i = self._index.get(symbol)
+        m = float(self.mark[i]) if i is not None else float("nan")
+        return m if m == m else None
+
+    def position_snapshot(self):
+        open_rows = np.flatnonzero(self.qty[: self._n])
+        if not len(open_rows):
+            return None
+        i = int(open_rows[0])
+        return {
+            "symbol": self._symbols[i],
+            "qty": float(self.qty[i]),
+            "avg": float(self.avg_price[i]),
+            "ts": float(self.ts[i]),
+        }
@@ -0,0 +1,96 @@
+"""
+Paper fill pricing.
+
+With an L2 book the order walks the levels on the taker side: the book's cached
+cumulative size/notional locate the level that crosses the order size with one bisect
+(``L2Book.take``), full levels are taken up to it and that level is filled partially.
+Without depth (candle mode, top-of-book only feeds) the touch price is pushed by a
+configurable impact model instead, capped just below 100% so a price never reaches zero.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class FillResult:
+    price: float
+    qty_base: float
+    levels: List[Tuple[float, float]] = field(default_factory=list)  # (price, qty_base) per level
+    depth_exhausted: bool = False
+
+
+def walk_book(book, side: str, amount: float, notional: bool = True) -> FillResult:
+    """
+    Fill ``amount`` quote (``notional``) or base against ``book`` from the touch outward,
+    using the book's cumulative walk. If the book runs out, the remainder is filled at the
+    last (worst) level price.
+    """
+    prices, sizes = book.levels("ask" if side == "buy" else "bid")
+    i, qty, quote = book.take(side, amount, notional)
+    rest = amount - (quote if notional else qty)
+    exhausted = rest > 1e-12
+    if exhausted:
+        qty += rest / prices[-1] if notional else rest
+        quote += rest if notional else rest * prices[-1]
+    fill_qty = sizes[: i + 1].copy()
+    fill_qty[i] = qty - float(sizes[:i].sum())
+    return FillResult(
+        price=quote / qty if qty > 0 else float(prices[0]),
+        qty_base=qty,
+        levels=list(zip(prices[: i + 1].tolist(), fill_qty.tolist())),
+        depth_exhausted=bool(exhausted),
+    )
+
+
+class FillModel:
+    """
+    ``impact_model``: ``none`` (fill at the touch), ``linear`` or ``sqrt``. Impact in bps is
+    ``impact_coef_bps * (qty_quote / impact_ref_notional)`` (or its square root), applied
+    on top of the touch when no depth is available and capped at ``MAX_IMPACT_BPS``.
+    """
+
+    MAX_IMPACT_BPS = 9999.0
+
+    def __init__(self, impact_model: str = "none", impact_coef_bps: float = 0.0, impact_ref_notional: float = 10000.0):
+        if impact_model not in ("none", "linear", "sqrt"):
+            raise ValueError(f"Unknown impact_model {impact_model}")
+        self.impact_model = impact_model
+        self.impact_coef_bps = impact_coef_bps
+        self.impact_ref_notional = max(1e-9, impact_ref_notional)
+
+    @classmethod
+    def from_config(cls, cfg) -> "FillModel":
+        return cls(
+            impact_model=getattr(cfg, "impact_model", "none"),
+            impact_coef_bps=getattr(cfg, "impact_coef_bps", 0.0),
+            impact_ref_notional=getattr(cfg, "impact_ref_notional", 10000.0),
+        )
+
+    def impact_bps(self, qty_quote: float) -> float:
+        x = abs(qty_quote) / self.impact_ref_notional
+        if self.impact_model == "linear":
+            return min(self.impact_coef_bps * x, self.MAX_IMPACT_BPS)
+        if self.impact_model == "sqrt":
+            return min(self.impact_coef_bps * math.sqrt(x), self.MAX_IMPACT_BPS)
+        return 0.0
+
+    def _impact_price(self, side: str, touch: float, qty_quote: float) -> float:
+        bps = self.impact_bps(qty_quote)
+        return touch * (1.0 + bps / 10000.0) if side == "buy" else touch * (1.0 - bps / 10000.0)
+
+    def fill(self, side: str, qty_quote: float, best_bid: float, best_ask: float, book: Optional[object] = None) -> FillResult:
+        if book is not None and qty_quote > 0 and len(book.levels("ask" if side == "buy" else "bid")[0]):
+            return walk_book(book, side, qty_quote)
+        price = self._impact_price(side, best_ask if side == "buy" else best_bid, qty_quote)
+        qty_base = qty_quote / price if price > 0 else 0.0
+        return FillResult(price=price, qty_base=qty_base, levels=[(price, qty_base)])
+
+    def fill_base(self, side: str, qty_base: float, best_bid: float, best_ask: float, book: Optional[object] = None) -> FillResult:
+        """``fill`` for an order of ``qty_base`` units; impact is sized on its notional at the touch."""
+        if book is not None and qty_base > 0 and len(book.levels("ask" if side == "buy" else "bid")[0]):
+            return walk_book(book, side, qty_base, notional=False)
+        touch = best_ask if side == "buy" else best_bid
+        price = self._impact_price(side, touch, qty_base * touch)
+        return FillResult(price=price, qty_base=qty_base, levels=[(price, qty_base)])
@@ -0,0 +1,221 @@
+"""
+In-memory L2 order book per symbol.
+
+Each side is a pair of compact float64 arrays (sort key, size) kept sorted so that
+index 0 is the touch: asks are keyed by price, bids by -price. Snapshots replace the
+arrays wholesale; deltas insert/update/delete single levels with a binary search.
+Cumulative size/notional from the touch are rebuilt lazily after a change and cached
+as plain lists, so depth and VWAP queries are a single ``bisect`` on the hot path.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+BID = "bid"
+ASK = "ask"
+
+
+def _levels(rows: Optional[Iterable]) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse [[price, size], ...] (strings allowed) into price/size arrays, dropping bad rows."""
+    px: List[float] = []
+    sz: List[float] = []
+    for row in rows or ():
+        try:
+            if isinstance(row, dict):
+                p, q = float(row.get("price")), float(row.get("quantity", row.get("size")))
+            else:
+                p, q = float(row[0]), float(row[1])
+        except (TypeError, ValueError, IndexError):
+            continue
+        if p > 0 and q > 0:
+            px.append(p)
+            sz.append(q)
+    return np.asarray(px, dtype=np.float64), np.asarray(sz, dtype=np.float64)
+
+
+class _Side:
+    __slots__ = ("sign", "keys", "sizes", "_cum_qty", "_cum_notional", "_prices", "_keys")
+
+    def __init__(self, sign: float):
+        self.sign = sign  # +1 asks, -1 bids
+        self.keys = np.empty(0, dtype=np.float64)
+        self.sizes = np.empty(0, dtype=np.float64)
+        self._cum_qty: Optional[List[float]] = None
+        self._cum_notional: Optional[List[float]] = None
+        self._prices: Optional[List[float]] = None
+        self._keys: Optional[List[float]] = None
+
+    def replace(self, px: np.ndarray, sz: np.ndarray):
+        keys = px * self.sign
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.sizes = sz[order]
+        self._invalidate()
+
+    def set_level(self, price: float, size: float):
+        key = price * self.sign
+        i = int(np.searchsorted(self.keys, key))
+        exists = i < len(self.keys) and self.keys[i] == key
+        if size <= 0:
+            if exists:
+                self.keys = np.delete(self.keys, i)
+                self.sizes = np.delete(self.sizes, i)
+        elif exists:
+            self.sizes[i] = size
+        else:
+            self.keys = np.insert(self.keys, i, key)
+            self.sizes = np.insert(self.sizes, i, size)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._cum_qty = None
+        self._cum_notional = None
+        self._prices = None
+        self._keys = None
+
+    def cached(self) -> Tuple[List[float], List[float], List[float]]:
+        if self._cum_qty is None:
+            px = self.keys * self.sign
+            self._prices = px.tolist()
+            self._keys = self.keys.tolist()
+            self._cum_qty = np.cumsum(self.sizes).tolist()
+            self._cum_notional = np.cumsum(self.sizes * px).tolist()
+        return self._prices, self._cum_qty, self._cum_notional
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self.keys * self.sign
+
+
+class L2Book:
+    """Full-depth book for one symbol; ``buy`` queries walk asks, ``sell`` queries walk bids."""
+
+    __slots__ = ("symbol", "bids", "asks", "ts", "updates")
+
+    def __init__(self, symbol: str = ""):
+        self.symbol = symbol
+        self.bids = _Side(-1.0)
+        self.asks = _Side(1.0)
+        self.ts = 0.0
+        self.updates = 0
+
+    # ------------------------------------------------------------------
+    # updates
+    # ------------------------------------------------------------------
+    def apply_snapshot(self, bids: Iterable, asks: Iterable, ts: Optional[float] = None):
+        self.bids.replace(*_levels(bids))
+        self.asks.replace(*_levels(asks))
+        self._touch(ts)
+
+    def apply_delta(self, side: str, price: float, size: float, ts: Optional[float] = None):
+        """Set one level to ``size``; ``size <= 0`` removes it."""
+        (self.bids if side == BID else self.asks).set_level(float(price), float(size))
+        self._touch(ts)
+
+    def apply_deltas(self, bids: Iterable = (), asks: Iterable = (), ts: Optional[float] = None):
+        for side, rows in ((self.bids, bids), (self.asks, asks)):
+            for row in rows or ():
+                try:
+                    side.set_level(float(row[0]), float(row[1]))
+                except (TypeError, ValueError, IndexError):
+                    continue
+        self._touch(ts)
+
+    def copy(self) -> "L2Book":
+        """Independent copy, to update off to the side and swap in for concurrent readers."""
+        book = L2Book(self.symbol)
+        for src, dst in ((self.bids, book.bids), (self.asks, book.asks)):
+            dst.keys = src.keys.copy()
+            dst.sizes = src.sizes.copy()
+        book.ts = self.ts
+        book.updates = self.updates
+        return book
+
+    def _touch(self, ts: Optional[float]):
+        self.updates += 1
+        if ts is not None:
+            self.ts = ts
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+    def best_bid(self) -> Optional[float]:
+        return float(-self.bids.keys[0]) if len(self.bids.keys) else None
+
+    def best_ask(self) -> Optional[float]:
+        return float(self.asks.keys[0]) if len(self.asks.keys) else None
+
+    def top(self) -> Tuple[Optional[float], Optional[float]]:
+        return self.best_bid(), self.best_ask()
+
+    def mid(self) -> Optional[float]:
+        bb, ba = self.top()
+        return (bb + ba) / 2.0 if bb is not None and ba is not None else None
+
+    def levels(self, side: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(prices, sizes) from the touch outward for ``bid``/``ask``."""
+        s = self.bids if side == BID else self.asks
+        return s.prices, s.sizes
+
+    def _taker_side(self, side: str) -> _Side:
+        return self.asks if side == "buy" else self.bids
+
+    def take(self, side: str, amount: float, notional: bool = True) -> Tuple[int, float, float]:
+        """
+        Walk the side a ``side`` taker hits for ``amount`` quote (``notional``) or base:
+        ``(last_level_index, qty_base, quote_notional)`` taken. A thin book is taken whole.
+        """
+        px, cq, cn = self._taker_side(side).cached()
+        i = bisect_left(cn if notional else cq, amount)
+        if i >= len(cq):
+            return len(cq) - 1, cq[-1], cn[-1]
+        prev_q = cq[i - 1] if i else 0.0
+        prev_n = cn[i - 1] if i else 0.0
+        if notional:
+            return i, prev_q + (amount - prev_n) / px[i], amount
+        return i, amount, prev_n + (amount - prev_q) * px[i]
+
+    def vwap_for_size(self, side: str, qty_base: float) -> Tuple[Optional[float], float]:
+        """VWAP of taking ``qty_base`` (buy walks asks, sell walks bids) -> (vwap, filled_qty)."""
+        if not len(self._taker_side(side).keys) or qty_base <= 0:
+            return None, 0.0
+        _, qty, quote = self.take(side, qty_base, notional=False)
+        return quote / qty, qty
+
+    def vwap_for_notional(self, side: str, notional: float) -> Tuple[Optional[float], float]:
+        """VWAP of spending/receiving ``notional`` quote -> (vwap, filled_notional)."""
+        if not len(self._taker_side(side).keys) or notional <= 0:
+            return None, 0.0
+        _, qty, quote = self.take(side, notional)
+        return quote / qty, quote
+
+    def depth_to_notional(self, side: str, notional: float) -> Tuple[Optional[float], int]:
+        """Worst price touched and number of levels needed to fill ``notional`` quote."""
+        if not len(self._taker_side(side).keys):
+            return None, 0
+        i = self.take(side, notional)[0]
+        return self._taker_side(side).cached()[0][i], i + 1
+
+    def notional_within_bps(self, side: str, bps: float) -> float:
+        """Quote notional resting within ``bps`` of the touch on the side a ``side`` taker hits."""
+        s = self._taker_side(side)
+        px, _, cn = s.cached()
+        if not px:
+            return 0.0
+        keys = s._keys
+        limit_key = keys[0] * (1.0 + bps / 10000.0 * s.sign)
+        i = bisect_right(keys, limit_key)
+        return cn[i - 1] if i else 0.0
+
+    def total_notional(self, side: str) -> float:
+        _, _, cn = self._taker_side(side).cached()
+        return cn[-1] if cn else 0.0
+
+    def __len__(self) -> int:
+        return len(self.bids.keys) + len(self.asks.keys)
+
+    def __repr__(self) -> str:
+        return f"L2Book({self.symbol!r}, bid={self.best_bid()}, ask={self.best_ask()}, levels={len(self)})"
+
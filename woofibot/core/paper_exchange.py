@@ -1,30 +1,89 @@
-from typing import Dict, Tuple, Optional, List
-import time
-import pandas as pd
-from pathlib import Path
+from typing import Dict, FrozenSet, Tuple, Optional, List
+import numpy as np
+from ..data.candles import Candles, placeholder_candles
+from ..data.candle_store import CandleStore, DateLike
+from ..data.loader import load_bars
+from ..data.resample import BarCache
+from ..data.timeline import Timeline, TimelineChunk
 from .exchange_base import ExchangeBase
 from .order import Order, Fill
 from .portfolio import Portfolio
+from .array_portfolio import ArrayPortfolio
+from .fill_model import FillModel
+from ..utils.clock import Clock, SimClock, WALL_CLOCK
 
 
 class PaperExchange(ExchangeBase):
-    def __init__(self, symbols: List[str], data_dir: str, fee_bps: float = 2.0, market_data_source: Optional[object] = None):
+    def __init__(
+        self,
+        symbols: List[str],
+        data_dir: str,
+        fee_bps: float = 2.0,
+        market_data_source: Optional[object] = None,
+        fill_model: Optional[FillModel] = None,
+        max_ffill_sec: Optional[float] = None,
+        store_dir: Optional[str] = None,
+        start: DateLike = None,
+        end: DateLike = None,
+        timeframe: str = "1m",
+        cache_dir: Optional[str] = None,
+        candles: Optional[Dict[str, Candles]] = None,
+        clock: Optional[Clock] = None,
+        portfolio: str = "dict",
+    ):
         self.symbols = symbols
         self.fee_bps = fee_bps
+        self.fill_model = fill_model or FillModel()
         self.ptr = 0
-        self.books: Dict[str, pd.DataFrame] = {}
+        self.candles: Dict[str, Candles] = {}
         self.prices: Dict[str, float] = {}
-        self.portfolio = Portfolio()
         self.market_data = market_data_source
+        # candle mode runs on bar time; live feeds on the wall clock unless told otherwise
+        self.clock = clock or (SimClock() if market_data_source is None else WALL_CLOCK)
+        # "array": NumPy-column portfolio for large universes, same results as the dict one
+        if portfolio == "array":
+            self.portfolio = ArrayPortfolio(symbols, clock=self.clock)
+        elif portfolio == "dict":
+            self.portfolio = Portfolio(clock=self.clock)
+        else:
+            raise ValueError(f"unknown portfolio implementation {portfolio!r} (dict | array)")
+        self.current_ts: Optional[float] = None  # candle timestamp of the last step
+        self.changed_symbols: List[str] = []  # symbols that printed a bar on the last step
+        self.done = False  # candle mode: the last step found no more bars
+        timeline_syms: List[str] = []
+        self.timeframe = timeframe
+        store = CandleStore(store_dir) if store_dir else None
+        self.bar_cache = BarCache(cache_dir) if cache_dir and timeframe != "1m" else None
         for sym in symbols:
-            path = Path(data_dir) / f"{sym}_1m.csv"
-            if not path.exists():
-                # create a trivial single-line dataframe if missing
-                df = pd.DataFrame([[0, 2000, 2005, 1995, 2002, 0]], columns=["timestamp","open","high","low","close","volume"])
+            # preloaded bars (e.g. memory-mapped arrays shared by sweep workers) skip loading
+            if candles is not None:
+                bars = candles.get(sym)
+            else:
+                bars = load_bars(sym, data_dir, timeframe, store, self.bar_cache, start, end)
+            if bars is not None:
+                self.candles[sym] = bars
+                timeline_syms.append(sym)
             else:
-                df = pd.read_csv(path)
-            self.books[sym] = df.reset_index(drop=True)
-            self.prices[sym] = float(df.iloc[0]["close"]) if len(df) else 2000.0
+                # trivial single-bar series, held constant and never stale
+                self.candles[sym] = placeholder_candles()
+            close = self.candles[sym]["close"]
+            self.prices[sym] = float(close[0]) if len(close) else 2000.0
+        self.portfolio.update_marks(self.prices.items())
+        # one merged clock across symbols; each step only touches the symbols that changed
+        self._timeline_syms = timeline_syms
+        self._chunks = Timeline(
+            [self.candles[s]["timestamp"] for s in timeline_syms],
+            [self.candles[s]["close"] for s in timeline_syms],
+            max_ffill_sec=max_ffill_sec,
+        ).chunks()
+        self._chunk: Optional[TimelineChunk] = None
+        # array portfolio: timeline column -> portfolio row, so marks are set in one vector op
+        self._pf_rows = (
+            np.array([self.portfolio.index(s) for s in timeline_syms], dtype=np.intp)
+            if isinstance(self.portfolio, ArrayPortfolio)
+            else None
+        )
+        self._row = 0  # next row within self._chunk
 
     def get_orderbook(self, symbol: str) -> Tuple[float, float]:
         # Prefer external market data if provided
@@ -36,9 +95,25 @@ class PaperExchange(ExchangeBase):
         spread = max(0.5, p * 0.0008)  # 8 bps min spread
         return p - spread/2, p + spread/2
 
-    def place_order(self, symbol: str, side: str, qty_quote: float, price: Optional[float] = None) -> Dict:
+    def get_book(self, symbol: str):
+        """Full-depth L2 book from the market-data source, or None (candle mode / no depth)."""
+        getter = getattr(self.market_data, "get_book", None)
+        return getter(symbol) if getter is not None else None
+
+    def place_order(self, symbol: str, side: str, qty_quote: float, price: Optional[float] = None, reduce_only: bool = False) -> Dict:
         best_bid, best_ask = self.get_orderbook(symbol)
-        trade_price = best_ask if side == "buy" else best_bid
+        # walk L2 depth when the feed has it, otherwise touch price + impact model
+        book = self.get_book(symbol)
+        fill = self.fill_model.fill(side, qty_quote, best_bid, best_ask, book)
+        if reduce_only:
+            # a close sized in quote at the mark would overshoot at bid/ask and leave dust
+            # on the other side; cap it at the position it reduces and price the capped size
+            pos = self.portfolio.positions.get(symbol)
+            held = max(0.0 if pos is None else (pos.qty if side == "sell" else -pos.qty), 0.0)
+            if fill.qty_base > held:
+                fill = self.fill_model.fill_base(side, held, best_bid, best_ask, book)
+                qty_quote = fill.qty_base * fill.price
+        trade_price = fill.price
         mid = (best_bid + best_ask) / 2.0 if best_bid is not None and best_ask is not None else trade_price
         # positive bps means worse than mid for both sides
         if mid and mid > 0:
@@ -48,12 +123,11 @@ class PaperExchange(ExchangeBase):
                 slippage_bps = ((mid - trade_price) / mid) * 10000.0
         else:
             slippage_bps = 0.0
-        qty_base = qty_quote / trade_price if trade_price > 0 else 0
+        qty_base = fill.qty_base
         fee = abs(qty_quote) * (self.fee_bps / 10000.0)
         info = self.portfolio.update_fill(symbol, side, qty_base, trade_price, fee)
-        prices = self.get_prices()
         return {
-            "ts": time.time(),
+            "ts": self.clock.time(),
             "symbol": symbol,
             "side": side,
             "price": trade_price,
@@ -63,16 +137,26 @@ class PaperExchange(ExchangeBase):
             "fee": fee,
             "realized_delta": info.get("realized_delta", 0.0),
             "realized_total": self.portfolio.realized_pnl_usd,
-            "unrealized": self.portfolio.unrealized_total(prices),
-            "equity_after": self.portfolio.equity(prices),
+            "unrealized": self.portfolio.unrealized_total(),
+            "equity_after": self.portfolio.equity(),
             "cash_after": self.portfolio.cash_usd,
             "pos_qty": info.get("pos_qty"),
             "pos_avg": info.get("pos_avg"),
+            "levels": fill.levels,
+            "depth_exhausted": fill.depth_exhausted,
         }
 
     def get_prices(self) -> Dict[str, float]:
         return dict(self.prices)
 
+    @property
+    def stale_symbols(self) -> FrozenSet[str]:
+        """Candle mode: symbols with no bar within ``max_ffill_sec`` of the current step."""
+        chunk, row = self._chunk, self._row - 1
+        if self.market_data is not None or chunk is None or row < 0 or not chunk.stale_any[row]:
+            return frozenset()
+        return frozenset(s for s, flag in zip(self._timeline_syms, chunk.stale[row].tolist()) if flag)
+
     def step(self):
         # If external market data is present, poll it and update marks; otherwise advance candles
         if self.market_data is not None:
@@ -81,13 +165,42 @@ class PaperExchange(ExchangeBase):
                 self.market_data.step()
             except Exception:
                 pass
+            changed = []
             for sym in self.symbols:
                 mark = self.market_data.get_mark(sym)
                 if mark is not None:
                     self.prices[sym] = float(mark)
+                    self.portfolio.update_mark(sym, self.prices[sym])
+                    changed.append(sym)
+            self.changed_symbols = changed
+            # replay feeds carry their own timestamps
+            ts = getattr(self.market_data, "current_ts", None)
+            if ts is not None and isinstance(self.clock, SimClock):
+                self.clock.set(ts)
+                self.current_ts = ts
         else:
-            # advance one candle
-            for sym, df in self.books.items():
-                if self.ptr < len(df):
-                    self.prices[sym] = float(df.iloc[self.ptr]["close"])
+            # advance one timestamp on the merged timeline
+            chunk = self._chunk
+            if chunk is None or self._row >= len(chunk):
+                chunk = self._chunk = next(self._chunks, None)
+                self._row = 0
+            if chunk is not None:
+                r = self._row
+                lo, hi = chunk.indptr[r], chunk.indptr[r + 1]
+                names = self._timeline_syms
+                changed = [names[j] for j in chunk.sym_idx[lo:hi].tolist()]
+                closes = chunk.close[lo:hi].tolist()
+                self.prices.update(zip(changed, closes))
+                if self._pf_rows is not None:
+                    self.portfolio.set_marks(self._pf_rows[chunk.sym_idx[lo:hi]], chunk.close[lo:hi])
+                else:
+                    self.portfolio.update_marks(zip(changed, closes))
+                self.changed_symbols = changed
+                self.current_ts = float(chunk.ts[r])
+                if isinstance(self.clock, SimClock):
+                    self.clock.set(self.current_ts)
+                self._row = r + 1
+            else:
+                self.changed_symbols = []
+                self.done = True
             self.ptr += 1
@@ -1,103 +1,229 @@
 from dataclasses import dataclass, field
-from typing import Dict
-import time
+from math import isclose, isfinite
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 
-@dataclass
+from ..utils.clock import Clock, WALL_CLOCK
+
+
+@dataclass(slots=True)
 class Position:
     qty: float = 0.0  # base units
     avg_price: float = 0.0
     ts: float = 0.0  # timestamp of last open/increase
 
 
+def apply_fill(qty: float, avg_price: float, side: str, qty_base: float, price: float) -> Tuple[float, float, float, float]:
+    """
+    Net a fill of ``qty_base`` at ``price`` into a position: closes against the opposite
+    side first, then opens/increases with the remainder at a volume-weighted average.
+    Returns ``(qty, avg_price, realized_delta, cash_delta)``; fees are not included.
+    """
+    realized_delta = 0.0
+    if side == "buy":
+        # Cash outflow for buys
+        cash_delta = -qty_base * price
+        # If we are short, close part/all of it first
+        if qty < 0:
+            close_qty = min(qty_base, -qty)
+            realized_delta += close_qty * (avg_price - price)
+            qty += close_qty  # moves toward zero from negative
+            qty_base -= close_qty
+            if qty == 0:
+                avg_price = 0.0
+        # Open/increase long with any remaining qty
+        if qty_base > 0:
+            if qty > 0:
+                new_qty = qty + qty_base
+                avg_price = (avg_price * qty + price * qty_base) / new_qty
+                qty = new_qty
+            else:  # was flat
+                qty = qty_base
+                avg_price = price
+    else:  # sell
+        # Cash inflow for sells
+        cash_delta = qty_base * price
+        if qty > 0:
+            close_qty = min(qty_base, qty)
+            realized_delta += close_qty * (price - avg_price)
+            qty -= close_qty
+            qty_base -= close_qty
+            if qty == 0:
+                avg_price = 0.0
+        if qty_base > 0:  # open/increase short with remaining
+            if qty < 0:
+                new_abs = (-qty) + qty_base
+                avg_price = ((-qty) * avg_price + price * qty_base) / new_abs
+                qty = -new_abs
+            else:  # was flat
+                qty = -qty_base
+                avg_price = price
+    return qty, avg_price, realized_delta, cash_delta
+
+
 @dataclass
 class Portfolio:
+    """
+    Cash, positions and realized PnL.
+
+    Running totals of market value, cost basis and gross notional are kept up to date on
+    every fill and mark update, so ``equity()``, ``unrealized_total()`` and
+    ``open_notional()`` are O(1) against the portfolio's own marks (``prices=None``).
+    Passing an explicit ``prices`` dict still does a full scan. Positions edited directly
+    need ``rebuild_totals()``; ``check_totals=True`` verifies every O(1) answer against a
+    full recompute.
+    """
+
     cash_usd: float = 1000.0
     positions: Dict[str, Position] = field(default_factory=dict)
     realized_pnl_usd: float = 0.0
     _latest_prices: Dict[str, float] = field(default_factory=dict)
+    clock: Clock = field(default=WALL_CLOCK, repr=False, compare=False)
+    check_totals: bool = field(default=False, repr=False, compare=False)
+    # running sums over open positions, each valued at its mark (avg_price until marked)
+    _value: float = field(default=0.0, repr=False, compare=False)  # sum qty * mark
+    _cost: float = field(default=0.0, repr=False, compare=False)  # sum qty * avg_price
+    _gross: float = field(default=0.0, repr=False, compare=False)  # sum |qty| * mark
+    _open: int = field(default=0, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.positions:
+            self.rebuild_totals()
+
+    def _account(self, symbol: str, pos: Position, sign: float):
+        mark = self._latest_prices.get(symbol, pos.avg_price)
+        self._value += sign * pos.qty * mark
+        self._cost += sign * pos.qty * pos.avg_price
+        self._gross += sign * abs(pos.qty) * mark
 
     def update_fill(self, symbol: str, side: str, qty_base: float, price: float, fee: float):
         pos = self.positions.get(symbol, Position())
-        realized_delta = 0.0
-        if side == "buy":
-            # Cash outflow for buys
-            self.cash_usd -= qty_base * price
-            # If we are short, close part/all of it first
-            if pos.qty < 0:
-                close_qty = min(qty_base, -pos.qty)
-                realized_delta += close_qty * (pos.avg_price - price)
-                pos.qty += close_qty  # moves toward zero from negative
-                qty_base -= close_qty
-                if pos.qty == 0:
-                    pos.avg_price = 0.0
-            # Open/increase long with any remaining qty
-            if qty_base > 0:
-                if pos.qty > 0:
-                    new_qty = pos.qty + qty_base
-                    pos.avg_price = (pos.avg_price * pos.qty + price * qty_base) / new_qty
-                    pos.qty = new_qty
-                else:  # was flat
-                    pos.qty = qty_base
-                    pos.avg_price = price
-                    pos.ts = time.time()
-        else:  # sell
-            # Cash inflow for sells
-            self.cash_usd += qty_base * price
-            if pos.qty > 0:
-                close_qty = min(qty_base, pos.qty)
-                realized_delta += close_qty * (price - pos.avg_price)
-                pos.qty -= close_qty
-                qty_base -= close_qty
-                if pos.qty == 0:
-                    pos.avg_price = 0.0
-            if qty_base > 0:  # open/increase short with remaining
-                if pos.qty < 0:
-                    new_abs = (-pos.qty) + qty_base
-                    pos.avg_price = ((-pos.qty) * pos.avg_price + price * qty_base) / new_abs
-                    pos.qty = -new_abs
-                else:  # was flat
-                    pos.qty = -qty_base
-                    pos.avg_price = price
+        was_open = pos.qty != 0
+        if was_open:
+            self._account(symbol, pos, -1.0)
+        pos.qty, pos.avg_price, realized_delta, cash_delta = apply_fill(pos.qty, pos.avg_price, side, qty_base, price)
+        self.cash_usd += cash_delta
         # Deduct fee from cash
         self.cash_usd -= fee
         self.realized_pnl_usd += realized_delta
-        pos.ts = time.time()  # update timestamp whenever fill occurs
+        pos.ts = self.clock.time()  # update timestamp whenever fill occurs
         self.positions[symbol] = pos
+        self._open += (pos.qty != 0) - was_open
+        if pos.qty != 0:
+            self._account(symbol, pos, 1.0)
+        elif not self._open:
+            # flat book: drop accumulated rounding error
+            self._value = self._cost = self._gross = 0.0
         return {
             "realized_delta": realized_delta,
             "pos_qty": pos.qty,
             "pos_avg": pos.avg_price,
         }
 
-    def equity(self, prices: Dict[str, float]) -> float:
+    def equity(self, prices: Optional[Dict[str, float]] = None) -> float:
+        if prices is None or prices is self._latest_prices:
+            if self.check_totals:
+                self.verify_totals()
+            return self.cash_usd + self._value
         eq = self.cash_usd
         for sym, pos in self.positions.items():
             eq += pos.qty * prices.get(sym, pos.avg_price)
         return eq
 
-    def unrealized_total(self, prices: Dict[str, float]) -> float:
+    def unrealized_total(self, prices: Optional[Dict[str, float]] = None) -> float:
+        if prices is None or prices is self._latest_prices:
+            if self.check_totals:
+                self.verify_totals()
+            return self._value - self._cost
         u = 0.0
         for sym, pos in self.positions.items():
             mark = prices.get(sym, pos.avg_price)
             u += pos.qty * (mark - pos.avg_price)
         return u
 
-    def open_notional(self, prices: Dict[str, float]) -> float:
+    def open_notional(self, prices: Optional[Dict[str, float]] = None) -> float:
         """Absolute USD exposure of all open positions (long + short)."""
+        if prices is None or prices is self._latest_prices:
+            if self.check_totals:
+                self.verify_totals()
+            return self._gross
         notional = 0.0
         for sym, pos in self.positions.items():
             mark = prices.get(sym, pos.avg_price)
             notional += abs(pos.qty) * mark
         return notional
 
+    def open_arrays(self, prices: Optional[Dict[str, float]] = None) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """``(symbols, qty, avg_price, mark)`` of open positions; mark is NaN when unknown."""
+        marks = self._latest_prices if prices is None else prices
+        open_ = [(sym, pos) for sym, pos in self.positions.items() if pos.qty != 0]
+        syms = [sym for sym, _ in open_]
+        qty = np.fromiter((pos.qty for _, pos in open_), dtype=np.float64, count=len(open_))
+        avg = np.fromiter((pos.avg_price for _, pos in open_), dtype=np.float64, count=len(open_))
+        mark = np.fromiter((marks.get(sym, np.nan) for sym in syms), dtype=np.float64, count=len(open_))
+        return syms, qty, avg, mark
+
+    def set_position(self, symbol: str, qty: float, avg_price: float, ts: float):
+        """Overwrite one position (state restore), keeping the running totals in sync."""
+        pos = self.positions.get(symbol)
+        if pos is not None and pos.qty != 0:
+            self._account(symbol, pos, -1.0)
+            self._open -= 1
+        pos = self.positions[symbol] = Position(qty=qty, avg_price=avg_price, ts=ts)
+        if qty != 0:
+            self._account(symbol, pos, 1.0)
+            self._open += 1
+
+    def rebuild_totals(self):
+        """Recompute the running totals from scratch (after editing ``positions`` directly)."""
+        self._value = self._cost = self._gross = 0.0
+        self._open = 0
+        for sym, pos in self.positions.items():
+            if pos.qty != 0:
+                self._open += 1
+                self._account(sym, pos, 1.0)
+
+    def verify_totals(self, rel_tol: float = 1e-9, abs_tol: float = 1e-6):
+        """Raise ``RuntimeError`` if the running totals disagree with a full recompute."""
+        marks = self._latest_prices
+        value = sum(pos.qty * marks.get(sym, pos.avg_price) for sym, pos in self.positions.items())
+        cost = sum(pos.qty * pos.avg_price for pos in self.positions.values())
+        gross = sum(abs(pos.qty) * marks.get(sym, pos.avg_price) for sym, pos in self.positions.items())
+        for name, running, full in (("value", self._value, value), ("cost", self._cost, cost), ("gross", self._gross, gross)):
+            if not isclose(running, full, rel_tol=rel_tol, abs_tol=abs_tol):
+                raise RuntimeError(f"portfolio running {name} {running!r} != recomputed {full!r}")
+
     # ---- helpers for risk manager ----
     def update_mark(self, symbol: str, price: float):
+        if not isfinite(price):
+            return  # a NaN/inf tick would poison the running totals for good
+        pos = self.positions.get(symbol)
+        if pos is not None and pos.qty != 0:
+            delta = price - self._latest_prices.get(symbol, pos.avg_price)
+            self._value += pos.qty * delta
+            self._gross += abs(pos.qty) * delta
         self._latest_prices[symbol] = price
 
+    def update_marks(self, marks: Iterable[Tuple[str, float]]):
+        """Bulk ``update_mark``; only symbols with an open position touch the totals."""
+        positions, latest = self.positions, self._latest_prices
+        for sym, price in marks:
+            if not isfinite(price):
+                continue
+            pos = positions.get(sym)
+            if pos is not None and pos.qty != 0:
+                delta = price - latest.get(sym, pos.avg_price)
+                self._value += pos.qty * delta
+                self._gross += abs(pos.qty) * delta
+            latest[sym] = price
+
     def latest_prices(self) -> Dict[str, float]:
         return self._latest_prices
 
+    def mark_of(self, symbol: str) -> Optional[float]:
+        return self._latest_prices.get(symbol)
+
     def position_snapshot(self):
         for sym, pos in self.positions.items():
             if pos.qty != 0:
@@ -0,0 +1,215 @@
+"""
+Checkpoint + journal for trading state, so a restart resumes where it stopped.
+
+State is the portfolio (cash, realized PnL, open positions), the TI policy's last trade
+time per symbol and the risk manager's daily loss baseline (day and opening equity). Two kinds of file live under
+``root``:
+
+    snapshot.json              full state as of journal sequence number ``seq``
+    journal-000000000042.jsonl one line per fill from seq 42 on: the symbol's position
+                               after the fill, cash, realized PnL and TI timestamp
+
+``record_fill()`` appends one small line to the open journal segment (synchronously, so
+a fill is never lost). ``snapshot()`` only copies the in-memory state and starts a new
+segment; a background thread serializes it, atomically replaces ``snapshot.json`` and
+then deletes the segments it covers. ``restore()`` loads the snapshot and replays only
+the entries written after it; a torn last line from a crash is ignored.
+
+Journal entries carry post-fill state rather than the fill itself, so replay is a plain
+overwrite: idempotent and independent of the portfolio implementation.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+log = logging.getLogger("state_store")
+
+_SNAPSHOT = "snapshot.json"
+
+
+def _segment_start(path: Path) -> int:
+    return int(path.stem.split("-", 1)[1])
+
+
+class StateStore:
+    def __init__(
+        self,
+        root: Union[str, Path],
+        snapshot_every: int = 500,
+        snapshot_interval_sec: float = 60.0,
+        fsync: bool = False,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval_sec = snapshot_interval_sec
+        self.fsync = fsync
+        self.portfolio = None
+        self.ti_policy = None
+        self.risk_mgr = None
+        self.replayed = 0  # journal entries applied by the last restore()
+        self._seq = 0  # next journal sequence number
+        self._pending = 0  # entries since the last snapshot
+        self._last_snapshot = time.monotonic()
+        self._journal = None
+        self._queued: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="state-snapshot", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # restore
+    # ------------------------------------------------------------------
+    def _segments(self) -> List[Path]:
+        return sorted(self.root.glob("journal-*.jsonl"), key=_segment_start)
+
+    def restore(self, portfolio, ti_policy=None, risk_mgr=None) -> bool:
+        """
+        Load the last snapshot plus newer journal entries into the given objects and attach
+        them for checkpointing; call once at startup, before trading. Returns False (and
+        leaves them untouched) if there is no saved state.
+        """
+        self.portfolio, self.ti_policy, self.risk_mgr = portfolio, ti_policy, risk_mgr
+        snap_path = self.root / _SNAPSHOT
+        snap = json.loads(snap_path.read_text()) if snap_path.exists() else None
+        last = snap["seq"] if snap else -1
+        if snap:
+            portfolio.cash_usd = snap["cash_usd"]
+            portfolio.realized_pnl_usd = snap["realized_pnl_usd"]
+            for sym, (qty, avg, ts) in snap["positions"].items():
+                portfolio.set_position(sym, qty, avg, ts)
+            if ti_policy is not None:
+                ti_policy.load_state(snap["ti"])
+            if risk_mgr is not None and snap.get("risk") is not None:
+                risk_mgr.metrics.load_state(snap["risk"])
+            elif risk_mgr is not None and snap.get("start_equity") is not None:
+                risk_mgr.start_equity = snap["start_equity"]  # older snapshots
+        self.replayed = 0
+        for seg in self._segments():
+            with open(seg, "rb+") as f:
+                good = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated line")
+                        e = json.loads(line)
+                    except ValueError:  # torn write at crash time: drop it so appends stay clean
+                        f.truncate(good)
+                        break
+                    good += len(line)
+                    if e["seq"] <= last:
+                        continue
+                    portfolio.set_position(e["sym"], e["qty"], e["avg"], e["ts"])
+                    portfolio.cash_usd = e["cash"]
+                    portfolio.realized_pnl_usd = e["realized"]
+                    if ti_policy is not None and e.get("ti") is not None:
+                        ti_policy.load_state({e["sym"]: e["ti"]})
+                    last = e["seq"]
+                    self.replayed += 1
+        self._seq = last + 1
+        self._pending = self.replayed
+        self._open_segment()
+        return snap is not None or self.replayed > 0
+
+    # ------------------------------------------------------------------
+    # trading-loop side
+    # ------------------------------------------------------------------
+    def _open_segment(self):
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.root / f"journal-{self._seq:012d}.jsonl", "a", encoding="utf-8")
+
+    def record_fill(self, symbol: str):
+        """Journal ``symbol``'s position and the cash/PnL after a fill."""
+        pf = self.portfolio
+        pos = pf.positions.get(symbol)
+        entry = {
+            "seq": self._seq,
+            "sym": symbol,
+            "qty": pos.qty if pos else 0.0,
+            "avg": pos.avg_price if pos else 0.0,
+            "ts": pos.ts if pos else 0.0,
+            "cash": pf.cash_usd,
+            "realized": pf.realized_pnl_usd,
+            "ti": self.ti_policy.last_trade_ts(symbol) if self.ti_policy is not None else None,
+        }
+        self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._seq += 1
+        self._pending += 1
+        if self._pending >= self.snapshot_every:
+            self.snapshot()
+
+    def tick(self):
+        """Snapshot if there are journal entries older than ``snapshot_interval_sec``."""
+        if self._pending and time.monotonic() - self._last_snapshot >= self.snapshot_interval_sec:
+            self.snapshot()
+
+    def snapshot(self):
+        """Capture state now; serialization and the write happen on the background thread."""
+        pf = self.portfolio
+        state = {
+            "seq": self._seq - 1,
+            "saved_at": time.time(),
+            "cash_usd": pf.cash_usd,
+            "realized_pnl_usd": pf.realized_pnl_usd,
+            "positions": {s: (p.qty, p.avg_price, p.ts) for s, p in pf.positions.items() if p.qty != 0},
+            "ti": self.ti_policy.state() if self.ti_policy is not None else {},
+            "risk": self.risk_mgr.metrics.state() if self.risk_mgr is not None else None,
+        }
+        # later entries go to a fresh segment so the covered ones can be deleted whole
+        self._open_segment()
+        self._pending = 0
+        self._last_snapshot = time.monotonic()
+        with self._lock:
+            self._queued = (self._seq, state)
+        self._wake.set()
+
+    def close(self):
+        """Final snapshot, written before returning."""
+        if self.portfolio is not None:
+            self.snapshot()
+        self._stop = True
+        self._wake.set()
+        self._thread.join(timeout=10)
+        self._write_queued()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    # ------------------------------------------------------------------
+    # snapshot thread
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._stop:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self._write_queued()
+            except Exception as exc:  # the journal still has everything; retry on the next one
+                log.warning("state snapshot failed: %s", exc)
+
+    def _write_queued(self):
+        with self._lock:
+            queued, self._queued = self._queued, None
+        if queued is None:
+            return
+        next_seq, state = queued
+        tmp = self.root / f".{_SNAPSHOT}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.root / _SNAPSHOT)
+        for seg in self._segments():
+            if _segment_start(seg) < next_seq:
+                seg.unlink(missing_ok=True)
@@ -4,6 +4,7 @@ WOOFi / Orderly live exchange client (conservative test-net default).
 • Requires env vars WOOFI_API_KEY and WOOFI_API_SECRET.
 • Defaults to test-net base.  Set testnet=False or base_url to switch to main-net.
 • Idempotency keys + back-off on 429/503.
+• Uses a shared pooled keep-alive HTTPTransport when one is passed in.
 • Exposes place_order / cancel_order / get_position / get_account.
 """
 
@@ -20,6 +21,8 @@ from typing import Dict, Any, Optional
 
 import requests
 
+from ..utils.http_transport import HTTPTransport
+
 log = logging.getLogger("woofi_exchange")
 log.setLevel(logging.INFO)
 
@@ -37,13 +40,16 @@ class WOOFiExchange:
         max_retries: int = 2,
         backoff: float = 0.5,
         testnet: bool = True,
+        transport: Optional[HTTPTransport] = None,
     ) -> None:
         self.api_key = api_key or os.getenv("WOOFI_API_KEY")
         self.api_secret = api_secret or os.getenv("WOOFI_API_SECRET")
         self.timeout = timeout
         self.max_retries = max_retries
         self.backoff = backoff
-        self.session = requests.Session()
+        # shared pooled transport (also used by the market-data poller when passed in)
+        self.transport = transport or HTTPTransport()
+        self.session = self.transport.session
         self.base_url = base_url or (DEFAULT_TESTNET_BASE if testnet else DEFAULT_MAINNET_BASE)
         self.default_headers = {"Content-Type": "application/json"}
         if not (self.api_key and self.api_secret):
@@ -74,9 +80,10 @@ class WOOFiExchange:
         attempt = 0
         while attempt <= self.max_retries:
             try:
-                resp = self.session.request(
+                resp = self.transport.request(
                     method,
                     url,
+                    endpoint=f"{method.upper()} {path.split('?', 1)[0]}",
                     json=body or {},
                     headers=self._headers(method, path, body),
                     timeout=self.timeout,
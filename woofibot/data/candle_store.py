@@ -0,0 +1,148 @@
+"""
+Binary columnar candle store.
+
+``convert_csv`` turns ``{symbol}_{timeframe}.csv`` into one directory of raw little-endian
+columns, in the same spirit as the tick recorder:
+
+    {root}/{symbol}_{timeframe}/timestamp.i8      int64 seconds, sorted (the index)
+                               open.f8 high.f8 low.f8 close.f8 volume.f8
+                               meta.json
+
+``CandleStore.load`` opens the columns with ``np.memmap`` and binary-searches the
+timestamp index, so only the pages of the requested date range are ever read.
+
+    python -m woofibot.data.candle_store data/sample_candles data/candle_store
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .candles import CANDLE_FIELDS, Candles
+
+_DTYPES = {f: ("<i8" if f == "timestamp" else "<f8") for f in CANDLE_FIELDS}
+_EXT = {"<i8": "i8", "<f8": "f8"}
+
+DateLike = Union[None, int, float, str]
+
+
+def to_epoch(value: DateLike, end: bool = False) -> Optional[int]:
+    """
+    Epoch seconds from a number or an ISO date/datetime (UTC). A bare ``YYYY-MM-DD`` used as
+    an ``end`` bound covers that whole day.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return None if value is None else int(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    if end and len(value) == 10:
+        return int((dt + timedelta(days=1)).timestamp()) - 1
+    return int(dt.timestamp())
+
+
+def convert_csv(csv_path: Union[str, Path], root: Union[str, Path], chunksize: int = 1_000_000) -> Path:
+    """Convert one candle CSV into the columnar layout, streaming in chunks. Returns the entry dir."""
+    csv_path = Path(csv_path)
+    out = Path(root) / csv_path.stem
+    out.mkdir(parents=True, exist_ok=True)
+    # when re-converting, the old meta must not vouch for half-written columns
+    (out / "meta.json").unlink(missing_ok=True)
+    files = {f: open(out / f"{f}.{_EXT[_DTYPES[f]]}", "wb") for f in CANDLE_FIELDS}
+    rows = 0
+    last_ts = None
+    try:
+        for chunk in pd.read_csv(csv_path, usecols=list(CANDLE_FIELDS), chunksize=chunksize):
+            ts = chunk["timestamp"].to_numpy(dtype=np.int64)
+            if len(ts) and (np.any(np.diff(ts) < 0) or (last_ts is not None and ts[0] < last_ts)):
+                raise ValueError(f"{csv_path}: timestamps must be sorted")
+            for f in CANDLE_FIELDS:
+                files[f].write(np.ascontiguousarray(chunk[f].to_numpy(), dtype=_DTYPES[f]).tobytes())
+            rows += len(ts)
+            if len(ts):
+                last_ts = ts[-1]
+    finally:
+        for fh in files.values():
+            fh.close()
+    (out / "meta.json").write_text(json.dumps({"rows": rows, "source": str(csv_path)}))
+    return out
+
+
+def write_entry(candles: Candles, entry: Union[str, Path], **meta) -> Path:
+    """Write in-memory candles as one store entry; ``meta.json`` goes last and marks it complete."""
+    entry = Path(entry)
+    entry.mkdir(parents=True, exist_ok=True)
+    (entry / "meta.json").unlink(missing_ok=True)
+    for f in CANDLE_FIELDS:
+        np.ascontiguousarray(candles[f], dtype=_DTYPES[f]).tofile(entry / f"{f}.{_EXT[_DTYPES[f]]}")
+    (entry / "meta.json").write_text(json.dumps({"rows": int(len(candles["timestamp"])), **meta}))
+    return entry
+
+
+class CandleStore:
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def path(self, symbol: str, timeframe: str = "1m") -> Path:
+        return self.root / f"{symbol}_{timeframe}"
+
+    def has(self, symbol: str, timeframe: str = "1m") -> bool:
+        return (self.path(symbol, timeframe) / "meta.json").exists()
+
+    def symbols(self, timeframe: str = "1m") -> List[str]:
+        suffix = f"_{timeframe}"
+        return sorted(p.name[: -len(suffix)] for p in self.root.glob(f"*{suffix}") if (p / "meta.json").exists())
+
+    def meta(self, symbol: str, timeframe: str = "1m") -> dict:
+        return json.loads((self.path(symbol, timeframe) / "meta.json").read_text())
+
+    def load(self, symbol: str, timeframe: str = "1m", start: DateLike = None, end: DateLike = None) -> Candles:
+        """
+        Memory-mapped column views for ``start <= timestamp <= end``. Nothing is read
+        until the arrays are touched, and then only the pages of that range.
+        """
+        entry = self.path(symbol, timeframe)
+        rows = self.meta(symbol, timeframe)["rows"]
+        cols: Candles = {}
+        for f in CANDLE_FIELDS:
+            dtype = _DTYPES[f]
+            if rows == 0:
+                cols[f] = np.empty(0, dtype=dtype)
+            else:
+                cols[f] = np.memmap(entry / f"{f}.{_EXT[dtype]}", dtype=dtype, mode="r", shape=(rows,))
+        lo, hi = _range(cols["timestamp"], start, end)
+        return {f: c[lo:hi] for f, c in cols.items()}
+
+
+def _range(ts: np.ndarray, start: DateLike, end: DateLike):
+    lo_ts, hi_ts = to_epoch(start), to_epoch(end, end=True)
+    lo = 0 if lo_ts is None else int(np.searchsorted(ts, lo_ts, side="left"))
+    hi = len(ts) if hi_ts is None else int(np.searchsorted(ts, hi_ts, side="right"))
+    return lo, max(lo, hi)
+
+
+def slice_range(candles: Candles, start: DateLike = None, end: DateLike = None) -> Candles:
+    """Restrict in-memory candles to ``start <= timestamp <= end``."""
+    if start is None and end is None:
+        return candles
+    lo, hi = _range(candles["timestamp"], start, end)
+    return {f: c[lo:hi] for f, c in candles.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert candle CSVs into the memory-mapped candle store")
+    ap.add_argument("src", help="directory of {symbol}_{timeframe}.csv files")
+    ap.add_argument("dst", help="store root")
+    args = ap.parse_args()
+    for csv_path in sorted(Path(args.src).glob("*.csv")):
+        entry = convert_csv(csv_path, args.dst)
+        print(f"{csv_path.name} -> {entry}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Candle data as contiguous NumPy columns.
+
+Every loader returns ``{"timestamp": int64[n], "open"/"high"/"low"/"close"/"volume": float64[n]}``
+so the backtest hot path is plain array indexing instead of pandas row access.
+"""
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+CANDLE_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+PRICE_FIELDS = CANDLE_FIELDS[1:]
+
+Candles = Dict[str, np.ndarray]
+
+
+def placeholder_candles(close: float = 2002.0) -> Candles:
+    """Single synthetic bar used when a symbol has no data file."""
+    return {
+        "timestamp": np.zeros(1, dtype=np.int64),
+        "open": np.array([2000.0]),
+        "high": np.array([2005.0]),
+        "low": np.array([1995.0]),
+        "close": np.array([close]),
+        "volume": np.zeros(1),
+    }
+
+
+def candles_from_frame(df: pd.DataFrame) -> Candles:
+    out: Candles = {"timestamp": np.ascontiguousarray(df["timestamp"].to_numpy(dtype=np.int64))}
+    for f in PRICE_FIELDS:
+        out[f] = np.ascontiguousarray(df[f].to_numpy(dtype=np.float64))
+    return out
+
+
+def load_csv_candles(path: Path) -> Candles:
+    return candles_from_frame(pd.read_csv(path))
+
+
+def candle_path(data_dir: str, symbol: str, timeframe: str = "1m") -> Path:
+    return Path(data_dir) / f"{symbol}_{timeframe}.csv"
+
@@ -0,0 +1,60 @@
+"""Resolve one symbol's bars at a timeframe from the candle store, CSVs or resampled 1m data."""
+
+from functools import partial
+from pathlib import Path
+from typing import List, Optional
+
+from .candles import Candles, candle_path, load_csv_candles
+from .candle_store import CandleStore, DateLike, slice_range
+from .resample import BarCache, resample, timeframe_seconds
+
+
+def load_bars(
+    symbol: str,
+    data_dir: str,
+    timeframe: str = "1m",
+    store: Optional[CandleStore] = None,
+    bar_cache: Optional[BarCache] = None,
+    start: DateLike = None,
+    end: DateLike = None,
+) -> Optional[Candles]:
+    """
+    Native store entry, then native CSV, then resampled from 1m (store or CSV, through
+    ``bar_cache`` when given). None if the symbol has no data at all.
+    """
+    tf = timeframe
+    if store is not None and store.has(symbol, tf):
+        # memory-mapped columns, only the [start, end] slice is ever paged in
+        return store.load(symbol, tf, start=start, end=end)
+    path = candle_path(data_dir, symbol, tf)
+    if path.exists():
+        return slice_range(load_csv_candles(path), start, end)
+    if tf == "1m":
+        return None
+    if store is not None and store.has(symbol):
+        sources = sorted(store.path(symbol).iterdir())
+        load_1m = partial(store.load, symbol)
+    elif candle_path(data_dir, symbol).exists():
+        sources = [candle_path(data_dir, symbol)]
+        load_1m = partial(load_csv_candles, sources[0])
+    else:
+        return None
+    if bar_cache is not None:
+        return bar_cache.load(symbol, tf, sources, load_1m, start=start, end=end)
+    return slice_range(resample(load_1m(), timeframe_seconds(tf)), start, end)
+
+
+def bar_sources(
+    symbol: str,
+    data_dir: str,
+    timeframe: str = "1m",
+    store: Optional[CandleStore] = None,
+) -> List[Path]:
+    """Files ``load_bars`` would derive this symbol's bars from (same precedence); [] if none."""
+    for tf in dict.fromkeys((timeframe, "1m")):
+        if store is not None and store.has(symbol, tf):
+            return sorted(store.path(symbol, tf).iterdir())
+        path = candle_path(data_dir, symbol, tf)
+        if path.exists():
+            return [path]
+    return []
@@ -0,0 +1,100 @@
+"""
+Higher-timeframe bars from 1m candles, with an on-disk cache.
+
+``resample`` buckets bars on UTC-aligned boundaries and reduces each bucket in one
+vectorized pass (``np.maximum.reduceat`` & co.), so there is no Python loop per bar.
+
+``BarCache`` keeps the result as a candle-store entry under ``{cache_dir}/{symbol}_{tf}``,
+tagged with a fingerprint of the 1m source. A hit is memory-mapped directly: no raw 1m
+data is read and nothing is re-aggregated. The fingerprint hashes size, mtime and the
+first/last 64 KiB of every source file, which catches appends and rewrites without
+reading multi-GB files in full.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Sequence, Union
+
+import numpy as np
+
+from .candles import Candles
+from .candle_store import CandleStore, DateLike, write_entry
+
+TIMEFRAME_SECONDS: Dict[str, int] = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+_SAMPLE = 1 << 16
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    try:
+        return TIMEFRAME_SECONDS[timeframe]
+    except KeyError:
+        raise ValueError(f"Unknown timeframe {timeframe} (expected one of {', '.join(TIMEFRAME_SECONDS)})") from None
+
+
+def resample(candles: Candles, seconds: int) -> Candles:
+    """OHLCV bars of ``seconds`` width; a bucket is stamped with its start time."""
+    ts = np.asarray(candles["timestamp"], dtype=np.int64)
+    if not len(ts):
+        return {f: np.asarray(c)[:0] for f, c in candles.items()}
+    bucket = ts - ts % seconds
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    return {
+        "timestamp": bucket[starts],
+        "open": np.asarray(candles["open"], dtype=np.float64)[starts],
+        "high": np.maximum.reduceat(np.asarray(candles["high"], dtype=np.float64), starts),
+        "low": np.minimum.reduceat(np.asarray(candles["low"], dtype=np.float64), starts),
+        "close": np.asarray(candles["close"], dtype=np.float64)[ends],
+        "volume": np.add.reduceat(np.asarray(candles["volume"], dtype=np.float64), starts),
+    }
+
+
+def fingerprint(paths: Sequence[Union[str, Path]]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for p in sorted(Path(p) for p in paths):
+        st = p.stat()
+        h.update(f"{p.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+        with open(p, "rb") as f:
+            h.update(f.read(_SAMPLE))
+            if st.st_size > _SAMPLE:
+                f.seek(max(_SAMPLE, st.st_size - _SAMPLE))
+                h.update(f.read())
+    return h.hexdigest()
+
+
+class BarCache:
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.store = CandleStore(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def load(
+        self,
+        symbol: str,
+        timeframe: str,
+        source_paths: Sequence[Union[str, Path]],
+        load_source: Callable[[], Candles],
+        start: DateLike = None,
+        end: DateLike = None,
+    ) -> Candles:
+        """
+        ``timeframe`` bars for ``symbol``. ``source_paths`` are the 1m files the bars derive
+        from (used for the cache key only); ``load_source`` is called on a miss.
+        """
+        key = fingerprint(source_paths)
+        if self.store.has(symbol, timeframe) and self.store.meta(symbol, timeframe).get("fingerprint") == key:
+            self.hits += 1
+        else:
+            self.misses += 1
+            bars = resample(load_source(), timeframe_seconds(timeframe))
+            write_entry(bars, self.store.path(symbol, timeframe), fingerprint=key, timeframe=timeframe)
+        return self.store.load(symbol, timeframe, start=start, end=end)
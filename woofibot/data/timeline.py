@@ -0,0 +1,112 @@
+"""
+Merged multi-symbol candle timeline.
+
+Per-symbol ``timestamp`` columns are sort-merged into one global clock. Each step carries
+only the symbols that printed a bar at that timestamp (CSR layout: ``indptr``/``sym_idx``/
+``close``), so stepping touches changed symbols only. Between bars a symbol keeps its
+last close; once the gap exceeds ``max_ffill_sec`` (or before its first bar) it is flagged
+stale so callers can leave it out instead of trading on a frozen price.
+
+The merge is done lazily in ``chunk_sec`` windows, so memory stays bounded by one window
+no matter how many years of (possibly memory-mapped) bars are behind it.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class TimelineChunk:
+    ts: np.ndarray  # int64[steps], union of all symbol timestamps in this window
+    indptr: np.ndarray  # int64[steps + 1], step i changes sym_idx[indptr[i]:indptr[i + 1]]
+    sym_idx: np.ndarray  # int64[nnz]
+    close: np.ndarray  # float64[nnz], new close for the matching sym_idx entry
+    stale: np.ndarray  # bool[steps, symbols]
+    stale_any: np.ndarray  # bool[steps], fast path: no symbol stale at this step
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+class Timeline:
+    """
+    ``timestamps[j]`` / ``closes[j]`` are symbol j's bars (sorted by time). Duplicate
+    timestamps within one symbol keep the last bar. ``max_ffill_sec=None`` forward-fills
+    without limit.
+    """
+
+    def __init__(
+        self,
+        timestamps: Sequence[np.ndarray],
+        closes: Sequence[np.ndarray],
+        max_ffill_sec: Optional[float] = None,
+        chunk_sec: int = 86400,
+    ):
+        self.timestamps = list(timestamps)
+        self.closes = list(closes)
+        self.max_ffill_sec = max_ffill_sec
+        self.chunk_sec = max(1, int(chunk_sec))
+
+    def chunks(self) -> Iterator[TimelineChunk]:
+        n_sym = len(self.timestamps)
+        cursor = [0] * n_sym
+        # last bar timestamp seen before the current window, carried for the ffill age
+        prev_last: List[Optional[int]] = [None] * n_sym
+        while True:
+            heads = [int(t[i]) for t, i in zip(self.timestamps, cursor) if i < len(t)]
+            if not heads:
+                return
+            # windows start at the next bar, so long gaps are skipped in one jump
+            w_end = min(heads) + self.chunk_sec
+            ts_parts, close_parts = [], []
+            for j, t in enumerate(self.timestamps):
+                lo = cursor[j]
+                hi = lo + int(np.searchsorted(t[lo:], w_end, side="left")) if lo < len(t) else lo
+                ts_parts.append(np.asarray(t[lo:hi], dtype=np.int64))
+                close_parts.append(np.asarray(self.closes[j][lo:hi], dtype=np.float64))
+                cursor[j] = hi
+            yield _merge_window(ts_parts, close_parts, prev_last, self.max_ffill_sec)
+            for j, t in enumerate(ts_parts):
+                if len(t):
+                    prev_last[j] = int(t[-1])
+
+
+def _merge_window(
+    ts_parts: List[np.ndarray],
+    close_parts: List[np.ndarray],
+    prev_last: List[Optional[int]],
+    max_ffill_sec: Optional[float],
+) -> TimelineChunk:
+    n_sym = len(ts_parts)
+    union = np.unique(np.concatenate(ts_parts))
+    steps = len(union)
+    hit = np.zeros((steps, n_sym), dtype=bool)
+    value = np.zeros((steps, n_sym), dtype=np.float64)
+    stale = np.ones((steps, n_sym), dtype=bool)
+    for j, (t, c) in enumerate(zip(ts_parts, close_parts)):
+        carry = prev_last[j]
+        if not len(t) and carry is None:
+            continue
+        # last bar at or before every union timestamp
+        pos = np.searchsorted(t, union, side="right") - 1
+        in_window = pos >= 0
+        last_ts = np.where(in_window, t[np.maximum(pos, 0)] if len(t) else 0, -1 if carry is None else carry)
+        seen = in_window | (carry is not None)
+        exact = in_window & (last_ts == union)
+        hit[:, j] = exact
+        value[exact, j] = c[pos[exact]]
+        fresh = seen if max_ffill_sec is None else seen & (union - last_ts <= max_ffill_sec)
+        stale[:, j] = ~fresh
+    rows, cols = np.nonzero(hit)  # row-major, so already grouped by step
+    indptr = np.zeros(steps + 1, dtype=np.int64)
+    np.cumsum(hit.sum(axis=1), out=indptr[1:])
+    return TimelineChunk(
+        ts=union,
+        indptr=indptr,
+        sym_idx=cols.astype(np.int64),
+        close=value[rows, cols],
+        stale=stale,
+        stale_any=stale.any(axis=1),
+    )
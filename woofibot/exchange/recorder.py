@@ -0,0 +1,238 @@
+"""
+Columnar market-data recorder.
+
+Every quote update is appended to raw little-endian column files, one directory per UTC
+day (daily rotation):
+
+    {root}/2025-10-15/ts.i8      int64 microseconds since epoch
+                      sym.u2     uint16 symbol id (see symbols.json)
+                      bid.f8 ask.f8 mark.f8
+                      bid_px.f8 bid_sz.f8 ask_px.f8 ask_sz.f8   (depth_levels > 0; NaN padded)
+                      symbols.json meta.json
+
+``record()`` only appends to an in-memory deque; a background thread drains it in
+batches, so the trading loop never waits on disk. A top-of-book row is 34 bytes and
+rows whose quote and kept depth are unchanged are skipped, so even the 140-market
+universe polled every 800 ms stays under ~0.5 GB/day before any dedupe savings.
+"""
+
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+log = logging.getLogger("quote_recorder")
+
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("ts", "<i8"),
+    ("sym", "<u2"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("mark", "<f8"),
+)
+DEPTH_COLUMNS = ("bid_px", "bid_sz", "ask_px", "ask_sz")
+_EXT = {"<i8": "i8", "<u2": "u2", "<f8": "f8"}
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _nan(v: Optional[float]) -> float:
+    return float("nan") if v is None else float(v)
+
+
+def _same_depth(a: Optional[tuple], b: Optional[tuple]) -> bool:
+    if a is None or b is None:
+        return a is b
+    return all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+class QuoteRecorder:
+    def __init__(
+        self,
+        root: str,
+        depth_levels: int = 0,
+        flush_interval_ms: int = 1000,
+        flush_rows: int = 50000,
+        dedupe: bool = True,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.depth_levels = int(depth_levels)
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_rows = flush_rows
+        self.dedupe = dedupe
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.bytes_written = 0
+        self._queue: Deque[tuple] = deque()
+        self._last: Dict[str, Tuple[Tuple[float, float, float], Optional[tuple]]] = {}
+        self._symbol_ids: Dict[str, Dict[str, int]] = {}  # day -> {symbol: id}
+        self._wake = threading.Event()
+        self._stop = False
+        self._io_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="quote-recorder", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # producer side (called from market-data adapters)
+    # ------------------------------------------------------------------
+    def record(
+        self,
+        symbol: str,
+        bid: Optional[float],
+        ask: Optional[float],
+        mark: Optional[float],
+        ts: Optional[float] = None,
+        book: Optional[Any] = None,
+    ):
+        quote = (_nan(bid), _nan(ask), _nan(mark))
+        depth = None
+        if self.depth_levels and book is not None:
+            # copy now: the live book keeps mutating after we return
+            L = self.depth_levels
+            bpx, bsz = book.levels("bid")
+            apx, asz = book.levels("ask")
+            depth = (bpx[:L].copy(), bsz[:L].copy(), apx[:L].copy(), asz[:L].copy())
+        if self.dedupe:
+            # skip only when nothing that would be written changed: the quote and the kept depth
+            last = self._last.get(symbol)
+            if last is not None and last[0] == quote and _same_depth(last[1], depth):
+                return
+            self._last[symbol] = (quote, depth)
+        self._queue.append((time.time() if ts is None else ts, symbol, quote, depth))
+        if len(self._queue) >= self.flush_rows:
+            self._wake.set()
+
+    def flush(self):
+        """Write everything queued so far (blocking)."""
+        self._drain()
+
+    def close(self):
+        self._stop = True
+        self._wake.set()
+        self._thread.join(timeout=10)
+        self._drain()
+
+    # ------------------------------------------------------------------
+    # writer thread
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._stop:
+            self._wake.wait(self.flush_interval_ms / 1000.0)
+            self._wake.clear()
+            try:
+                self._drain()
+            except Exception as exc:  # keep recording even if one batch fails
+                log.warning("recorder flush failed: %s", exc)
+
+    def _drain(self):
+        with self._io_lock:
+            batch: List[tuple] = []
+            while self._queue:
+                batch.append(self._queue.popleft())
+            if not batch:
+                return
+            by_day: Dict[str, List[tuple]] = {}
+            for row in batch:
+                try:
+                    int(row[0] * 1_000_000)  # the ts column must be able to hold it
+                    day = _day(row[0])
+                except (TypeError, ValueError, OverflowError, OSError) as exc:
+                    # one unencodable row must not cost the rest of the batch
+                    self.rows_dropped += 1
+                    log.warning("recorder dropped %s row at ts=%r: %s", row[1], row[0], exc)
+                    continue
+                by_day.setdefault(day, []).append(row)
+            for day, rows in by_day.items():
+                try:
+                    self._write_day(day, rows)
+                except Exception as exc:
+                    self.rows_dropped += len(rows)
+                    log.warning("recorder failed to write %d rows for %s: %s", len(rows), day, exc)
+
+    def _write_day(self, day: str, rows: List[tuple]):
+        ddir = self.root / day
+        ddir.mkdir(parents=True, exist_ok=True)
+        ids = self._symbol_ids.get(day)
+        if ids is None:
+            sym_path = ddir / "symbols.json"
+            ids = json.loads(sym_path.read_text()) if sym_path.exists() else {}
+            self._symbol_ids[day] = ids
+            meta_path = ddir / "meta.json"
+            if not meta_path.exists():
+                meta_path.write_text(json.dumps({"depth_levels": self.depth_levels}))
+            elif json.loads(meta_path.read_text()).get("depth_levels", 0) != self.depth_levels:
+                raise ValueError(f"{ddir} was recorded with a different depth_levels")
+        n_before = len(ids)
+        for _, sym, _, _ in rows:
+            if sym not in ids:
+                ids[sym] = len(ids)
+        if len(ids) != n_before:
+            (ddir / "symbols.json").write_text(json.dumps(ids))
+
+        n = len(rows)
+        cols = {
+            "ts": np.fromiter((int(r[0] * 1_000_000) for r in rows), dtype="<i8", count=n),
+            "sym": np.fromiter((ids[r[1]] for r in rows), dtype="<u2", count=n),
+        }
+        quotes = np.array([r[2] for r in rows], dtype="<f8").reshape(n, 3)
+        cols["bid"], cols["ask"], cols["mark"] = quotes[:, 0], quotes[:, 1], quotes[:, 2]
+        files = [(name, dtype) for name, dtype in COLUMNS]
+        if self.depth_levels:
+            L = self.depth_levels
+            for j, name in enumerate(DEPTH_COLUMNS):
+                block = np.full((n, L), np.nan, dtype="<f8")
+                for i, r in enumerate(rows):
+                    if r[3] is not None:
+                        v = r[3][j]
+                        block[i, : len(v)] = v
+                cols[name] = block
+                files.append((name, "<f8"))
+        # ts goes last so a reader never sees a timestamp without its row
+        for name, dtype in sorted(files, key=lambda f: f[0] == "ts"):
+            data = np.ascontiguousarray(cols[name], dtype=dtype).tobytes()
+            with open(ddir / f"{name}.{_EXT[dtype]}", "ab") as f:
+                f.write(data)
+            self.bytes_written += len(data)
+        self.rows_written += n
+
+
+def recorded_days(root: str) -> List[Path]:
+    return sorted(p for p in Path(root).iterdir() if p.is_dir() and (p / "ts.i8").exists())
+
+
+def read_day(day_dir: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """
+    Open one recorded day as column arrays (memory-mapped by default) plus the symbol list
+    indexed by ``sym``. Rows are truncated to the shortest column, so a half-written tail
+    from a crash is ignored.
+    """
+    ddir = Path(day_dir)
+    ids = json.loads((ddir / "symbols.json").read_text())
+    symbols = [None] * len(ids)
+    for sym, i in ids.items():
+        symbols[i] = sym
+    levels = json.loads((ddir / "meta.json").read_text()).get("depth_levels", 0)
+    meta = [(name, dtype, 1) for name, dtype in COLUMNS]
+    if levels:
+        meta += [(name, "<f8", levels) for name in DEPTH_COLUMNS]
+    rows = min((ddir / f"{name}.{_EXT[dtype]}").stat().st_size // (np.dtype(dtype).itemsize * w) for name, dtype, w in meta)
+    out: Dict[str, np.ndarray] = {}
+    for name, dtype, w in meta:
+        path = ddir / f"{name}.{_EXT[dtype]}"
+        shape = (rows, w) if w > 1 or name in DEPTH_COLUMNS else (rows,)
+        if rows == 0:
+            out[name] = np.empty(shape, dtype=dtype)
+        elif mmap:
+            out[name] = np.memmap(path, dtype=dtype, mode="r", shape=shape)
+        else:
+            out[name] = np.fromfile(path, dtype=dtype, count=rows * w).reshape(shape)
+    return out, symbols
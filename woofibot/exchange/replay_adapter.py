@@ -0,0 +1,146 @@
+"""
+Tick replay market-data source for days written by ``QuoteRecorder``.
+
+Column files are opened through ``np.memmap`` and walked in chunks that are converted
+to plain lists, so the per-tick cost is a few list lookups. ``speed=0`` replays as fast
+as the caller steps; ``speed=N`` paces ticks at N x real time. ``step_ms`` lets one
+``step()`` consume every tick inside a simulated window instead of a single timestamp.
+"""
+
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.orderbook import L2Book
+from .recorder import read_day, recorded_days
+
+_CHUNK = 1 << 16
+
+
+class TickReplayAdapter:
+    def __init__(
+        self,
+        data_dir: str,
+        symbols: List[str],
+        speed: float = 0.0,
+        step_ms: float = 0.0,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ):
+        self.data_dir = data_dir
+        self.symbols = symbols
+        self.speed = speed
+        self.step_us = int(step_ms * 1000)
+        self.days = [d for d in recorded_days(data_dir) if (start is None or d.name >= start) and (end is None or d.name <= end)]
+        self.best_quotes: Dict[str, Tuple[Optional[float], Optional[float]]] = {s: (None, None) for s in symbols}
+        self.marks: Dict[str, Optional[float]] = {s: None for s in symbols}
+        self.current_ts: Optional[float] = None  # seconds, timestamp of the last replayed tick
+        self.ticks_replayed = 0
+        self.done = False
+        self._depth_rows: Dict[str, Tuple[int, int]] = {}  # symbol -> (day index, row)
+        self._day_cols: List[Dict[str, np.ndarray]] = []
+        self._chunks = self._iter_chunks()
+        self._buf: List[tuple] = []
+        self._pos = 0
+        self._t0_wall: Optional[float] = None
+        self._t0_sim: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # reading
+    # ------------------------------------------------------------------
+    def _iter_chunks(self) -> Iterator[List[tuple]]:
+        wanted = set(self.symbols)
+        for day in self.days:
+            cols, names = read_day(day)
+            day_idx = len(self._day_cols)
+            self._day_cols.append(cols if "bid_px" in cols else {})
+            local = np.array([n in wanted for n in names], dtype=bool)
+            sym_col = cols["sym"]
+            for lo in range(0, len(sym_col), _CHUNK):
+                hi = min(lo + _CHUNK, len(sym_col))
+                sid = np.asarray(sym_col[lo:hi])
+                keep = np.flatnonzero(local[sid])
+                if not len(keep):
+                    continue
+                rows = (keep + lo).tolist()
+                yield list(zip(
+                    np.asarray(cols["ts"][lo:hi])[keep].tolist(),
+                    [names[i] for i in sid[keep].tolist()],
+                    np.asarray(cols["bid"][lo:hi])[keep].tolist(),
+                    np.asarray(cols["ask"][lo:hi])[keep].tolist(),
+                    np.asarray(cols["mark"][lo:hi])[keep].tolist(),
+                    [day_idx] * len(rows),
+                    rows,
+                ))
+
+    def _peek(self) -> Optional[tuple]:
+        while self._pos >= len(self._buf):
+            nxt = next(self._chunks, None)
+            if nxt is None:
+                return None
+            self._buf, self._pos = nxt, 0
+        return self._buf[self._pos]
+
+    # ------------------------------------------------------------------
+    # adapter interface
+    # ------------------------------------------------------------------
+    def step(self):
+        first = self._peek()
+        if first is None:
+            self.done = True
+            return
+        # half-open window [first, first + step); step 0 -> every tick sharing the first timestamp
+        limit = first[0] + max(self.step_us, 1)
+        if self.speed > 0:
+            self._pace(first[0])
+        quotes, marks, depth_rows = self.best_quotes, self.marks, self._depth_rows
+        n = 0
+        while True:
+            tick = self._peek()
+            if tick is None or tick[0] >= limit:
+                break
+            ts, sym, bid, ask, mark, day_idx, row = tick
+            bid = None if bid != bid else bid  # NaN -> None
+            ask = None if ask != ask else ask
+            quotes[sym] = (bid, ask)
+            if mark == mark:
+                marks[sym] = mark
+            depth_rows[sym] = (day_idx, row)
+            self._pos += 1
+            n += 1
+            last_ts = ts
+        self.ticks_replayed += n
+        self.current_ts = last_ts / 1_000_000
+
+    def _pace(self, tick_us: int):
+        now = time.perf_counter()
+        if self._t0_wall is None:
+            self._t0_wall, self._t0_sim = now, tick_us
+            return
+        due = self._t0_wall + (tick_us - self._t0_sim) / 1_000_000 / self.speed
+        if due > now:
+            time.sleep(due - now)
+
+    def get_orderbook(self, symbol: str) -> Tuple[Optional[float], Optional[float]]:
+        return self.best_quotes.get(symbol, (None, None))
+
+    def get_mark(self, symbol: str) -> Optional[float]:
+        return self.marks.get(symbol)
+
+    def get_book(self, symbol: str) -> Optional[L2Book]:
+        """L2 book rebuilt from the recorded depth row of the last tick (None without depth)."""
+        loc = self._depth_rows.get(symbol)
+        if loc is None:
+            return None
+        cols = self._day_cols[loc[0]]
+        if not cols:
+            return None
+        r = loc[1]
+        book = L2Book(symbol)
+        book.apply_snapshot(
+            bids=[(p, q) for p, q in zip(cols["bid_px"][r], cols["bid_sz"][r]) if p == p],
+            asks=[(p, q) for p, q in zip(cols["ask_px"][r], cols["ask_sz"][r]) if p == p],
+            ts=self.current_ts,
+        )
+        return book
@@ -1,7 +1,32 @@
 import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from typing import Dict, List, Tuple, Optional, Any
 
-import requests
+from ..core.orderbook import L2Book
+from ..utils.http_transport import HTTPTransport
+
+log = logging.getLogger("woofi_poll_adapter")
+
+
+def _index_price_rows(payload: Any) -> Dict[str, float]:
+    """Map symbol -> last price from a price_changes style payload (data.rows or rows)."""
+    rows = None
+    if isinstance(payload, dict):
+        data = payload.get("data") if isinstance(payload.get("data"), dict) else None
+        rows = (data.get("rows") if data else None) or payload.get("rows")
+    index: Dict[str, float] = {}
+    if not isinstance(rows, list):
+        return index
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        sym = row.get("symbol")
+        last_p = _to_float(row.get("last_price") or row.get("last") or row.get("price"))
+        if sym and last_p is not None and sym not in index:
+            index[sym] = last_p
+    return index
 
 
 def _to_float(v: Any) -> Optional[float]:
@@ -17,8 +42,17 @@ class WOOFiPollAdapter:
     """
     Config-driven polling adapter for REST orderbook/ticker.
     Tries depth first (bids/asks), then bookTicker (bid/ask), then simple ticker (last/price).
+
+    With ``concurrent=True`` every symbol is fetched on a thread pool. ``step()``
+    waits at most ``symbol_deadline_ms`` (default ``DEFAULT_DEADLINE_MS``, independent
+    of ``poll_interval_ms``) for the cycle's fetches and then returns; symbols still in
+    flight keep running in the background, their quotes are read by a later step, and
+    they are not resubmitted until they finish. A symbol that yields no quote from any
+    endpoint backs off individually (1s doubling to 10s) instead of sleeping the caller.
     """
 
+    DEFAULT_DEADLINE_MS = 100
+
     def __init__(
         self,
         rest_orderbook: Optional[str],
@@ -28,6 +62,11 @@ class WOOFiPollAdapter:
         rest_bookticker: Optional[str] = None,
         rest_pricechanges: Optional[str] = None,
         simulate_latency_ms: int = 0,
+        concurrent: bool = False,
+        max_workers: int = 8,
+        symbol_deadline_ms: Optional[int] = None,
+        transport: Optional[HTTPTransport] = None,
+        recorder: Optional[Any] = None,
     ):
         self.rest_orderbook = rest_orderbook or ""
         self.rest_ticker = rest_ticker or ""
@@ -36,23 +75,119 @@ class WOOFiPollAdapter:
         self.symbols = symbols
         self.poll_interval_ms = poll_interval_ms
         self.simulate_latency_ms = simulate_latency_ms
+        self.recorder = recorder
+        self.http = transport or HTTPTransport(pool_size=max(8, max_workers))
         self.last_fetch_ts = 0.0
         self.best_quotes: Dict[str, Tuple[Optional[float], Optional[float]]] = {s: (None, None) for s in symbols}
         self.marks: Dict[str, Optional[float]] = {s: None for s in symbols}
-        self._backoff = 1.0
+        self.books: Dict[str, L2Book] = {}
+        # concurrent mode state
+        self.concurrent = concurrent
+        self.max_workers = max(1, int(max_workers))
+        self.symbol_deadline_ms = symbol_deadline_ms if symbol_deadline_ms is not None else self.DEFAULT_DEADLINE_MS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[str, Future] = {}
+        self._sym_backoff: Dict[str, float] = {s: 1.0 for s in symbols}
+        self._retry_at: Dict[str, float] = {s: 0.0 for s in symbols}
+        # cycle timing (ms) so callers can confirm polling keeps up with poll_interval_ms
+        self.last_cycle_ms = 0.0
+        self.max_cycle_ms = 0.0
+        self.cycle_overruns = 0
+        # bulk snapshot endpoints are downloaded at most once per cycle and shared by all symbols
+        self._cycle = 0
+        self._bulk_lock = threading.Lock()
+        self._pc_cycle = -1
+        self._pc_index: Dict[str, float] = {}
 
     def step(self):
         now = time.time()
         if (now - self.last_fetch_ts) * 1000.0 < self.poll_interval_ms:
             return
-        for sym in self.symbols:
-            try:
-                self._fetch_symbol(sym)
-                self._backoff = 1.0
-            except Exception:
-                time.sleep(self._backoff)
-                self._backoff = min(self._backoff * 2.0, 10.0)
+        self._cycle += 1
+        t0 = time.perf_counter()
+        if self.concurrent:
+            self._step_concurrent(now)
+        else:
+            for sym in self.symbols:
+                if now < self._retry_at.get(sym, 0.0):
+                    continue
+                try:
+                    self._fetch_symbol(sym)
+                    self._fetched(sym)
+                except Exception as exc:
+                    self._failed(sym, exc)
         self.last_fetch_ts = now
+        self._record_cycle((time.perf_counter() - t0) * 1000.0)
+
+    def _step_concurrent(self, now: float):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="woofi-poll")
+        self._reap_finished()
+        for sym in self.symbols:
+            # a slow symbol from an earlier cycle is still running; don't pile up requests
+            if sym in self._inflight or now < self._retry_at.get(sym, 0.0):
+                continue
+            self._inflight[sym] = self._executor.submit(self._fetch_symbol, sym)
+        if self._inflight:
+            wait(list(self._inflight.values()), timeout=max(0.0, self.symbol_deadline_ms / 1000.0))
+        self._reap_finished()
+
+    def _reap_finished(self):
+        for sym, fut in list(self._inflight.items()):
+            if not fut.done():
+                continue
+            del self._inflight[sym]
+            exc = fut.exception()
+            if exc is None:
+                self._fetched(sym)
+            else:
+                self._failed(sym, exc)
+
+    def _fetched(self, sym: str):
+        self._sym_backoff[sym] = 1.0
+        self._retry_at[sym] = 0.0
+
+    def _failed(self, sym: str, exc: BaseException):
+        backoff = self._sym_backoff.get(sym, 1.0)
+        self._retry_at[sym] = time.time() + backoff
+        self._sym_backoff[sym] = min(backoff * 2.0, 10.0)
+        log.warning("fetch %s failed: %s (retry in %.1fs)", sym, exc, backoff)
+
+    def _pricechanges_index(self) -> Dict[str, float]:
+        with self._bulk_lock:
+            if self._pc_cycle != self._cycle:
+                # a failed download is cached for the cycle too, so N symbols don't retry it N times
+                self._pc_cycle = self._cycle
+                self._pc_index = {}
+                try:
+                    r4 = self.http.get(self.rest_pricechanges, endpoint="pricechanges", timeout=5)
+                    r4.raise_for_status()
+                    self._pc_index = _index_price_rows(r4.json())
+                except Exception:
+                    pass
+            return self._pc_index
+
+    def _record_cycle(self, cycle_ms: float):
+        self.last_cycle_ms = cycle_ms
+        self.max_cycle_ms = max(self.max_cycle_ms, cycle_ms)
+        if cycle_ms > self.poll_interval_ms:
+            self.cycle_overruns += 1
+            log.warning("poll cycle took %.0fms (> poll_interval_ms=%d)", cycle_ms, self.poll_interval_ms)
+
+    def cycle_stats(self) -> Dict[str, float]:
+        """Timing of the last poll cycle plus running worst case / overrun count."""
+        inflight = sum(1 for f in self._inflight.values() if not f.done())
+        return {
+            "last_cycle_ms": self.last_cycle_ms,
+            "max_cycle_ms": self.max_cycle_ms,
+            "cycle_overruns": self.cycle_overruns,
+            "inflight": inflight,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
     def _fetch_symbol(self, symbol: str):
         # optional artificial latency to smooth UI
@@ -61,25 +196,23 @@ class WOOFiPollAdapter:
 
         bb: Optional[float] = None
         ba: Optional[float] = None
+        book: Optional[L2Book] = None
 
         # Attempt 1: orderbook depth with bids/asks
         if self.rest_orderbook:
             try:
                 url = self.rest_orderbook.format(symbol=symbol)
-                r = requests.get(url, timeout=6)
+                r = self.http.get(url, endpoint="orderbook", timeout=6)
                 r.raise_for_status()
                 data = r.json()
-                bids = data.get("bids") or []
-                asks = data.get("asks") or []
-                # bids/asks can be list of [price, qty] (possibly strings)
-                if isinstance(bids, list) and bids:
-                    p = _to_float(bids[0][0] if isinstance(bids[0], (list, tuple)) else None)
-                    if p is not None:
-                        bb = p
-                if isinstance(asks, list) and asks:
-                    p = _to_float(asks[0][0] if isinstance(asks[0], (list, tuple)) else None)
-                    if p is not None:
-                        ba = p
+                if isinstance(data, dict) and isinstance(data.get("data"), dict):
+                    data = data["data"]
+                # keep the full depth; a fresh book is swapped in so readers never see a half-built one
+                book = L2Book(symbol)
+                book.apply_snapshot(data.get("bids") or [], data.get("asks") or [], ts=time.time())
+                if len(book):
+                    self.books[symbol] = book
+                bb, ba = book.top()
             except Exception:
                 pass
 
@@ -87,7 +220,7 @@ class WOOFiPollAdapter:
         if (bb is None or ba is None) and self.rest_bookticker:
             try:
                 turl = self.rest_bookticker.format(symbol=symbol)
-                r2 = requests.get(turl, timeout=5)
+                r2 = self.http.get(turl, endpoint="bookticker", timeout=5)
                 r2.raise_for_status()
                 td = r2.json()
                 bid = _to_float(td.get("bidPrice") or td.get("bid") or td.get("bestBid"))
@@ -103,7 +236,7 @@ class WOOFiPollAdapter:
         if (bb is None or ba is None) and self.rest_ticker:
             try:
                 turl = self.rest_ticker.format(symbol=symbol)
-                r3 = requests.get(turl, timeout=5)
+                r3 = self.http.get(turl, endpoint="ticker", timeout=5)
                 r3.raise_for_status()
                 td2 = r3.json()
                 last = _to_float(td2.get("last") or td2.get("price") or td2.get("p"))
@@ -115,45 +248,34 @@ class WOOFiPollAdapter:
             except Exception:
                 pass
 
-        # Attempt 4: price_changes list endpoint (data.rows with last_price)
+        # Attempt 4: price_changes list endpoint (data.rows with last_price), shared per cycle
         if (bb is None or ba is None) and self.rest_pricechanges:
-            try:
-                purl = self.rest_pricechanges
-                r4 = requests.get(purl, timeout=5)
-                r4.raise_for_status()
-                td4 = r4.json()
-                rows = None
-                if isinstance(td4, dict):
-                    data = td4.get("data") if isinstance(td4.get("data"), dict) else None
-                    rows = (data.get("rows") if data else None) or td4.get("rows")
-                if isinstance(rows, list):
-                    for row in rows:
-                        try:
-                            if row.get("symbol") == symbol:
-                                last_p = _to_float(row.get("last_price") or row.get("last") or row.get("price"))
-                                if last_p is not None:
-                                    if bb is None:
-                                        bb = last_p
-                                    if ba is None:
-                                        ba = last_p
-                                break
-                        except Exception:
-                            continue
-            except Exception:
-                pass
+            last_p = self._pricechanges_index().get(symbol)
+            if last_p is not None:
+                if bb is None:
+                    bb = last_p
+                if ba is None:
+                    ba = last_p
 
-        # Debug print to verify adapter sees prices
-        print(f"[DBG] {symbol} bid={bb} ask={ba} mark={self.marks.get(symbol)}")
+        log.debug("%s bid=%s ask=%s mark=%s", symbol, bb, ba, self.marks.get(symbol))
         self.best_quotes[symbol] = (bb, ba)
+        if bb is None and ba is None:
+            raise RuntimeError(f"no quote for {symbol} from any endpoint")
         if bb is not None and ba is not None:
             self.marks[symbol] = (bb + ba) / 2.0
         elif bb is not None:
             self.marks[symbol] = bb
         elif ba is not None:
             self.marks[symbol] = ba
+        if self.recorder is not None and (bb is not None or ba is not None):
+            self.recorder.record(symbol, bb, ba, self.marks.get(symbol), book=book if book else None)
 
     def get_orderbook(self, symbol: str) -> Tuple[Optional[float], Optional[float]]:
         return self.best_quotes.get(symbol, (None, None))
 
     def get_mark(self, symbol: str) -> Optional[float]:
         return self.marks.get(symbol)
+
+    def get_book(self, symbol: str) -> Optional[L2Book]:
+        """Full-depth L2 book from the last orderbook poll (None when depth is unavailable)."""
+        return self.books.get(symbol)
@@ -0,0 +1,222 @@
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Tuple, Optional, Any, Sequence
+
+from ..core.orderbook import L2Book
+from .woofi_poll_adapter import _to_float
+
+log = logging.getLogger("woofi_ws_adapter")
+
+
+def _parse_quote(msg: Dict[str, Any]) -> Tuple[Optional[str], Optional[float], Optional[float]]:
+    """
+    Extract (symbol, best_bid, best_ask) from a stream message.
+    Understands Orderly ``{symbol}@bbo`` / ``{symbol}@orderbook`` pushes as well as
+    generic bookTicker payloads (bidPrice/askPrice).
+    """
+    data = msg.get("data") if isinstance(msg.get("data"), dict) else msg
+    topic = msg.get("topic") or ""
+    symbol = data.get("symbol") or msg.get("symbol") or (topic.split("@", 1)[0] if "@" in topic else None)
+    bid = _to_float(data.get("bid") or data.get("bidPrice") or data.get("b"))
+    ask = _to_float(data.get("ask") or data.get("askPrice") or data.get("a"))
+    bids = data.get("bids")
+    asks = data.get("asks")
+    if bid is None and isinstance(bids, list) and bids and isinstance(bids[0], (list, tuple)):
+        bid = _to_float(bids[0][0])
+    if ask is None and isinstance(asks, list) and asks and isinstance(asks[0], (list, tuple)):
+        ask = _to_float(asks[0][0])
+    return symbol, bid, ask
+
+
+class WOOFiWSAdapter:
+    """
+    Streaming market-data adapter over the WOOFi/Orderly public WebSocket.
+
+    Subscribes to ``{symbol}@{topic}`` for every symbol (``bbo`` and ``orderbook`` by
+    default; ``orderbookupdate`` deltas are applied on top of the last snapshot) and
+    keeps quotes and full-depth L2 books fresh from a background asyncio thread,
+    reconnecting with exponential backoff. Exposes the same ``step/get_orderbook/get_mark`` interface as
+    ``WOOFiPollAdapter``; ``step()`` never blocks on the network.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        symbols: List[str],
+        topics: Sequence[str] = ("bbo", "orderbook"),
+        reconnect_max_sec: float = 10.0,
+        recorder: Optional[Any] = None,
+    ):
+        try:
+            import websockets  # noqa: F401
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ImportError("WOOFiWSAdapter requires the 'websockets' package (pip install websockets)") from exc
+        self.ws_url = ws_url
+        self.symbols = symbols
+        self.topics = list(topics)
+        self.reconnect_max_sec = reconnect_max_sec
+        self.recorder = recorder
+        self.best_quotes: Dict[str, Tuple[Optional[float], Optional[float]]] = {s: (None, None) for s in symbols}
+        self.marks: Dict[str, Optional[float]] = {s: None for s in symbols}
+        self.books: Dict[str, L2Book] = {}
+        self.last_update_ts: Dict[str, float] = {}
+        self.msg_count = 0
+        self.reconnects = 0
+        self.connected = False
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ws = None
+
+    # ------------------------------------------------------------------
+    # lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="woofi-ws", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def close(self):
+        if self._loop is None or self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop.set)
+        if self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def wait_ready(self, timeout: float = 5.0) -> bool:
+        """Block until every symbol has a quote (or timeout). Useful at startup and in tests."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if all(m is not None for m in self.marks.values()):
+                return True
+            time.sleep(0.01)
+        return False
+
+    # ------------------------------------------------------------------
+    # adapter interface
+    # ------------------------------------------------------------------
+    def step(self):
+        # quotes are pushed by the background task; just make sure it is running
+        self.start()
+
+    def get_orderbook(self, symbol: str) -> Tuple[Optional[float], Optional[float]]:
+        return self.best_quotes.get(symbol, (None, None))
+
+    def get_mark(self, symbol: str) -> Optional[float]:
+        return self.marks.get(symbol)
+
+    def get_book(self, symbol: str) -> Optional[L2Book]:
+        return self.books.get(symbol)
+
+    def stream_stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "messages": self.msg_count,
+            "reconnects": self.reconnects,
+            "last_update_ts": dict(self.last_update_ts),
+        }
+
+    # ------------------------------------------------------------------
+    # background task
+    # ------------------------------------------------------------------
+    def _run_loop(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._stop = asyncio.Event()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._consume_forever())
+        finally:
+            self._loop.close()
+
+    async def _consume_forever(self):
+        import websockets
+
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.ws_url) as ws:
+                    self._ws = ws
+                    self.connected = True
+                    backoff = 0.5
+                    await self._subscribe(ws)
+                    async for raw in ws:
+                        self._on_message(ws, raw)
+            except Exception as exc:
+                if not self._stop.is_set():
+                    log.warning("ws %s disconnected: %s (reconnect in %.1fs)", self.ws_url, exc, backoff)
+            finally:
+                self._ws = None
+                self.connected = False
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2.0, self.reconnect_max_sec)
+
+    async def _subscribe(self, ws):
+        for sym in self.symbols:
+            for topic in self.topics:
+                sub = {"id": f"{sym}-{topic}", "topic": f"{sym}@{topic}", "event": "subscribe"}
+                await ws.send(json.dumps(sub))
+
+    def _on_message(self, ws, raw):
+        try:
+            msg = json.loads(raw)
+        except Exception:
+            return
+        if not isinstance(msg, dict):
+            return
+        if msg.get("event") == "ping":
+            asyncio.ensure_future(ws.send(json.dumps({"event": "pong", "ts": int(time.time() * 1000)})))
+            return
+        if msg.get("event") in ("subscribe", "pong"):
+            return
+        symbol, bb, ba = _parse_quote(msg)
+        if symbol not in self.best_quotes:
+            return
+        kind = (msg.get("topic") or "").rsplit("@", 1)[-1]
+        data = msg.get("data") if isinstance(msg.get("data"), dict) else msg
+        # L2Book.ts is epoch seconds, as the poll adapter stamps it; pushes carry milliseconds
+        ts = _to_float(msg.get("ts"))
+        ts = ts / 1000.0 if ts is not None else time.time()
+        if kind == "orderbook":
+            book = L2Book(symbol)
+            book.apply_snapshot(data.get("bids") or [], data.get("asks") or [], ts=ts)
+            self.books[symbol] = book
+            bb, ba = book.top()
+        elif kind == "orderbookupdate":
+            book = self.books.get(symbol)
+            if book is None:
+                return  # deltas are meaningless until a snapshot arrives
+            # the trading thread may be walking the current book: update a copy and swap it in
+            book = book.copy()
+            book.apply_deltas(data.get("bids") or [], data.get("asks") or [], ts=ts)
+            self.books[symbol] = book
+            bb, ba = book.top()
+        if bb is None and ba is None:
+            return
+        self.msg_count += 1
+        old_bb, old_ba = self.best_quotes[symbol]
+        bb = bb if bb is not None else old_bb
+        ba = ba if ba is not None else old_ba
+        self.best_quotes[symbol] = (bb, ba)
+        if bb is not None and ba is not None:
+            self.marks[symbol] = (bb + ba) / 2.0
+        else:
+            self.marks[symbol] = bb if bb is not None else ba
+        self.last_update_ts[symbol] = time.time()
+        if self.recorder is not None:
+            book = self.books.get(symbol) if kind in ("orderbook", "orderbookupdate") else None
+            self.recorder.record(symbol, bb, ba, self.marks[symbol], book=book)
@@ -0,0 +1,138 @@
+"""
+Local stand-in for the WOOFi public WebSocket that replays recorded JSON fixtures.
+
+Fixtures are either a JSON list of messages or JSON Lines (one message per line).
+Each client gets the messages whose ``topic`` it subscribed to, in file order,
+optionally paced by ``interval_ms`` and looped forever.
+
+    python -m woofibot.exchange.ws_replay_server tests/fixtures/ws_stream_sample.jsonl --port 8765
+
+then point ``woofi.ws_url`` at ``ws://127.0.0.1:8765``.
+"""
+
+import json
+import asyncio
+import argparse
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+def load_fixture(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    text = Path(path).read_text(encoding="utf-8-sig").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        return [m for m in json.loads(text) if isinstance(m, dict)]
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class ReplayWSServer:
+    def __init__(
+        self,
+        messages: Union[str, Path, List[Dict[str, Any]]],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        interval_ms: float = 0.0,
+        loop_forever: bool = False,
+    ):
+        self.messages = load_fixture(messages) if isinstance(messages, (str, Path)) else list(messages)
+        self.host = host
+        self.port = port
+        self.interval_ms = interval_ms
+        self.loop_forever = loop_forever
+        self.connections = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, ws, path=None):
+        self.connections += 1
+        subscribed = set()
+        got_sub = asyncio.Event()
+
+        async def reader():
+            async for raw in ws:
+                try:
+                    msg = json.loads(raw)
+                except Exception:
+                    continue
+                if isinstance(msg, dict) and msg.get("event") == "subscribe":
+                    subscribed.add(msg.get("topic"))
+                    await ws.send(json.dumps({"id": msg.get("id"), "event": "subscribe", "success": True}))
+                    got_sub.set()
+
+        read_task = asyncio.ensure_future(reader())
+        try:
+            await asyncio.wait_for(got_sub.wait(), timeout=5.0)
+            # let the rest of the subscription burst arrive before replaying
+            await asyncio.sleep(0.05)
+            while True:
+                for msg in self.messages:
+                    topic = msg.get("topic")
+                    if topic and topic not in subscribed:
+                        continue
+                    await ws.send(json.dumps(msg))
+                    if self.interval_ms > 0:
+                        await asyncio.sleep(self.interval_ms / 1000.0)
+                if not self.loop_forever:
+                    break
+            await read_task
+        except Exception:
+            pass
+        finally:
+            read_task.cancel()
+
+    async def _serve(self, ready: threading.Event):
+        import websockets
+
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+        await self._server.wait_closed()
+
+    def start(self) -> str:
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self._serve(ready))
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="ws-replay", daemon=True)
+        self._thread.start()
+        ready.wait(timeout=5)
+        return self.url
+
+    def stop(self):
+        if self._server is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded WebSocket fixtures locally")
+    parser.add_argument("fixture")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval-ms", type=float, default=100.0)
+    args = parser.parse_args()
+    srv = ReplayWSServer(args.fixture, host=args.host, port=args.port, interval_ms=args.interval_ms, loop_forever=True)
+    print(f"Replaying {len(srv.messages)} messages on {srv.start()} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.stop()
+
+
+if __name__ == "__main__":
+    main()
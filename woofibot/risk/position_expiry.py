@@ -0,0 +1,71 @@
+"""
+Position-age expiry (``risk.max_position_age_sec``) on a min-heap of expiry times.
+
+A position's age runs from when it was opened: from flat, or when a fill flips its side.
+Adding to or reducing a position keeps the original open time. Each open pushes one
+``(expires_at, opened_at, symbol)`` entry; entries whose position has since closed or
+re-opened are dropped lazily when they reach the top. ``due(now)`` therefore pops only
+what has expired, O(log n) each, and never scans the open positions.
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class PositionExpiry:
+    def __init__(self, max_age_sec: float):
+        self.max_age_sec = float(max_age_sec)
+        self._heap: List[Tuple[float, float, str]] = []
+        self._open: Dict[str, Tuple[float, bool]] = {}  # symbol -> (opened_at, is_long)
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def opened_at(self, symbol: str) -> Optional[float]:
+        o = self._open.get(symbol)
+        return o[0] if o else None
+
+    def track(self, symbol: str, qty: float, now: float):
+        """Update ``symbol`` after a fill that left it at ``qty``."""
+        if not qty:
+            self._open.pop(symbol, None)
+            return
+        o = self._open.get(symbol)
+        if o is None or o[1] != (qty > 0):
+            self.arm(symbol, now, qty > 0)
+
+    def arm(self, symbol: str, opened_at: float, is_long: bool = True):
+        self._open[symbol] = (opened_at, is_long)
+        heapq.heappush(self._heap, (opened_at + self.max_age_sec, opened_at, symbol))
+        if len(self._heap) > 2 * len(self._open) + 64:
+            # mostly stale entries: rebuild from the live ones
+            self._heap = [(t + self.max_age_sec, t, s) for s, (t, _) in self._open.items()]
+            heapq.heapify(self._heap)
+
+    def clear(self):
+        self._heap.clear()
+        self._open.clear()
+
+    def due(self, now: float, symbols: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Symbols whose position is at least ``max_age_sec`` old at ``now``, oldest first; they
+        are disarmed until the next open. With ``symbols``, only those can expire now and
+        other due positions wait for a later call.
+        """
+        heap, live = self._heap, self._open
+        allowed = None if symbols is None else set(symbols)
+        out: List[str] = []
+        held: List[Tuple[float, float, str]] = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            o = live.get(entry[2])
+            if o is None or o[0] != entry[1]:
+                continue  # closed or re-opened since
+            if allowed is not None and entry[2] not in allowed:
+                held.append(entry)
+                continue
+            del live[entry[2]]
+            out.append(entry[2])
+        for entry in held:
+            heapq.heappush(heap, entry)
+        return out
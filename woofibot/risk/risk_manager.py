@@ -1,20 +1,44 @@
-from typing import Dict
-from ..core.portfolio import Portfolio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 
+from ..core.portfolio import Portfolio
+from ..utils.clock import WALL_CLOCK
+from .position_expiry import PositionExpiry
+from .rolling_metrics import RollingRiskMetrics
+from .trigger_book import TriggerBook
 
-import time
-from math import isfinite
 
 class RiskManager:
     def __init__(self, portfolio: Portfolio, config):
         self.pf = portfolio
         self.cfg = config
-        self.start_equity = portfolio.cash_usd
+        self.triggers = TriggerBook(config)
+        # position ages and the metrics' day/window run on the portfolio's clock
+        # (simulated in backtests and replay)
+        self.clock = getattr(portfolio, "clock", None) or WALL_CLOCK
+        max_age = getattr(config, "max_position_age_sec", None)
+        self.expiry = PositionExpiry(max_age) if max_age else None
+        self.metrics = RollingRiskMetrics(getattr(config, "metrics_window_sec", 86400.0), start_equity=portfolio.cash_usd)
+
+    @property
+    def start_equity(self) -> float:
+        """Daily loss limit baseline: equity at the start of the current UTC day."""
+        return self.metrics.day_open
+
+    @start_equity.setter
+    def start_equity(self, value: float):
+        self.metrics.day_open = value
 
-    def can_trade(self, prices: Dict[str, float], order_notional: float = 0.0) -> bool:
-        # daily loss limit check
+    def on_tick(self, equity: Optional[float] = None):
+        """Feed this tick's equity (default: the portfolio's, O(1)) to the rolling metrics."""
+        self.metrics.update(self.clock.time(), self.pf.equity() if equity is None else equity)
+
+    def can_trade(self, prices: Optional[Dict[str, float]] = None, order_notional: float = 0.0) -> bool:
+        # prices=None uses the portfolio's own marks (O(1) running totals)
+        # daily loss limit check, against the day's opening equity
         eq = self.pf.equity(prices)
-        dd_pct = (self.start_equity - eq) / max(1e-9, self.start_equity) * 100
+        dd_pct = self.metrics.daily_loss_pct(eq)
         # max exposure check
         exposure = self.pf.open_notional(prices)
         # Prevent opening if resulting exposure would breach cap
@@ -22,26 +46,102 @@ class RiskManager:
             return False
         if dd_pct >= self.cfg.daily_loss_limit_pct:
             return False
+        # rolling-window limits (0 = off); all O(1) reads of the streaming metrics
+        m, cfg = self.metrics, self.cfg
+        if getattr(cfg, "max_drawdown_pct", 0.0) > 0 and m.max_drawdown_pct >= cfg.max_drawdown_pct:
+            return False
+        if getattr(cfg, "max_realized_vol_pct", 0.0) > 0 and m.realized_vol_pct >= cfg.max_realized_vol_pct:
+            return False
+        if getattr(cfg, "max_turnover_usd", 0.0) > 0 and m.turnover_usd + order_notional > cfg.max_turnover_usd:
+            return False
         return True
 
-    def check_auto_close(self, prices: Dict[str, float]):
-        """Return a close-order dict when TP/SL conditions met, else None."""
-        # iterate through open positions (support multi-symbol)
-        for sym, pos in self.pf.positions.items():
-            if pos.qty == 0:
-                continue
-            mark = prices.get(sym)
-            if mark is None or not isfinite(mark):
+    def on_fill(self, symbol: str, notional: float = 0.0):
+        """
+        Re-arm ``symbol``'s TP/SL/trailing triggers and age timer from its position after a
+        fill of ``notional`` USD (counted as turnover).
+        """
+        if notional:
+            self.metrics.record_trade(self.clock.time(), notional)
+        pos = self.pf.positions.get(symbol)
+        if pos is None:
+            self.triggers.arm(symbol, 0.0, 0.0)
+        else:
+            self.triggers.arm(symbol, pos.qty, pos.avg_price, self.pf.mark_of(symbol))
+        if self.expiry is not None:
+            self.expiry.track(symbol, pos.qty if pos is not None else 0.0, self.clock.time())
+
+    def sync_triggers(self):
+        """
+        Arm triggers for every open position (e.g. after a state restore); a position's age
+        is taken from its last fill time, the only timestamp a restore has.
+        """
+        self.triggers.clear()
+        if self.expiry is not None:
+            self.expiry.clear()
+        for sym, pos in list(self.pf.positions.items()):
+            if pos.qty:
+                self.triggers.arm(sym, pos.qty, pos.avg_price, self.pf.mark_of(sym))
+                if self.expiry is not None:
+                    self.expiry.arm(sym, pos.ts, pos.qty > 0)
+
+    def expired(self, symbols: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Close orders for positions open at least ``max_position_age_sec`` on the clock,
+        oldest first; ``symbols`` limits which may expire now (the rest wait).
+        """
+        if self.expiry is None:
+            return []
+        out = []
+        for sym in self.expiry.due(self.clock.time(), symbols):
+            pos = self.pf.positions.get(sym)
+            if pos is None or not pos.qty:
                 continue
-            entry = pos.avg_price or mark
-            unreal_pct = (mark - entry) / entry * 100 if pos.qty > 0 else (entry - mark) / entry * 100
+            mark = self.pf.mark_of(sym) or pos.avg_price
+            out.append({
+                "symbol": sym,
+                "side": "sell" if pos.qty > 0 else "buy",
+                "qty_quote": abs(pos.qty) * mark,
+                "reason": "age",
+            })
+        return out
+
+    def on_marks(self, marks: Iterable[Tuple[str, float]]) -> List[Dict]:
+        """
+        Close orders for positions whose TP/SL/trailing trigger was crossed by these mark
+        updates; only the updated symbols' triggers are looked at.
+        """
+        return self.triggers.update(marks)
+
+    def check_auto_close_batch(self, prices: Optional[Dict[str, float]] = None) -> List[Dict]:
+        """
+        Close orders for every open position at or beyond TP/SL, computed in one vectorized
+        pass over the portfolio (``prices=None`` uses its own marks). A TP or SL of 0 is off.
+        """
+        tp, sl = self.cfg.take_profit_pct, self.cfg.stop_loss_pct
+        if tp <= 0 and sl <= 0:
+            return []
+        syms, qty, avg, mark = self.pf.open_arrays(prices)
+        if not len(syms):
+            return []
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entry = np.where(avg != 0, avg, mark)
             # TP/SL percentages are positive numbers in config
-            if unreal_pct >= self.cfg.take_profit_pct:
-                side = "sell" if pos.qty > 0 else "buy"
-                qty_quote = abs(pos.qty) * mark
-                return {"symbol": sym, "side": side, "qty_quote": qty_quote, "reason": "tp"}
-            if unreal_pct <= -self.cfg.stop_loss_pct:
-                side = "sell" if pos.qty > 0 else "buy"
-                qty_quote = abs(pos.qty) * mark
-                return {"symbol": sym, "side": side, "qty_quote": qty_quote, "reason": "sl"}
-        return None
+            unreal_pct = np.sign(qty) * (mark - entry) / entry * 100
+        valid = np.isfinite(unreal_pct)
+        hit_tp = valid & (unreal_pct >= tp) if tp > 0 else np.zeros(len(syms), dtype=bool)
+        hit_sl = valid & (unreal_pct <= -sl) & ~hit_tp if sl > 0 else np.zeros(len(syms), dtype=bool)
+        return [
+            {
+                "symbol": syms[i],
+                "side": "sell" if qty[i] > 0 else "buy",
+                "qty_quote": float(abs(qty[i]) * mark[i]),
+                "reason": "tp" if hit_tp[i] else "sl",
+            }
+            for i in np.flatnonzero(hit_tp | hit_sl).tolist()
+        ]
+
+    def check_auto_close(self, prices: Dict[str, float]):
+        """Return the first close-order dict when TP/SL conditions met, else None."""
+        closes = self.check_auto_close_batch(prices)
+        return closes[0] if closes else None
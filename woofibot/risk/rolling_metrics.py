@@ -0,0 +1,140 @@
+"""
+Streaming risk metrics over a rolling time window, O(1) amortized per update.
+
+``update(ts, equity)`` is fed once per tick and ``record_trade(ts, notional)`` once per
+fill; every query is a constant-time read, so ``RiskManager.can_trade`` never touches
+history:
+
+    day_open          equity at the start of the current UTC calendar day (the daily loss
+                      limit's baseline; it rolls over on the first tick of a new day)
+    drawdown_pct      current equity below the highest equity in the window
+    max_drawdown_pct  largest ``drawdown_pct`` seen in the window
+    realized_vol_pct  sqrt of the summed squared log returns of equity in the window
+    turnover_usd      traded notional in the window (``day_turnover_usd``: since day_open)
+
+The rolling peak and the rolling max drawdown are monotonic deques of ``(ts, value)``
+(each sample is pushed and popped at most once); volatility and turnover keep running
+sums and subtract what falls out of the window. Only ``day`` / ``day_open`` are
+checkpointed (``state()``); the windows refill after a restart.
+"""
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+_DAY = 86400
+
+
+class RollingRiskMetrics:
+    def __init__(self, window_sec: float = 86400.0, start_equity: Optional[float] = None):
+        self.window_sec = float(window_sec)
+        self.day: Optional[int] = None  # UTC days since the epoch
+        self.day_open = start_equity
+        self.day_turnover_usd = 0.0
+        self.last_ts: Optional[float] = None
+        self.last_equity: Optional[float] = None
+        self.drawdown_pct = 0.0
+        self._peaks: Deque[Tuple[float, float]] = deque()  # equity, decreasing
+        self._dds: Deque[Tuple[float, float]] = deque()  # drawdown_pct, decreasing
+        self._rets: Deque[Tuple[float, float]] = deque()  # squared log returns
+        self._sum_r2 = 0.0
+        self._trades: Deque[Tuple[float, float]] = deque()
+        self._turnover = 0.0
+
+    def _roll(self, ts: float):
+        day = int(ts // _DAY)
+        if day != self.day:
+            if self.day is not None and day > self.day:
+                # the previous tick's equity; None (first tick after a restart) -> this tick's
+                self.day_open = self.last_equity
+                self.day_turnover_usd = 0.0
+            self.day = day
+
+    def update(self, ts: float, equity: float):
+        self._roll(ts)
+        if self.day_open is None:
+            self.day_open = equity
+        cutoff = ts - self.window_sec
+
+        peaks = self._peaks
+        while peaks and peaks[-1][1] <= equity:
+            peaks.pop()
+        peaks.append((ts, equity))
+        while peaks[0][0] <= cutoff:
+            peaks.popleft()
+        peak = peaks[0][1]
+        dd = (peak - equity) / peak * 100.0 if peak > 0 else 0.0
+        self.drawdown_pct = dd
+
+        dds = self._dds
+        while dds and dds[-1][1] <= dd:
+            dds.pop()
+        dds.append((ts, dd))
+        while dds[0][0] <= cutoff:
+            dds.popleft()
+
+        rets = self._rets
+        last = self.last_equity
+        if last is not None and last > 0 and equity > 0 and equity != last:
+            r2 = math.log(equity / last) ** 2
+            rets.append((ts, r2))
+            self._sum_r2 += r2
+        while rets and rets[0][0] <= cutoff:
+            self._sum_r2 -= rets.popleft()[1]
+        if not rets:
+            self._sum_r2 = 0.0  # drop accumulated rounding
+
+        self._evict_trades(cutoff)
+        self.last_ts, self.last_equity = ts, equity
+
+    def record_trade(self, ts: float, notional: float):
+        self._roll(ts)
+        notional = abs(notional)
+        self._trades.append((ts, notional))
+        self._turnover += notional
+        self.day_turnover_usd += notional
+
+    def _evict_trades(self, cutoff: float):
+        trades = self._trades
+        while trades and trades[0][0] <= cutoff:
+            self._turnover -= trades.popleft()[1]
+        if not trades:
+            self._turnover = 0.0
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+    @property
+    def max_drawdown_pct(self) -> float:
+        return self._dds[0][1] if self._dds else 0.0
+
+    @property
+    def realized_vol_pct(self) -> float:
+        return math.sqrt(max(self._sum_r2, 0.0)) * 100.0
+
+    @property
+    def turnover_usd(self) -> float:
+        return max(self._turnover, 0.0)
+
+    def daily_loss_pct(self, equity: float) -> float:
+        """Loss of ``equity`` against the day's open, in percent (negative = up on the day)."""
+        base = self.day_open if self.day_open is not None else equity
+        return (base - equity) / max(1e-9, base) * 100.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "day_open": self.day_open,
+            "drawdown_pct": self.drawdown_pct,
+            "max_drawdown_pct": self.max_drawdown_pct,
+            "realized_vol_pct": self.realized_vol_pct,
+            "turnover_usd": self.turnover_usd,
+            "day_turnover_usd": self.day_turnover_usd,
+        }
+
+    def state(self) -> Dict[str, Any]:
+        """Day baseline, for checkpointing."""
+        return {"day": self.day, "day_open": self.day_open}
+
+    def load_state(self, state: Dict[str, Any]):
+        self.day = state.get("day")
+        self.day_open = state.get("day_open", self.day_open)
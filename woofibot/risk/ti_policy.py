@@ -1,12 +1,13 @@
-import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..core.portfolio import Portfolio
 from ..utils.config import TIConfig
+from ..utils.clock import Clock, WALL_CLOCK
 
 
 class TIPolicy:
-    def __init__(self, cfg: TIConfig):
+    def __init__(self, cfg: TIConfig, clock: Optional[Clock] = None):
         self.cfg = cfg
+        self.clock = clock or WALL_CLOCK
         self._last_trade_ts: Dict[str, float] = {}
 
     def allow_signal(self, od: Dict[str, Any], pf: Portfolio, prices: Dict[str, float]) -> bool:
@@ -15,9 +16,9 @@ class TIPolicy:
         qty_quote = float(od.get("qty_quote", 0.0))
         if qty_quote < self.cfg.min_order_notional:
             return False
-        now = time.time()
-        lt = self._last_trade_ts.get(sym, 0.0)
-        if now - lt < self.cfg.min_trade_interval_sec:
+        now = self.clock.time()
+        lt = self._last_trade_ts.get(sym)
+        if lt is not None and now - lt < self.cfg.min_trade_interval_sec:
             return False
         pos = pf.positions.get(sym)
         if pos and pos.qty != 0:
@@ -27,4 +28,14 @@ class TIPolicy:
         return True
 
     def record_fill(self, symbol: str):
-        self._last_trade_ts[symbol] = time.time()
+        self._last_trade_ts[symbol] = self.clock.time()
+
+    def last_trade_ts(self, symbol: str) -> Optional[float]:
+        return self._last_trade_ts.get(symbol)
+
+    def state(self) -> Dict[str, float]:
+        """Last trade time per symbol, for checkpointing."""
+        return dict(self._last_trade_ts)
+
+    def load_state(self, state: Dict[str, float]):
+        self._last_trade_ts.update(state)
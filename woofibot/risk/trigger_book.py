@@ -0,0 +1,146 @@
+"""
+Price-indexed TP/SL/trailing-stop triggers.
+
+Each open position is armed with absolute trigger prices derived from its entry (per-symbol
+overrides of ``take_profit_pct`` / ``stop_loss_pct`` / ``trailing_stop_pct`` fall back to
+the global ``RiskConfig`` values; 0 = off). A symbol's levels are kept sorted, and a mark
+update only looks at the levels between the previous and the new mark (two bisects), so
+per-tick cost follows the symbols that moved and the triggers that fired, not the number
+of positions held.
+
+Invariant: no armed level is at or beyond the last mark in its firing direction. A
+position armed when it is already past a level fires on its symbol's next mark.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_KEYS = ("take_profit_pct", "stop_loss_pct", "trailing_stop_pct")
+
+
+class _Arm:
+    __slots__ = ("qty", "levels", "kinds", "last", "peak", "trail_pct", "due")
+
+    def __init__(self, qty: float, last: float, trail_pct: float):
+        self.qty = qty
+        self.levels: List[float] = []
+        self.kinds: List[str] = []
+        self.last = last
+        self.peak = last  # best mark since entry (trailing stop anchor)
+        self.trail_pct = trail_pct
+        self.due: Optional[str] = None  # armed already past this kind of level
+
+    def add(self, level: float, kind: str):
+        i = bisect_right(self.levels, level)
+        self.levels.insert(i, level)
+        self.kinds.insert(i, kind)
+
+    def remove(self, kind: str):
+        i = self.kinds.index(kind)
+        del self.levels[i], self.kinds[i]
+
+
+class TriggerBook:
+    def __init__(self, cfg, overrides: Optional[Dict[str, Dict[str, float]]] = None):
+        self.cfg = cfg
+        self.overrides = overrides if overrides is not None else dict(getattr(cfg, "symbol_overrides", None) or {})
+        self._arms: Dict[str, _Arm] = {}
+        self.fired = 0
+
+    def params(self, symbol: str) -> Tuple[float, float, float]:
+        """``(take_profit_pct, stop_loss_pct, trailing_stop_pct)`` for ``symbol``."""
+        o = self.overrides.get(symbol, {})
+        return tuple(float(o.get(k, getattr(self.cfg, k, 0.0) or 0.0)) for k in _KEYS)
+
+    def __len__(self) -> int:
+        return len(self._arms)
+
+    def levels(self, symbol: str) -> List[Tuple[float, str]]:
+        arm = self._arms.get(symbol)
+        return list(zip(arm.levels, arm.kinds)) if arm else []
+
+    # ------------------------------------------------------------------
+    # arming
+    # ------------------------------------------------------------------
+    def arm(self, symbol: str, qty: float, entry: float, mark: Optional[float] = None):
+        """
+        (Re)arm ``symbol`` for a position of ``qty`` at ``entry``; qty 0 disarms it. Re-arming
+        a position on the same side (an add or partial close) keeps its trailing peak.
+        """
+        prev = self._arms.pop(symbol, None)
+        if not qty or not entry:
+            return
+        tp, sl, trail = self.params(symbol)
+        if tp <= 0 and sl <= 0 and trail <= 0:
+            return
+        mark = entry if mark is None or mark != mark else mark
+        s = 1.0 if qty > 0 else -1.0
+        arm = _Arm(qty, mark, trail)
+        arm.peak = max(entry, mark) if s > 0 else min(entry, mark)
+        if prev is not None and (prev.qty > 0) == (s > 0):
+            arm.peak = max(arm.peak, prev.peak) if s > 0 else min(arm.peak, prev.peak)
+        if tp > 0:
+            arm.add(entry * (1 + s * tp / 100), "tp")
+        if sl > 0:
+            arm.add(entry * (1 - s * sl / 100), "sl")
+        if trail > 0:
+            arm.add(arm.peak * (1 - s * trail / 100), "trail")
+        # already through a level at the current mark?
+        for level, kind in zip(arm.levels, arm.kinds):
+            upward = (kind == "tp") == (s > 0)
+            if (mark >= level) if upward else (mark <= level):
+                arm.due = kind
+                break
+        self._arms[symbol] = arm
+
+    def clear(self):
+        self._arms.clear()
+
+    # ------------------------------------------------------------------
+    # mark updates
+    # ------------------------------------------------------------------
+    def update(self, marks: Iterable[Tuple[str, float]]) -> List[Dict]:
+        """
+        Feed new marks; returns a close order for every symbol whose trigger fired. Fired
+        symbols are disarmed until re-armed (normally by the close fill).
+        """
+        out: List[Dict] = []
+        arms = self._arms
+        for sym, price in marks:
+            arm = arms.get(sym)
+            if arm is None or price != price:
+                continue
+            if arm.due is not None:
+                del arms[sym]
+                out.append(self._close(sym, arm, price, arm.due))
+                continue
+            prev = arm.last
+            arm.last = price
+            levels = arm.levels
+            if price >= prev:
+                i = bisect_left(levels, prev)
+                j = bisect_right(levels, price)
+                hit = i if i < j else -1  # first level crossed on the way up
+            else:
+                i = bisect_left(levels, price)
+                j = bisect_right(levels, prev)
+                hit = j - 1 if i < j else -1  # first level crossed on the way down
+            if hit >= 0:
+                del arms[sym]
+                out.append(self._close(sym, arm, price, arm.kinds[hit]))
+            elif arm.trail_pct > 0 and ((price > arm.peak) if arm.qty > 0 else (price < arm.peak)):
+                # new extreme: drag the trailing level behind it
+                arm.peak = price
+                arm.remove("trail")
+                arm.add(price * (1 - (1 if arm.qty > 0 else -1) * arm.trail_pct / 100), "trail")
+        self.fired += len(out)
+        return out
+
+    @staticmethod
+    def _close(symbol: str, arm: _Arm, price: float, reason: str) -> Dict:
+        return {
+            "symbol": symbol,
+            "side": "sell" if arm.qty > 0 else "buy",
+            "qty_quote": abs(arm.qty) * price,
+            "reason": reason,
+        }
@@ -3,8 +3,20 @@ from .liquidity_gap import LiquidityGapStrategy
 from .mean_reversion import MeanReversionStrategy
 from .trend_follower import TrendFollowerStrategy
 
+
+def build_strategy(name: str, params):
+    if name == "liquidity_gap":
+        return LiquidityGapStrategy(params.get("liquidity_gap", {}))
+    if name == "mean_reversion":
+        return MeanReversionStrategy(params.get("mean_reversion", {}))
+    if name == "trend_follower":
+        return TrendFollowerStrategy(params.get("trend_follower", {}))
+    raise ValueError(f"Unknown strategy {name}")
+
+
 __all__ = [
     "StrategyBase",
+    "build_strategy",
     "LiquidityGapStrategy",
     "MeanReversionStrategy",
     "TrendFollowerStrategy",
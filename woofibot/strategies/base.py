@@ -3,6 +3,10 @@ from typing import List, Dict
 
 
 class StrategyBase(ABC):
+    # True when each symbol's orders depend only on that symbol's own prices/position,
+    # which lets a backtest be sharded across processes by symbol
+    per_symbol: bool = False
+
     def __init__(self, params: Dict):
         self.params = params or {}
 
@@ -3,6 +3,11 @@ from .base import StrategyBase
 
 
 class LiquidityGapStrategy(StrategyBase):
+    @property
+    def per_symbol(self) -> bool:
+        # without a fixed size, orders are sized off shared portfolio cash
+        return bool(float(self.params.get("order_size_override", 0)))
+
     def on_tick(self, symbol_prices: Dict[str, float], exchange, risk_mgr) -> List[Dict]:
         orders = []
         min_spread_pct = float(self.params.get("min_spread_pct", 0.15))
@@ -0,0 +1,41 @@
+"""
+Injectable time source.
+
+Live trading uses ``WallClock``. Backtests and tick replay use a ``SimClock`` that the
+exchange advances to each candle/tick timestamp, so hold-time and trade-interval rules and
+logged timestamps follow market time however fast the simulation runs.
+"""
+
+import time
+from abc import ABC, abstractmethod
+
+
+class Clock(ABC):
+    @abstractmethod
+    def time(self) -> float:
+        """Current time in epoch seconds"""
+        raise NotImplementedError
+
+
+class WallClock(Clock):
+    def time(self) -> float:
+        return time.time()
+
+
+class SimClock(Clock):
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+
+    def time(self) -> float:
+        return self._now
+
+    def set(self, ts: float):
+        # never run backwards, e.g. when a feed repeats its last timestamp
+        if ts > self._now:
+            self._now = float(ts)
+
+    def advance(self, seconds: float):
+        self._now += seconds
+
+
+WALL_CLOCK = WallClock()
@@ -12,26 +12,58 @@ class RiskConfig(BaseModel):
     max_notional_per_trade: float = 0.0
     stop_loss_pct: float = 0.0
     take_profit_pct: float = 0.0
-    daily_loss_limit_pct: float = 0.0
+    trailing_stop_pct: float = 0.0  # stop trails the best mark since entry by this much (0 = off)
+    # per-symbol take_profit_pct / stop_loss_pct / trailing_stop_pct, e.g. {"PERP_BTC_USDC": {"stop_loss_pct": 1.0}}
+    symbol_overrides: Dict[str, Dict[str, float]] = {}
+    daily_loss_limit_pct: float = 0.0  # vs equity at the start of the UTC day
     max_position_age_sec: int | None = None
+    # rolling-window limits checked by can_trade (0 = off)
+    metrics_window_sec: float = 86400.0
+    max_drawdown_pct: float = 0.0  # peak-to-trough within the window
+    max_realized_vol_pct: float = 0.0  # sqrt of summed squared equity log returns
+    max_turnover_usd: float = 0.0  # traded notional within the window
 
 
 class BacktestConfig(BaseModel):
     data_dir: str = "data/sample_candles"
-    timeframe: str = "1m"
+    timeframe: str = "1m"  # 1m | 5m | 15m | 30m | 1h | 4h | 1d; higher frames are resampled from 1m
+    cache_dir: Optional[str] = "data/cache/bars"  # resampled bars, keyed by 1m source fingerprint
     fee_bps: float = 0.0
+    # memory-mapped candle store (python -m woofibot.data.candle_store); falls back to data_dir CSVs
+    store_dir: Optional[str] = None
+    start: Optional[str] = None  # YYYY-MM-DD or ISO datetime (UTC), inclusive
+    end: Optional[str] = None
+    # a symbol with no bar for longer than this is stale and left out of strategy input (None = no limit)
+    max_ffill_sec: Optional[float] = 300.0
+    # >1: split markets across processes (per-symbol strategies with uncoupled risk only)
+    shards: int = 1
+    # memoized results keyed by config, code and candle fingerprints (None = always simulate)
+    result_cache_dir: Optional[str] = None
+    result_cache_max_entries: int = 100
+    result_cache_max_mb: float = 1024.0
+    # fill pricing when no L2 depth is available: none | linear | sqrt
+    impact_model: str = "none"
+    impact_coef_bps: float = 0.0
+    impact_ref_notional: float = 10000.0
 
 
 class WOOFiConfig(BaseModel):
     rest_url: str = os.getenv("WOOFI_API_BASE", "")
     ws_url: Optional[str] = None
+    market_data: str = "poll"  # poll | ws
+    ws_topics: List[str] = ["bbo", "orderbook"]
     poll_interval_ms: int = 1000
     rest_orderbook: Optional[str] = None
     rest_ticker: Optional[str] = None
     rest_bookticker: Optional[str] = None
     rest_pricechanges: Optional[str] = None
     simulate_latency_ms: int = 0
+    poll_concurrent: bool = True
+    poll_max_workers: int = 8
+    poll_deadline_ms: Optional[int] = None  # how long step() waits for a cycle (default 100 ms)
     order_base_url: Optional[str] = None
+    http_pool_size: int = 20
+    http_keep_alive: bool = True
     testnet: bool = True
 
 
@@ -42,6 +74,32 @@ class LoggingConfig(BaseModel):
     sqlite_path: str = "logs/trading.db"
 
 
+class RecorderConfig(BaseModel):
+    """Columnar quote recorder for woofi-paper / woofi-live market data."""
+    enabled: bool = False
+    data_dir: str = "data/ticks"
+    depth_levels: int = 0
+    flush_interval_ms: int = 1000
+
+
+class ReplayConfig(BaseModel):
+    """Tick replay of recorder output (exchange: replay)."""
+    data_dir: str = "data/ticks"
+    speed: float = 0.0  # 0 = as fast as possible, N = N x real time
+    step_ms: float = 0.0  # >0: one loop step consumes every tick in this simulated window
+    start: Optional[str] = None  # YYYY-MM-DD, inclusive
+    end: Optional[str] = None
+    equity_log_every: int = 1000  # loop steps between equity snapshots
+
+
+class StateConfig(BaseModel):
+    """Portfolio/TI/risk checkpoint + journal so paper and live runs survive restarts."""
+    dir: Optional[str] = None  # e.g. data/state; None = start from scratch every run
+    snapshot_every: int = 500  # journaled fills between snapshots
+    snapshot_interval_sec: float = 60.0
+    fsync: bool = False  # fsync every journal line (slower, survives power loss)
+
+
 class TIConfig(BaseModel):
     """Competition tuning knobs to avoid spam and improve TI."""
     min_order_notional: float = 50.0
@@ -55,13 +113,17 @@ class Config(BaseModel):
     markets: List[str]
     order_size: float
     loop_interval_ms: int = 1000
-    exchange: str = "paper"  # paper | woofi-paper | woofi-live
+    exchange: str = "paper"  # paper | woofi-paper | woofi-live | replay
+    portfolio: str = "dict"  # dict | array (NumPy columns, for hundreds of markets)
     risk: RiskConfig = RiskConfig()
     strategy_params: Dict[str, Any] = {}
     backtest: BacktestConfig = BacktestConfig()
     woofi: WOOFiConfig = WOOFiConfig()
     logging: LoggingConfig = LoggingConfig()
     ti: TIConfig = TIConfig()
+    recorder: RecorderConfig = RecorderConfig()
+    replay: ReplayConfig = ReplayConfig()
+    state: StateConfig = StateConfig()
 
 
 def load_config(path: str) -> Config:
@@ -0,0 +1,143 @@
+"""
+Pooled keep-alive HTTP transport shared by the market-data poller and the order client.
+
+One ``requests.Session`` with a sized connection pool, plus per-endpoint stats:
+request/error counts, connection reuse ratio, latency percentiles and bytes moved.
+A request counts as reusing a connection when no socket ``connect()`` happened on the
+calling thread while it ran.
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+_connects = threading.local()
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _connects.n = getattr(_connects, "n", 0) + 1
+        super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _connects.n = getattr(_connects, "n", 0) + 1
+        super().connect()
+
+
+class EndpointStats:
+    def __init__(self, window: int):
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latencies_ms: Deque[float] = deque(maxlen=window)
+
+    def summary(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+
+        def pct(q: float) -> Optional[float]:
+            if not lat:
+                return None
+            return lat[min(len(lat) - 1, int(q * len(lat)))]
+
+        reused = max(0, self.requests - self.errors - self.new_connections)
+        done = max(1, self.requests - self.errors)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "new_connections": self.new_connections,
+            "reuse_ratio": reused / done,
+            "p50_ms": pct(0.50),
+            "p90_ms": pct(0.90),
+            "p99_ms": pct(0.99),
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+        }
+
+
+class _TrackingAdapter(HTTPAdapter):
+    """Swaps in connection classes that count socket connects, and flags each response."""
+
+    def _track(self, pool):
+        if pool.ConnectionCls is HTTPConnection:
+            pool.ConnectionCls = _CountingHTTPConnection
+        elif pool.ConnectionCls is HTTPSConnection:
+            pool.ConnectionCls = _CountingHTTPSConnection
+        return pool
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._track(super().get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert))
+
+    def get_connection(self, url, proxies=None):  # requests < 2.32
+        return self._track(super().get_connection(url, proxies=proxies))
+
+    def send(self, request, **kwargs):
+        _connects.n = 0
+        resp = super().send(request, **kwargs)
+        resp.new_connection = _connects.n > 0
+        return resp
+
+
+class HTTPTransport:
+    def __init__(self, pool_size: int = 20, keep_alive: bool = True, latency_window: int = 2048):
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.latency_window = latency_window
+        self.session = requests.Session()
+        adapter = _TrackingAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        self._stats: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, endpoint: Optional[str] = None, **kwargs) -> requests.Response:
+        """``session.request`` plus stats under ``endpoint`` (defaults to ``METHOD host/path``)."""
+        if endpoint is None:
+            parts = urlsplit(url)
+            endpoint = f"{method.upper()} {parts.netloc}{parts.path}"
+        t0 = time.perf_counter()
+        try:
+            resp = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                st = self._endpoint(endpoint)
+                st.requests += 1
+                st.errors += 1
+            raise
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        body = resp.request.body if resp.request is not None else None
+        with self._lock:
+            st = self._endpoint(endpoint)
+            st.requests += 1
+            st.new_connections += 1 if getattr(resp, "new_connection", True) else 0
+            st.bytes_out += len(body) if body else 0
+            st.bytes_in += len(resp.content)
+            st.latencies_ms.append(elapsed_ms)
+        return resp
+
+    def get(self, url: str, endpoint: Optional[str] = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, endpoint=endpoint, **kwargs)
+
+    def _endpoint(self, name: str) -> EndpointStats:
+        st = self._stats.get(name)
+        if st is None:
+            st = self._stats[name] = EndpointStats(self.latency_window)
+        return st
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: st.summary() for name, st in self._stats.items()}
+
+    def close(self):
+        self.session.close()
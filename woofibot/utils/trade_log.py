@@ -1,11 +1,13 @@
 from pathlib import Path
 import csv
-import time
 from typing import Dict, Optional
 
+from .clock import Clock, WALL_CLOCK
+
 
 class TradeLogger:
-    def __init__(self, trades_path: str = "logs/trades.csv", equity_path: str = "logs/equity.csv"):
+    def __init__(self, trades_path: str = "logs/trades.csv", equity_path: str = "logs/equity.csv", clock: Optional[Clock] = None):
+        self.clock = clock or WALL_CLOCK
         self.trades_path = Path(trades_path)
         self.equity_path = Path(equity_path)
         self.trades_path.parent.mkdir(parents=True, exist_ok=True)
@@ -30,7 +32,7 @@ class TradeLogger:
                 w.writerow(["ts","equity","cash","realized_total","unrealized"]) 
 
     def log_trade(self, trade: Dict, equity: Optional[float] = None, cash: Optional[float] = None):
-        ts = trade.get("ts") or time.time()
+        ts = trade.get("ts") or self.clock.time()
         with self.trades_path.open("a", newline="", encoding="utf-8") as f:
             w = csv.writer(f)
             w.writerow([
@@ -52,7 +54,7 @@ class TradeLogger:
             ])
 
     def log_equity(self, equity: float, cash: float, realized_total: Optional[float] = None, unrealized: Optional[float] = None):
-        ts = time.time()
+        ts = self.clock.time()
         with self.equity_path.open("a", newline="", encoding="utf-8") as f:
             w = csv.writer(f)
             w.writerow([ts, equity, cash, realized_total if realized_total is not None else "", unrealized if unrealized is not None else ""]) 
@@ -1,11 +1,13 @@
 import sqlite3
 from pathlib import Path
-import time
 from typing import Dict, Optional
 
+from .clock import Clock, WALL_CLOCK
+
 
 class SQLiteTradeLogger:
-    def __init__(self, db_path: str = "logs/trading.db"):
+    def __init__(self, db_path: str = "logs/trading.db", clock: Optional[Clock] = None):
+        self.clock = clock or WALL_CLOCK
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._init_db()
@@ -52,7 +54,7 @@ class SQLiteTradeLogger:
             conn.commit()
 
     def log_trade(self, trade: Dict, equity: Optional[float] = None, cash: Optional[float] = None):
-        ts = float(trade.get("ts") or time.time())
+        ts = float(trade.get("ts") or self.clock.time())
         row = (
             ts,
             trade.get("symbol"),
@@ -83,7 +85,7 @@ class SQLiteTradeLogger:
             conn.commit()
 
     def log_equity(self, equity: float, cash: float, realized_total: Optional[float] = None, unrealized: Optional[float] = None):
-        ts = time.time()
+        ts = self.clock.time()
         row = (
             ts,
             float(equity),